@@ -0,0 +1,104 @@
+"""
+Générateur de charge du serveur de politique : des clients GameEnv simulés jouent en continu, chacun demandant
+son action au PolicyServer, comparés à la même charge servie par un `predict` par requête.
+
+Usage :
+    python -m benchmarks.serving [--clients 256] [--steps 100] [--transport queue|unix]
+                                 [--max-batch-size 256] [--max-wait-ms 1.0]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import warnings
+
+MODEL_PATH = "src/models/hero_agent"
+
+async def _play(predict, env, n_steps):
+    """
+    Client simulé : `n_steps` pas de GameEnv, une requête au serveur par pas.
+    """
+    obs = env.reset()
+    for _ in range(n_steps):
+        action = await predict(obs)
+        obs, _, done, _ = env.step(action)
+        if done:
+            obs = env.reset()
+
+async def run_served(policy, envs, n_steps, transport="queue", max_batch_size=256, max_wait_ms=1.0):
+    """
+    Fait jouer tous les clients en parallèle à travers un PolicyServer.
+
+    Returns:
+        tuple: (pas par seconde, statistiques du serveur).
+    """
+    from src.serving import PolicyServer, UnixPolicyClient
+
+    async with PolicyServer(policy, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms) as server:
+        if transport == "unix":
+            path = os.path.join(tempfile.mkdtemp(), "policy.sock")
+            await server.serve_unix(path)
+            clients = [await UnixPolicyClient(path, server.obs_dim).connect() for _ in envs]
+            predicts = [client.predict for client in clients]
+        else:
+            predicts = [server.predict] * len(envs)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_play(predict, env, n_steps) for predict, env in zip(predicts, envs)))
+        elapsed = time.perf_counter() - start
+        if transport == "unix":
+            for client in clients:
+                await client.close()
+        return len(envs) * n_steps / elapsed, server.stats()
+
+def run_per_request(policy, envs, n_steps):
+    """
+    Même charge sans serveur : un `predict` par observation, client après client.
+
+    Returns:
+        float: Pas par seconde.
+    """
+    observations = [env.reset() for env in envs]
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        for i, env in enumerate(envs):
+            action, _ = policy.predict(observations[i], deterministic=True)
+            observations[i], _, done, _ = env.step(action)
+            if done:
+                observations[i] = env.reset()
+    return len(envs) * n_steps / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=256, help="nombre de parties simultanées")
+    parser.add_argument("--steps", type=int, default=100, help="pas joués par chaque client")
+    parser.add_argument("--transport", choices=("queue", "unix"), default="queue",
+                        help="files asyncio dans le processus ou socket Unix")
+    parser.add_argument("--max-batch-size", type=int, default=256, help="observations maximum par batch")
+    parser.add_argument("--max-wait-ms", type=float, default=1.0, help="attente maximale avant l'inférence")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    import torch
+    from src.env import GameEnv
+    from src.evaluation import load_policy
+
+    torch.set_num_threads(1)
+    policy = load_policy(MODEL_PATH)
+    envs = [GameEnv() for _ in range(args.clients)]
+    for i, env in enumerate(envs):
+        env.seed(i)
+
+    baseline = run_per_request(policy, envs, args.steps)
+    served, stats = asyncio.run(run_served(policy, envs, args.steps, args.transport, args.max_batch_size,
+                                           args.max_wait_ms))
+
+    print(f"{args.clients} clients x {args.steps} pas ({args.transport})")
+    print(f"predict par requête : {baseline:>10.0f} pas/s")
+    print(f"PolicyServer        : {served:>10.0f} pas/s  (x{served / baseline:.1f})")
+    print(f"batch moyen {stats['mean_batch_size']:.1f} obs, inférence {stats['inference_mean_ms']:.2f} ms, "
+          f"attente en file moyenne {stats['queue_wait_mean_ms']:.2f} ms (p99 {stats['queue_wait_p99_ms']:.2f} ms)")
+
+if __name__ == "__main__":
+    main()
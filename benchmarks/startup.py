@@ -0,0 +1,101 @@
+"""
+Benchmark de démarrage : temps d'import de `src.env` et temps de construction d'un GameEnv, puis temps pour
+charger la politique et obtenir une première action (DQN.load contre NumpyPolicy).
+
+Chaque mesure d'import est faite dans un interpréteur neuf (comme un worker SubprocVecEnv qui démarre).
+
+Usage :
+    python -m benchmarks.startup [--repeats 5] [--envs 100]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#exécuté dans un interpréteur neuf : import de src.env puis construction d'envs
+_PROBE = """
+import sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from src.env import GameEnv
+import_time = time.perf_counter() - start
+headless = {headless}
+start = time.perf_counter()
+envs = [GameEnv(headless=headless) for _ in range({n_envs})]
+construct_time = (time.perf_counter() - start) / {n_envs}
+print(import_time, construct_time, int("matplotlib" in sys.modules))
+"""
+
+#exécuté dans un interpréteur neuf : chargement de la politique et première action
+_POLICY_PROBE = """
+import time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from src.evaluation import load_policy
+import numpy as np
+policy = load_policy("{model_path}")
+policy.predict(np.zeros(106, dtype=np.float32), deterministic=True)
+print(time.perf_counter() - start, int("torch" in __import__("sys").modules))
+"""
+#NumpyPolicy seule, sans passer par src.evaluation (qui importe l'environnement vectorisé)
+_NUMPY_PROBE = """
+import time
+start = time.perf_counter()
+from src.numpy_policy import NumpyPolicy
+import numpy as np
+NumpyPolicy.load("{model_path}").predict_single(np.zeros(106, dtype=np.float32))
+print(time.perf_counter() - start, int("torch" in __import__("sys").modules))
+"""
+
+def measure_policy(probe, model_path, repeats):
+    """
+    Médiane du temps de chargement + première action dans `repeats` interpréteurs neufs, et import de torch.
+    """
+    times, torch_loaded = [], 0
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", probe.format(model_path=model_path)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+        torch_loaded = int(out[1])
+    return float(np.median(times)), bool(torch_loaded)
+
+def measure(headless, n_envs, repeats):
+    """
+    Lance `repeats` interpréteurs neufs et renvoie les médianes des temps d'import et de construction.
+    """
+    imports, constructs, matplotlib_loaded = [], [], 0
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(headless=headless, n_envs=n_envs)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        imports.append(float(out[0]))
+        constructs.append(float(out[1]))
+        matplotlib_loaded = int(out[2])
+    return {
+        "import_s": float(np.median(imports)),
+        "construct_s": float(np.median(constructs)),
+        "matplotlib_imported": bool(matplotlib_loaded),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--envs", type=int, default=100, help="nombre d'envs construits par mesure")
+    args = parser.parse_args()
+
+    for headless in (True, False):
+        result = measure(headless, args.envs, args.repeats)
+        print(f"headless={headless!s:<5} import src.env : {result['import_s'] * 1e3:7.1f} ms | "
+              f"GameEnv() : {result['construct_s'] * 1e6:8.1f} us | "
+              f"matplotlib importé : {'oui' if result['matplotlib_imported'] else 'non'}")
+
+    for name, probe, model_path in (("DQN.load", _POLICY_PROBE, "src/models/hero_agent"),
+                                    ("NumpyPolicy", _NUMPY_PROBE, "src/models/hero_policy.npz")):
+        elapsed, torch_loaded = measure_policy(probe, model_path, args.repeats)
+        print(f"{name:<12} chargement + 1re action : {elapsed * 1e3:8.1f} ms | "
+              f"torch importé : {'oui' if torch_loaded else 'non'}")
+
+if __name__ == "__main__":
+    main()
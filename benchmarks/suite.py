@@ -0,0 +1,289 @@
+"""
+Suite de benchmarks des chemins critiques (environnement, inférence, entraînement), sans GPU ni réseau.
+
+Les mesures utilisent des graines fixes et sont écrites en JSON, puis comparées à une référence versionnée
+(benchmarks/baseline.json). Une métrique régresse si elle se dégrade de plus de `--threshold` (20% par défaut) :
+les débits (`*_per_s`) doivent rester au-dessus de la référence, les latences et durées (`*_us`) en dessous.
+
+Usage :
+    python -m benchmarks.suite                      # mesure et compare à la référence
+    python -m benchmarks.suite --only env predict   # seulement certains groupes
+    python -m benchmarks.suite --update-baseline    # remplace la référence par les mesures
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+import numpy as np
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+MODEL_PATH = "src/models/hero_agent"
+NUMPY_POLICY_PATH = "src/models/hero_policy.npz"
+SEED = 0
+
+def _timeit(fn, n):
+    """
+    Durée moyenne d'un appel à `fn`, en secondes, sur `n` appels.
+    """
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n
+
+def _latencies(fn, n, warmup=50):
+    """
+    Latences individuelles de `n` appels à `fn` (après `warmup` appels), en microsecondes.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return samples * 1e6
+
+def bench_env(scale):
+    """
+    Débit de GameEnv.step (grille 10x10, puis grille 100x100 à 50 monstres en observation "egocentric") et de
+    VecGameEnv.step, coût de _get_obs et de reset.
+    """
+    from src.env import GameEnv
+    from src.vec_env import VecGameEnv
+
+    np.random.seed(SEED) #actions
+    env = GameEnv()
+    env.reset(seed=SEED)
+    actions = np.random.randint(0, 5, size=10000)
+    n_steps = 20000 * scale
+    start = time.perf_counter()
+    for i in range(n_steps):
+        _, _, done, _ = env.step(actions[i % len(actions)])
+        if done:
+            env.reset()
+    single = n_steps / (time.perf_counter() - start)
+
+    results = {
+        "env_single_steps_per_s": single,
+        "env_get_obs_us": _timeit(env._get_obs, 20000 * scale) * 1e6,
+        "env_reset_us": _timeit(env.reset, 5000 * scale) * 1e6,
+    }
+
+    large_env = GameEnv(grid_size=100, n_monsters=50, observation="egocentric")
+    large_env.reset(seed=SEED)
+    n_steps = 5000 * scale
+    start = time.perf_counter()
+    for i in range(n_steps):
+        _, _, done, _ = large_env.step(actions[i % len(actions)])
+        if done:
+            large_env.reset()
+    results["env_large_steps_per_s"] = n_steps / (time.perf_counter() - start)
+
+    for n_envs in (64, 1024):
+        vec_env = VecGameEnv(num_envs=n_envs, seed=SEED)
+        vec_env.reset()
+        vec_actions = np.random.randint(0, 5, size=(16, n_envs))
+        n_steps = max(20, 200000 * scale // n_envs)
+        start = time.perf_counter()
+        for i in range(n_steps):
+            vec_env.step(vec_actions[i % 16])
+        results[f"vec_env_{n_envs}_steps_per_s"] = n_steps * n_envs / (time.perf_counter() - start)
+    results["vec_env_1024_reset_us"] = _timeit(vec_env.reset, 50 * scale) * 1e6
+    return results
+
+def bench_profiling(scale):
+    """
+    Coût du profiling sur GameEnv.step : débit sans profiler (chemin par défaut, qui doit rester au niveau de
+    env_single_steps_per_s) et avec un PhaseProfiler actif, mesurés sur la même séquence d'actions.
+    """
+    from src.env import GameEnv
+    from src.profiling import PhaseProfiler
+
+    actions = np.random.default_rng(SEED).integers(0, 5, size=10000)
+    n_steps = 20000 * scale
+    results = {}
+    for name, profiler in (("disabled", None), ("enabled", PhaseProfiler())):
+        env = GameEnv(profiler=profiler)
+        env.reset(seed=SEED)
+        start = time.perf_counter()
+        for i in range(n_steps):
+            _, _, done, _ = env.step(actions[i % len(actions)])
+            if done:
+                env.reset()
+        results[f"profiling_{name}_steps_per_s"] = n_steps / (time.perf_counter() - start)
+    return results
+
+def bench_buffer(scale):
+    """
+    Coût d'un ajout et d'un tirage (batch de 32, celui de DQN) pour le ReplayBuffer par défaut et CompactReplayBuffer,
+    et mémoire occupée par transition.
+    """
+    from stable_baselines3.common.buffers import ReplayBuffer
+    from src.replay_buffer import CompactReplayBuffer
+    from src.vec_env import VecGameEnv
+
+    env = VecGameEnv(num_envs=1, seed=SEED)
+    obs = env.reset()
+    next_obs, _, _, _ = env.step(np.array([0]))
+    results = {}
+    for name, cls in (("default", ReplayBuffer), ("compact", CompactReplayBuffer)):
+        np.random.seed(SEED)
+        buffer = cls(100000, env.observation_space, env.action_space, device="cpu")
+        add = lambda: buffer.add(obs, next_obs, np.array([1]), np.array([-0.1]), np.array([False]), [{}])
+        results[f"buffer_{name}_add_us"] = _timeit(add, 20000 * scale) * 1e6
+        results[f"buffer_{name}_sample32_us"] = _timeit(lambda: buffer.sample(32), 5000 * scale) * 1e6
+        arrays = [buffer.observations, buffer.next_observations, buffer.actions, buffer.rewards, buffer.dones,
+                  buffer.timeouts]
+        results[f"buffer_{name}_bytes_per_transition"] = sum(a.nbytes for a in arrays) / buffer.buffer_size
+    return results
+
+def bench_predict(scale):
+    """
+    Latence de DQN.predict et de NumpyPolicy.predict pour une observation et pour un batch de 256 (p50 et p99).
+    """
+    import torch
+    from stable_baselines3 import DQN
+    from src.numpy_policy import NumpyPolicy
+
+    torch.set_num_threads(1)
+    model = DQN.load(MODEL_PATH, device="cpu")
+    rng = np.random.default_rng(SEED)
+    single = rng.random(106).astype(np.float32)
+    batch = rng.random((256, 106)).astype(np.float32)
+
+    results = {}
+    for name, obs in (("single", single), ("batch256", batch)):
+        samples = _latencies(lambda: model.predict(obs, deterministic=True), 2000 * scale)
+        results[f"predict_{name}_p50_us"] = float(np.percentile(samples, 50))
+        results[f"predict_{name}_p99_us"] = float(np.percentile(samples, 99))
+
+    numpy_policy = NumpyPolicy.load(NUMPY_POLICY_PATH)
+    for name, obs in (("single", single), ("batch256", batch)):
+        samples = _latencies(lambda: numpy_policy.predict(obs), 2000 * scale)
+        results[f"numpy_predict_{name}_p50_us"] = float(np.percentile(samples, 50))
+        results[f"numpy_predict_{name}_p99_us"] = float(np.percentile(samples, 99))
+    return results
+
+def bench_train(scale):
+    """
+    Débit de DQN.learn (collecte + mises à jour) sur un budget fixe, avec un env et avec VecGameEnv.
+    """
+    import torch
+    from stable_baselines3 import DQN
+    from src.train import make_training_env
+
+    torch.set_num_threads(1)
+    results = {}
+    for n_envs, vec_env in ((1, "dummy"), (8, "native")):
+        env = make_training_env(n_envs=n_envs, vec_env=vec_env, seed=SEED)
+        model = DQN("MlpPolicy", env, seed=SEED, device="cpu", learning_starts=500, verbose=0,
+                    train_freq=max(1, 4 // n_envs), gradient_steps=max(1, n_envs // 4))
+        total_timesteps = 5000 * scale
+        start = time.perf_counter()
+        model.learn(total_timesteps=total_timesteps)
+        results[f"train_{n_envs}env_{vec_env}_steps_per_s"] = model.num_timesteps / (time.perf_counter() - start)
+        env.close()
+    return results
+
+BENCHMARKS = {"env": bench_env, "profiling": bench_profiling, "buffer": bench_buffer, "predict": bench_predict,
+              "train": bench_train}
+
+def _best(name, values):
+    return max(values) if name.endswith("_per_s") else min(values)
+
+def run(only=None, scale=1, repeats=3):
+    """
+    Lance les groupes de benchmarks demandés.
+
+    Chaque groupe est répété `repeats` fois et on garde la meilleure valeur de chaque métrique, moins sensible
+    aux perturbations passagères de la machine qu'une mesure unique.
+
+    Args:
+        only (list, optional): Noms des groupes (clés de BENCHMARKS), tous par défaut.
+        scale (int): Multiplie le nombre d'itérations (mesures plus stables mais plus longues).
+        repeats (int): Nombre de répétitions de chaque groupe.
+
+    Returns:
+        dict: {"metrics": {nom: valeur}, "meta": {...}}.
+    """
+    metrics = {}
+    for name in only or BENCHMARKS:
+        print(f"[{name}] ...", flush=True)
+        runs = [BENCHMARKS[name](scale) for _ in range(repeats)]
+        metrics.update({metric: _best(metric, [r[metric] for r in runs]) for metric in runs[0]})
+    meta = {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+            "processor": platform.processor(), "cpu_count": os.cpu_count(), "scale": scale, "repeats": repeats}
+    return {"metrics": metrics, "meta": meta}
+
+def compare(metrics, baseline, threshold):
+    """
+    Compare les mesures à la référence.
+
+    Args:
+        metrics (dict): Mesures courantes.
+        baseline (dict): Mesures de référence.
+        threshold (float): Dégradation relative tolérée (0.2 = 20%).
+
+    Returns:
+        list: Noms des métriques en régression.
+    """
+    regressions = []
+    print(f"\n{'métrique':<36}{'référence':>14}{'mesure':>14}{'écart':>9}")
+    for name, value in metrics.items():
+        if name not in baseline:
+            print(f"{name:<36}{'-':>14}{value:>14.1f}{'nouveau':>9}")
+            continue
+        reference = baseline[name]
+        change = (value - reference) / reference
+        worse = -change if name.endswith("_per_s") else change #débit : plus haut = mieux, sinon plus bas = mieux
+        flag = " REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<36}{reference:>14.1f}{value:>14.1f}{change * 100:>+8.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="groupes de benchmarks à lancer")
+    parser.add_argument("--scale", type=int, default=1, help="multiplicateur du nombre d'itérations")
+    parser.add_argument("--repeats", type=int, default=3, help="répétitions par groupe (meilleure valeur gardée)")
+    parser.add_argument("--output", default="bench_results.json", help="fichier JSON des mesures")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="fichier JSON de référence")
+    parser.add_argument("--threshold", type=float, default=0.2, help="dégradation relative tolérée")
+    parser.add_argument("--update-baseline", action="store_true", help="écrit les mesures comme nouvelle référence")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    results = run(args.only, args.scale, args.repeats)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Mesures écrites dans {args.output}")
+
+    if args.update_baseline:
+        baseline = {"metrics": {}, "meta": results["meta"]}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline["metrics"] = json.load(f)["metrics"]
+        baseline["metrics"].update(results["metrics"])
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Référence mise à jour : {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"Pas de référence ({args.baseline}) : lancez avec --update-baseline")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)["metrics"]
+    regressions = compare(results["metrics"], baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold * 100:.0f}% : {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nAucune régression.")
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,32 @@ from src.train import train_agent
 from src.test import test_agent
 from src.visualisation import test_agent_obs
 
+TRAJECTORY_PATH = "trajectories/test_agent" #épisodes joués par l'option 2, rejoués par l'option 6
+
 if __name__ == "__main__":
     print("1 -> Train Agent")
     print("2 -> Test Agent")
     print("3 -> Show Test Example")
+    print("4 -> Train Tabular Agent (Q-Learning)")
+    print("5 -> Export Agent to NumPy")
+    print("6 -> Replay Logged Test Episode")
     choice = input("Choose an option:")
 
     if choice == "1":
         train_agent()
     elif choice == "2":
-        test_agent()
+        test_agent(trajectory_path=TRAJECTORY_PATH)
     elif choice == "3":
         test_agent_obs()
+    elif choice == "4":
+        from src.tabular import train_tabular
+        train_tabular()
+    elif choice == "5":
+        from src.numpy_policy import export_policy
+        print(f"Politique exportée : {export_policy()}")
+    elif choice == "6":
+        from src.trajectory import TrajectoryLog
+        log = TrajectoryLog(TRAJECTORY_PATH)
+        log.render(int(input(f"Episode (0-{len(log) - 1}):")))
     else:
         print("Invalid choice.")
@@ -0,0 +1,345 @@
+"""
+Simulation NumPy de N plateaux de jeu, sans dépendance à stable-baselines3 (ni à torch).
+
+`BatchGameEnv` porte toute la logique de `VecGameEnv` : l'évaluation (`src/evaluation.py`) l'utilise directement, ce
+qui permet d'évaluer une politique NumPy sans importer stable-baselines3. `VecGameEnv` (`src/vec_env.py`) n'y ajoute
+que l'interface VecEnv attendue par stable-baselines3 pour l'entraînement. `MultiGameEnv` offre la même interface
+pour les configurations que BatchGameEnv ne simule pas (autre grille, autre nombre de monstres, observation
+"egocentric"), avec un GameEnv par plateau.
+"""
+import numpy as np
+from gymnasium import spaces
+from src.env import GameEnv, build_move_tables
+
+#déplacements du héros, indexés par action : 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT, 4=STAY
+HERO_MOVES = np.array([[-1, 0], [1, 0], [0, -1], [0, 1], [0, 0]], dtype=np.int64)
+
+class BatchGameEnv:
+    """
+    N plateaux de GameEnv simulés en une seule passe NumPy, avec l'interface d'un VecEnv (reset, step).
+
+    Toutes les positions sont stockées dans des tableaux de forme (N, ...) et chaque étape (déplacements,
+    collisions, récompenses, fins de partie, observations) est calculée pour tous les plateaux à la fois.
+    Les plateaux terminés sont réinitialisés automatiquement, comme avec un DummyVecEnv de GameEnv.
+
+    La sémantique des récompenses et des fins de partie est strictement celle de `GameEnv.step`, ce qui permet
+    de l'utiliser directement à la place de `GameEnv` (dans `train_agent`, via `VecGameEnv`).
+
+    Attributes:
+        grid_size (int): Taille de la grille (10x10).
+        n_monsters (int): Nombre de monstres par plateau.
+        monster_moves (str): Loi des déplacements des monstres, "compat" ou "uniform" (voir GameEnv).
+        hero_pos (np.ndarray): Positions des héros, forme (N, 2).
+        treasure_pos (np.ndarray): Positions des trésors, forme (N, 2).
+        monsters_pos (np.ndarray): Positions des monstres, forme (N, n_monsters, 2).
+        step_count (np.ndarray): Nombre d'étapes de l'épisode en cours pour chaque plateau.
+        np_random (np.random.Generator): Générateur aléatoire propre à l'environnement.
+        profiler (PhaseProfiler, optional): Si défini, chronomètre chaque phase de `step_wait`.
+        num_envs (int): Nombre de plateaux.
+        observation_space (gymnasium.spaces.Box): Espace des observations d'un plateau.
+        action_space (gymnasium.spaces.Discrete): Espace des actions d'un plateau.
+    """
+    render_mode = None
+
+    def __init__(self, num_envs=8, seed=None, monster_moves="compat", profiler=None):
+        self.grid_size = 10
+        self.n_monsters = 3
+        if monster_moves not in ("compat", "uniform"):
+            raise ValueError(f"monster_moves doit valoir 'compat' ou 'uniform', pas {monster_moves!r}")
+        self.monster_moves = monster_moves
+        self.profiler = profiler
+        self.np_random = np.random.default_rng(seed)
+
+        self.num_envs = num_envs
+        self.observation_space = spaces.Box(low=0, high=1, shape=(106,), dtype=np.float32)
+        self.action_space = spaces.Discrete(5)
+
+        self.hero_pos = np.zeros((num_envs, 2), dtype=np.int64)
+        self.treasure_pos = np.zeros((num_envs, 2), dtype=np.int64)
+        self.monsters_pos = np.zeros((num_envs, self.n_monsters, 2), dtype=np.int64)
+        self.step_count = np.zeros(num_envs, dtype=np.int64)
+
+        #coordonnées de toutes les cases, pour le tirage des spawns
+        rows, cols = np.divmod(np.arange(self.grid_size * self.grid_size), self.grid_size)
+        self._cells = np.stack([rows, cols], axis=1)
+        self._rows = np.arange(num_envs)
+        self._neighbours, self._move_weights = build_move_tables(self.grid_size)
+        if monster_moves == "uniform":
+            self._move_weights = (self._neighbours >= 0).astype(np.int64)
+        self._far_from_treasure = np.zeros((num_envs, self.grid_size * self.grid_size), dtype=bool)
+
+        self.actions = None
+
+    def seed(self, seed=None):
+        """
+        Réinitialise le générateur aléatoire de l'environnement.
+
+        Args:
+            seed (int, optional): Graine du générateur.
+
+        Returns:
+            list: La graine utilisée, pour chaque plateau.
+        """
+        self.np_random = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def reset(self):
+        """
+        Reset tous les plateaux.
+
+        Returns:
+            np.ndarray: Observations initiales, forme (N, 106).
+        """
+        self._reset_boards(self._rows)
+        return self._get_obs()
+
+    def _reset_boards(self, idx):
+        """
+        Replace héros, trésor et monstres sur les plateaux d'indices `idx`.
+
+        Les contraintes de spawn sont celles de `GameEnv.reset` : chaque monstre est tiré uniformément parmi
+        les cases à une distance de Manhattan d'au moins 3 du héros et du trésor. Ce tirage direct parmi les cases
+        valides donne exactement la même loi que la boucle de rejet de GameEnv, sans boucle.
+
+        Args:
+            idx (np.ndarray): Indices des plateaux à réinitialiser.
+        """
+        k = len(idx)
+        if k == 0:
+            return
+        rng = self.np_random
+        hero = rng.integers(0, self.grid_size, size=(k, 2))
+        treasure = rng.integers(0, self.grid_size, size=(k, 2))
+
+        dist_hero = np.abs(self._cells[None] - hero[:, None]).sum(axis=2)
+        dist_treasure = np.abs(self._cells[None] - treasure[:, None]).sum(axis=2)
+        valid = (dist_hero >= 3) & (dist_treasure >= 3) #implique aussi monstre != héros et monstre != trésor
+
+        #tirage uniforme du u-ième élément valide de chaque plateau (les monstres sont tirés indépendamment)
+        counts = valid.sum(axis=1)
+        u = rng.integers(0, counts[:, None], size=(k, self.n_monsters))
+        cumulative = valid.cumsum(axis=1)
+        cell_idx = (cumulative[:, None, :] > u[:, :, None]).argmax(axis=2)
+
+        self.hero_pos[idx] = hero
+        self.treasure_pos[idx] = treasure
+        self.monsters_pos[idx] = self._cells[cell_idx]
+        self._far_from_treasure[idx] = dist_treasure >= 3
+        self.step_count[idx] = 0
+
+    def _get_obs(self, idx=None):
+        """
+        Génère les observations des plateaux d'indices `idx` (tous par défaut), identiques à `GameEnv._get_obs`.
+
+        Returns:
+            np.ndarray: Observations, forme (len(idx), 106).
+        """
+        if idx is None:
+            idx = self._rows
+        n = self.grid_size
+        hero = self.hero_pos[idx]
+        treasure = self.treasure_pos[idx]
+        monsters = self.monsters_pos[idx]
+        rows = np.arange(len(idx))
+
+        obs = np.zeros((len(idx), 106), dtype=np.float32)
+        #même ordre d'écriture que GameEnv : héros, puis trésor, puis monstres
+        obs[rows, hero[:, 0] * n + hero[:, 1]] = 1
+        obs[rows, treasure[:, 0] * n + treasure[:, 1]] = 0.5
+        for m in range(self.n_monsters):
+            obs[rows, monsters[:, m, 0] * n + monsters[:, m, 1]] = -1
+
+        obs[:, n * n:n * n + 2] = (treasure - hero) / n
+        obs[:, n * n + 2:n * n + 5] = np.abs(hero[:, None] - monsters).sum(axis=2) / n
+        obs[:, n * n + 5] = np.abs(hero - treasure).sum(axis=1) <= 1
+        return obs
+
+    def step(self, actions):
+        """
+        Effectue une étape sur tous les plateaux (voir `step_wait`).
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def step_async(self, actions):
+        self.actions = actions
+
+    def step_wait(self):
+        """
+        Effectue une étape sur tous les plateaux avec les actions transmises par `step_async`.
+
+        Returns:
+            tuple: (observations, récompenses, dones, infos) au format VecEnv de stable-baselines3.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
+        self.step_count += 1
+        previous_hero_pos = self.hero_pos.copy()
+
+        #déplacement des héros
+        actions = np.asarray(self.actions, dtype=np.int64).reshape(self.num_envs)
+        np.clip(self.hero_pos + HERO_MOVES[actions], 0, self.grid_size - 1, out=self.hero_pos)
+        if profiler is not None:
+            profiler.lap("hero_move")
+
+        self._move_monsters()
+        if profiler is not None:
+            profiler.lap("monster_move")
+
+        #récompenses, dans le même ordre d'opérations que GameEnv.step
+        distances = np.abs(self.hero_pos[:, None] - self.monsters_pos).sum(axis=2)
+        collision = (distances == 1).any(axis=1)
+
+        rewards = np.full(self.num_envs, -0.1)
+        for m in range(self.n_monsters):
+            rewards -= np.where(distances[:, m] <= 2, 5.0, 0.0)
+
+        #distance euclidienne au trésor : on compare les carrés, ce qui donne le même ordre
+        previous_distance = ((previous_hero_pos - self.treasure_pos) ** 2).sum(axis=1)
+        current_distance = ((self.hero_pos - self.treasure_pos) ** 2).sum(axis=1)
+        rewards += np.where(current_distance < previous_distance, 3.0, -1.0)
+
+        success = (self.hero_pos == self.treasure_pos).all(axis=1) & ~collision
+        rewards[success] = 30
+        rewards[collision] = -10
+        dones = collision | success
+
+        infos = [{} if collision[i] else {"is_success": bool(success[i])} for i in range(self.num_envs)]
+        for info in infos:
+            info["TimeLimit.truncated"] = False
+        if profiler is not None:
+            profiler.lap("reward")
+
+        obs = self._get_obs()
+        if profiler is not None:
+            profiler.lap("get_obs")
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx):
+            for i in done_idx:
+                infos[i]["terminal_observation"] = obs[i].copy()
+                #positions finales (héros, trésor, monstres), perdues au reset automatique (voir src/trajectory.py)
+                infos[i]["terminal_state"] = (self.hero_pos[i].copy(), self.treasure_pos[i].copy(),
+                                              self.monsters_pos[i].copy())
+            self._reset_boards(done_idx)
+            obs[done_idx] = self._get_obs(done_idx)
+        if profiler is not None:
+            profiler.lap("reset")
+            profiler.count("steps", self.num_envs)
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def _move_monsters(self):
+        """
+        Déplace tous les monstres de tous les plateaux, avec un seul tirage par monstre.
+
+        Les cases voisines autorisées (pas sur le héros, à au moins 3 cases du trésor) sont lues dans les tables
+        précalculées ; en mode "compat", leurs poids et la probabilité de rester immobile reproduisent la loi
+        des 10 tentatives aléatoires de GameEnv.
+        """
+        n = self.grid_size
+        cells = self.monsters_pos[..., 0] * n + self.monsters_pos[..., 1] #(N, M)
+        hero_cells = self.hero_pos[:, 0] * n + self.hero_pos[:, 1]
+        candidates = self._neighbours[cells] #(N, M, 4)
+        far = self._far_from_treasure[self._rows[:, None, None], candidates]
+        legal = (candidates >= 0) & (candidates != hero_cells[:, None, None]) & far
+        weights = np.where(legal, self._move_weights[cells], 0)
+        total = weights.sum(axis=2)
+
+        u = self.np_random.random(size=cells.shape)
+        if self.monster_moves == "compat":
+            p_move = 1 - (1 - total / 9) ** 10
+            moved = u < p_move
+            u = np.divide(u, p_move, out=np.zeros_like(u), where=moved)
+        else:
+            moved = total > 0
+
+        choice = (weights.cumsum(axis=2) > (u * total)[..., None]).argmax(axis=2)
+        targets = np.take_along_axis(candidates, choice[..., None], axis=2)[..., 0]
+        self.monsters_pos[:] = np.where(moved[..., None], self._cells[targets], self.monsters_pos)
+        if self.profiler is not None:
+            self.profiler.count("monster_blocked", int(moved.size - moved.sum()))
+
+    def close(self):
+        pass
+
+class MultiGameEnv:
+    """
+    N GameEnv indépendants derrière l'interface de BatchGameEnv utilisée par `run_episodes` : reset et
+    réinitialisation automatique, `step_count`, positions de tous les plateaux, `_reset_boards` et `_get_obs`.
+
+    Les plateaux sont simulés un par un : bien plus lent que BatchGameEnv, mais valable pour toutes les
+    configurations de GameEnv (`grid_size`, `n_monsters`, `observation`...).
+
+    Attributes:
+        envs (list): Les GameEnv, un par plateau.
+        num_envs (int): Nombre de plateaux.
+        grid_size (int): Taille de la grille.
+        n_monsters (int): Nombre de monstres par plateau.
+        observation_space, action_space: Espaces d'un plateau.
+    """
+    render_mode = None
+
+    def __init__(self, num_envs=8, seed=None, profiler=None, **env_kwargs):
+        self.envs = [GameEnv(profiler=profiler, **env_kwargs) for _ in range(num_envs)]
+        if seed is not None:
+            for i, env in enumerate(self.envs):
+                env.seed(seed + i) #comme `make_env` : une graine par plateau
+        self.num_envs = num_envs
+        self.grid_size = self.envs[0].grid_size
+        self.n_monsters = self.envs[0].n_monsters
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        self._obs = np.zeros((num_envs,) + self.observation_space.shape, dtype=np.float32)
+
+    @property
+    def hero_pos(self):
+        return np.stack([env.hero_pos for env in self.envs])
+
+    @property
+    def treasure_pos(self):
+        return np.stack([env.treasure_pos for env in self.envs])
+
+    @property
+    def monsters_pos(self):
+        return np.stack([env.monsters_pos for env in self.envs])
+
+    @property
+    def step_count(self):
+        return np.array([env.step_count for env in self.envs])
+
+    def reset(self):
+        self._reset_boards(range(self.num_envs))
+        return self._get_obs()
+
+    def _reset_boards(self, idx):
+        for i in idx:
+            self._obs[i] = self.envs[i].reset()
+
+    def _get_obs(self, idx=None):
+        return self._obs.copy() if idx is None else self._obs[idx]
+
+    def step(self, actions):
+        """
+        Effectue une étape sur tous les plateaux ; les plateaux terminés sont réinitialisés comme dans BatchGameEnv.
+
+        Returns:
+            tuple: (observations, récompenses, dones, infos) au format VecEnv de stable-baselines3.
+        """
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, np.asarray(actions).reshape(self.num_envs))):
+            obs, rewards[i], dones[i], info = env.step(int(action))
+            info = dict(info, **{"TimeLimit.truncated": False})
+            if dones[i]:
+                info["terminal_observation"] = obs
+                info["terminal_state"] = (env.hero_pos.copy(), env.treasure_pos.copy(), env.monsters_pos.copy())
+                obs = env.reset()
+            self._obs[i] = obs
+            infos.append(info)
+        return self._obs.copy(), rewards, dones, infos
+
+    def close(self):
+        for env in self.envs:
+            env.close()
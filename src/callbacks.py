@@ -1,89 +1,545 @@
-from stable_baselines3.common.callbacks import BaseCallback
+from concurrent.futures import ThreadPoolExecutor
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList
+import multiprocessing as mp
+import numpy as np
+import os
+import queue
+import time
+import warnings
+from src.checkpoint import snapshot_model, write_checkpoint
+from src.numpy_policy import policy_arrays
+
+#format des enregistrements d'épisodes écrits sur disque par RewardTrackerCallback
+EPISODE_DTYPE = np.dtype([("reward", np.float64), ("length", np.int64), ("success", np.bool_)])
+
+def load_episode_log(path):
+    """
+    Relit un fichier d'épisodes écrit par RewardTrackerCallback.
+
+    Args:
+        path (str): Chemin du fichier.
+
+    Returns:
+        np.ndarray: Tableau structuré (champs "reward", "length", "success"), un enregistrement par épisode.
+    """
+    return np.fromfile(path, dtype=EPISODE_DTYPE)
+
+class RingBuffer:
+    """
+    Buffer circulaire de taille fixe, avec la somme des `window` dernières valeurs tenue à jour à chaque ajout.
+
+    Attributes:
+        capacity (int): Nombre maximal de valeurs conservées.
+        window (int): Taille de la fenêtre de la moyenne mobile (au plus `capacity`).
+        total (int): Nombre total de valeurs ajoutées depuis la création.
+        window_sum (float): Somme des `window` dernières valeurs.
+    """
+    def __init__(self, capacity, window=100, dtype=np.float64):
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.total = 0
+        self.window_sum = 0.0
+
+    def _slice(self, start, stop):
+        return self.data[np.arange(start, stop) % self.capacity]
+
+    def extend(self, values):
+        """
+        Ajoute un lot de valeurs, en mettant à jour la somme de la fenêtre sans la recalculer.
+        """
+        values = np.asarray(values, dtype=self.data.dtype)
+        k = len(values)
+        if k == 0:
+            return
+        w = self.window
+        if k >= w:
+            self.window_sum = float(values[-w:].sum())
+        else:
+            #valeurs qui sortent de la fenêtre, lues avant d'être écrasées (capacity >= window)
+            start, stop = max(0, self.total - w), self.total + k - w
+            if stop > start:
+                self.window_sum -= float(self._slice(start, stop).sum())
+            self.window_sum += float(values.sum())
+
+        values = values[-self.capacity:]
+        self.data[np.arange(self.total + k - len(values), self.total + k) % self.capacity] = values
+        self.total += k
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def values(self):
+        """
+        Renvoie les valeurs conservées, de la plus ancienne à la plus récente.
+        """
+        return self._slice(self.total - len(self), self.total)
+
+    def mean(self):
+        """
+        Moyenne mobile des `window` dernières valeurs (0 si le buffer est vide).
+        """
+        return self.window_sum / min(self.total, self.window) if self.total else 0.0
 
 class RewardTrackerCallback(BaseCallback):
     """
     Callback personnalisé pour suivre les performances d'un agent pendant l'entraînement.
 
-    Métriques retenues : 
+    Métriques retenues :
     - Les récompenses cumulées par épisode.
     - La longueur des épisodes (en nombre de pas).
     - Le taux de succès (si une condition de réussite est définie dans l'environnement).
 
     Notes :
-    - La collecte des données se fait à chaque étape via la méthode `_on_step`.
+    - La collecte des données se fait à chaque étape via la méthode `_on_step`, pour tous les environnements
+      d'un environnement vectorisé à la fois.
     - Les métriques sont automatiquement réinitialisées à la fin de chaque épisode.
+    - La mémoire est constante : seuls les `capacity` derniers épisodes sont conservés (buffers circulaires).
+      Pour garder tout l'historique, les épisodes peuvent être écrits sur disque par blocs (`log_path`).
 
     Attributs:
-        episode_rewards (list): Récompenses cumulées pour chaque épisode.
-        episode_lengths (list): Nombre de pas par épisode.
-        success_rate (list): Taux de succès cumulé par épisode.
-        current_rewards (float): Récompense cumulée pour l'épisode en cours.
-        current_length (int): Longueur actuelle de l'épisode (en pas).
+        episode_rewards (np.ndarray): Récompenses cumulées des derniers épisodes.
+        episode_lengths (np.ndarray): Nombre de pas des derniers épisodes.
+        success_rate (np.ndarray): Taux de succès cumulé après chacun des derniers épisodes.
+        current_rewards (np.ndarray): Récompense cumulée de l'épisode en cours, pour chaque environnement.
+        current_length (np.ndarray): Longueur actuelle de l'épisode en cours (en pas), pour chaque environnement.
         success_count (int): Nombre total de succès obtenus.
+        total_episodes (int): Nombre total d'épisodes terminés.
+        rolling_success_rate, rolling_reward, rolling_length (float): Moyennes mobiles sur `window` épisodes.
         exploration_actions (int): Compteur d'actions exploratoires.
         exploitation_actions (int): Compteur d'actions exploitatives.
         episode_exploration (list): Ratio d'exploration par épisode.
         episode_exploitation (list): Ratio d'exploitation par épisode.
     """
 
-    def __init__(self, verbose=0):
+    def __init__(self, verbose=0, capacity=100000, window=100, log_path=None, flush_every=1000):
         super(RewardTrackerCallback, self).__init__(verbose)
-        self.episode_rewards = []
-        self.episode_lengths = []
-        self.success_rate = []
-        self.current_rewards = 0
-        self.current_length = 0
+        self._rewards = RingBuffer(capacity, window)
+        self._lengths = RingBuffer(capacity, window, dtype=np.int64)
+        self._successes = RingBuffer(capacity, window, dtype=np.bool_)
+        self._success_rate = RingBuffer(capacity, window)
+        self.current_rewards = np.zeros(1)
+        self.current_length = np.zeros(1, dtype=np.int64)
         self.success_count = 0
 
+        #enregistrements en attente d'écriture sur disque, écrits par blocs de flush_every épisodes
+        self.log_path = log_path
+        self._pending = np.zeros(flush_every, dtype=EPISODE_DTYPE)
+        self._n_pending = 0
+
         self.exploration_actions = 0
         self.exploitation_actions = 0
         self.episode_exploration = []
         self.episode_exploitation = []
 
+    @property
+    def episode_rewards(self):
+        return self._rewards.values()
+
+    @property
+    def episode_lengths(self):
+        return self._lengths.values()
+
+    @property
+    def success_rate(self):
+        return self._success_rate.values()
+
+    @property
+    def total_episodes(self):
+        return self._rewards.total
+
+    @property
+    def rolling_success_rate(self):
+        return self._successes.mean()
+
+    @property
+    def rolling_reward(self):
+        return self._rewards.mean()
+
+    @property
+    def rolling_length(self):
+        return self._lengths.mean()
+
+    def _on_training_start(self) -> None:
+        #un accumulateur par environnement, alloué une fois
+        n_envs = self.training_env.num_envs
+        self.current_rewards = np.zeros(n_envs)
+        self.current_length = np.zeros(n_envs, dtype=np.int64)
+
     def _on_step(self) -> bool:
         """
-        - Incrémente les récompenses et le compteur de pas pour l'épisode en cours.
-        - Finalise les métriques à la fin de chaque épisode.
-        - Réinitialise les compteurs pour l'épisode suivant.
+        - Incrémente les récompenses et le compteur de pas de l'épisode en cours de chaque environnement.
+        - Finalise les métriques des épisodes terminés.
+        - Réinitialise les compteurs des environnements concernés pour l'épisode suivant.
 
         Returns:
             bool: Toujours True, ce qui permet de continuer l'entraînement.
         """
-        
+
         self.current_rewards += self.locals["rewards"]
         self.current_length += 1
 
         ####### non utilisée
         # verifie si l'action était exploratory ou exploitative
-        # epsilon = self.locals.get("epsilon", 0.1)  
+        # epsilon = self.locals.get("epsilon", 0.1)
         # if np.random.rand() < epsilon:
         #     self.exploration_actions += 1
         # else:
         #     self.exploitation_actions += 1
 
-        #si l'épisode est terminé on rajoute à la liste
-        if self.locals["dones"]:
-            self.episode_rewards.append(self.current_rewards)
-            self.episode_lengths.append(self.current_length)
-            
+        #si des épisodes sont terminés on les enregistre
+        dones = self.locals["dones"]
+        if dones.any():
+            finished = np.flatnonzero(dones)
+            infos = self.locals["infos"]
             #on vérifie si c'est succes ou echec
-            if self.locals["infos"][0].get("is_success", False):  # Check success
-                self.success_count += 1
+            successes = np.array([infos[i].get("is_success", False) for i in finished], dtype=bool)
+            self._record(self.current_rewards[finished], self.current_length[finished], successes)
 
-            #calcul du succes rate
-            total_episodes = len(self.episode_rewards)
-            self.success_rate.append(self.success_count / total_episodes)
+            #on reset pour la suite
+            self.current_rewards[finished] = 0
+            self.current_length[finished] = 0
 
-            # # exploration vs exploitation ratios
-            # total_actions = self.exploration_actions + self.exploitation_actions
-            # if total_actions > 0:
-            #     self.episode_exploration.append(self.exploration_actions / total_actions)
-            #     self.episode_exploitation.append(self.exploitation_actions / total_actions)
+        return True
 
-            #on reset pour la suite
-            self.current_rewards = 0
-            self.current_length = 0
-            self.exploration_actions = 0
-            self.exploitation_actions = 0
+    def _record(self, rewards, lengths, successes):
+        """
+        Ajoute un lot d'épisodes terminés aux buffers (et au fichier, si `log_path` est défini).
+        """
+        #calcul du succes rate cumulé après chaque épisode du lot
+        totals = self.total_episodes + np.arange(1, len(rewards) + 1)
+        rates = (self.success_count + np.cumsum(successes)) / totals
+        self.success_count += int(successes.sum())
+
+        self._rewards.extend(rewards)
+        self._lengths.extend(lengths)
+        self._successes.extend(successes)
+        self._success_rate.extend(rates)
+        self.logger.record("rollout/rolling_success_rate", self.rolling_success_rate)
+
+        if self.log_path is not None:
+            start = 0
+            while start < len(rewards):
+                n = min(len(rewards) - start, len(self._pending) - self._n_pending)
+                chunk = self._pending[self._n_pending:self._n_pending + n]
+                chunk["reward"] = rewards[start:start + n]
+                chunk["length"] = lengths[start:start + n]
+                chunk["success"] = successes[start:start + n]
+                self._n_pending += n
+                start += n
+                if self._n_pending == len(self._pending):
+                    self._flush()
+
+    def _flush(self):
+        """
+        Ajoute les enregistrements en attente à la fin du fichier d'épisodes.
+        """
+        if self.log_path is None or self._n_pending == 0:
+            return
+        with open(self.log_path, "ab") as f:
+            self._pending[:self._n_pending].tofile(f)
+        self._n_pending = 0
+
+    def _on_training_end(self) -> None:
+        self._flush()
+
+class ProfilingCallback(CallbackList):
+    """
+    Callback qui mesure comment `learn` répartit son temps entre collecte, mises à jour et callbacks.
+
+    Il enveloppe les autres callbacks (comme un CallbackList) pour chronométrer leur `_on_step`, et utilise les
+    bornes de chaque collecte pour mesurer :
+    - "rollout" : collecte des transitions (pas d'environnement, inférence et callbacks compris),
+    - "update" : temps entre la fin d'une collecte et le début de la suivante (mises à jour de gradient),
+    - "callbacks" : temps passé dans les callbacks enveloppés.
+
+    Toutes les `log_interval` transitions, la part de collecte et de mise à jour de l'intervalle est envoyée au
+    logger de stable-baselines3 (profile/rollout_s, profile/update_s, profile/rollout_fraction).
+
+    Attributes:
+        profiler (PhaseProfiler): Profiler qui reçoit les mesures.
+        log_interval (int): Intervalle de journalisation, en transitions.
+    """
+    def __init__(self, profiler, callbacks=(), log_interval=10000):
+        super(ProfilingCallback, self).__init__(list(callbacks))
+        self.profiler = profiler
+        self.log_interval = log_interval
+        self._rollout_start = None
+        self._rollout_end = None
+        self._interval = np.zeros(2) #temps de collecte et de mise à jour depuis la dernière journalisation
+        self._next_log = log_interval
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter()
+        if self._rollout_end is not None:
+            self._record("update", now - self._rollout_end, 1)
+        self._rollout_start = now
+        super(ProfilingCallback, self)._on_rollout_start()
+
+    def _on_rollout_end(self) -> None:
+        super(ProfilingCallback, self)._on_rollout_end()
+        now = time.perf_counter()
+        self._record("rollout", now - self._rollout_start, 0)
+        self._rollout_end = now
+
+        if self.num_timesteps >= self._next_log:
+            rollout, update = self._interval
+            self.logger.record("profile/rollout_s", rollout)
+            self.logger.record("profile/update_s", update)
+            self.logger.record("profile/rollout_fraction", rollout / max(rollout + update, 1e-12))
+            self._interval[:] = 0
+            self._next_log += self.log_interval
+
+    def _record(self, phase, seconds, slot):
+        self.profiler.record(phase, seconds)
+        self._interval[slot] += seconds
+
+    def _on_step(self) -> bool:
+        start = time.perf_counter()
+        result = super(ProfilingCallback, self)._on_step()
+        self.profiler.record("callbacks", time.perf_counter() - start)
+        return result
+
+    def _on_training_end(self) -> None:
+        if self._rollout_end is not None: #dernière mise à jour, qui n'est suivie d'aucune collecte
+            self._record("update", time.perf_counter() - self._rollout_end, 1)
+        super(ProfilingCallback, self)._on_training_end()
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Callback qui sauvegarde périodiquement l'état d'entraînement, l'écriture sur disque se faisant dans un thread.
+
+    Toutes les `save_freq` transitions, au début d'une collecte (l'état est alors cohérent : la collecte précédente
+    et ses mises à jour de gradient sont terminées), le modèle est copié en mémoire par `snapshot_model` dans le
+    thread d'entraînement, puis écrit et les anciens checkpoints supprimés par un thread dédié. Un seul checkpoint
+    est en cours d'écriture à la fois : si le précédent n'est pas fini, le suivant l'attend, ce qui borne la
+    mémoire utilisée. Une erreur d'écriture est relancée au checkpoint suivant ou en fin d'entraînement.
+
+    Attributes:
+        save_freq (int): Intervalle entre deux checkpoints, en transitions.
+        save_dir (str): Dossier des checkpoints (voir `src/checkpoint.py`).
+        keep_last (int): Nombre de checkpoints conservés.
+        save_replay_buffer (bool): Inclut le replay buffer dans les checkpoints.
+        last_checkpoint (str): Chemin du dernier checkpoint écrit.
+        snapshot_time (float): Temps total passé dans le thread d'entraînement (copie et attente), en secondes.
+    """
+    def __init__(self, save_freq, save_dir, keep_last=3, save_replay_buffer=False, verbose=0):
+        super(AsyncCheckpointCallback, self).__init__(verbose)
+        self.save_freq = save_freq
+        self.save_dir = save_dir
+        self.keep_last = keep_last
+        self.save_replay_buffer = save_replay_buffer
+        self.last_checkpoint = None
+        self.snapshot_time = 0.0
+        self._executor = None
+        self._pending = None
+
+    def _init_callback(self) -> None:
+        os.makedirs(self.save_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        #en reprise, num_timesteps ne part pas de 0
+        self._next_save = (self.num_timesteps // self.save_freq + 1) * self.save_freq
+        self._last_saved = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_start(self) -> None:
+        if self.num_timesteps >= self._next_save:
+            self._checkpoint()
+            self._next_save = (self.num_timesteps // self.save_freq + 1) * self.save_freq
+
+    def _checkpoint(self):
+        start = time.perf_counter()
+        self._wait()
+        snapshot = snapshot_model(self.model, self.save_replay_buffer)
+        self._pending = self._executor.submit(write_checkpoint, snapshot, self.save_dir, self.keep_last)
+        self._last_saved = self.num_timesteps
+        self.snapshot_time += time.perf_counter() - start
+
+    def _wait(self):
+        if self._pending is not None:
+            self.last_checkpoint = self._pending.result()
+            self._pending = None
+            if self.verbose > 0:
+                print(f"Checkpoint écrit : {self.last_checkpoint}")
+
+    def _on_training_end(self) -> None:
+        if self.num_timesteps != self._last_saved:
+            self._checkpoint()
+        self._wait()
+        self._executor.shutdown()
+
+class EarlyStoppingCallback(BaseCallback):
+    """
+    Callback qui interrompt un entraînement dont le taux de succès glissant est jugé insuffisant.
+
+    Toutes les `check_freq` transitions à partir de `grace_timesteps`, le taux de succès glissant d'un
+    RewardTrackerCallback (à placer avant celui-ci dans la liste des callbacks) est noté dans `history`, puis
+    soumis à `rule(timesteps, rate)`. Si la règle renvoie True, `learn` s'arrête.
+
+    Attributes:
+        tracker (RewardTrackerCallback): Source du taux de succès glissant.
+        check_freq (int): Intervalle entre deux vérifications, en transitions.
+        grace_timesteps (int): Transitions avant la première vérification.
+        rule (callable): Règle d'arrêt, appelée avec (num_timesteps du palier, taux de succès glissant).
+        history (list): Paliers vérifiés, [(num_timesteps, taux de succès glissant)].
+        stopped (bool): True si l'entraînement a été interrompu.
+    """
+    def __init__(self, tracker, check_freq, rule, grace_timesteps=0, verbose=0):
+        super(EarlyStoppingCallback, self).__init__(verbose)
+        self.tracker = tracker
+        self.check_freq = check_freq
+        self.rule = rule
+        self.grace_timesteps = grace_timesteps
+        self.history = []
+        self.stopped = False
+        self._next_check = max(check_freq, grace_timesteps)
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps < self._next_check:
+            return True
+        milestone = self._next_check #palier commun à tous les essais, quel que soit n_envs
+        self._next_check += self.check_freq
+        rate = float(self.tracker.rolling_success_rate)
+        self.history.append((milestone, rate))
+        if self.rule(milestone, rate):
+            self.stopped = True
+            if self.verbose > 0:
+                print(f"Arrêt anticipé à {self.num_timesteps} pas (taux de succès glissant {rate:.2f})")
+            return False
+        return True
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    Callback qui évalue périodiquement la politique greedy dans un processus séparé, sans bloquer l'entraînement.
+
+    Toutes les `eval_freq` transitions, au début d'une collecte, les poids du Q-network sont copiés en tableaux
+    NumPy (quelques dizaines de microsecondes) et envoyés au processus d'évaluation (`evaluation_worker` dans
+    `src/evaluation.py`), qui joue `n_eval_episodes` épisodes déterministes sur ses propres plateaux pendant que
+    l'entraînement continue : BatchGameEnv pour le plateau par défaut, des GameEnv construits avec `env_kwargs`
+    sinon. Les résultats sont relus sans attente au début des collectes suivantes, envoyés au
+    logger de stable-baselines3 (eval/mean_reward, eval/success_rate, eval/mean_ep_length, eval/timesteps) et
+    conservés dans `evaluations`. La meilleure politique est écrite par le worker dans `best_model_path`.
+
+    L'entraînement n'attend jamais l'évaluation : si le worker a déjà une évaluation en cours et une en attente, le
+    palier est sauté (`skipped`). Seule la fin de l'entraînement attend : une place pour la dernière évaluation,
+    celle des poids finaux (jamais sautée), puis les évaluations restantes. Le worker est lancé en "spawn" : le
+    script appelant doit être protégé par `if __name__ == "__main__":`, comme pour SubprocVecEnv.
+
+    Attributes:
+        eval_freq (int): Intervalle entre deux évaluations, en transitions.
+        n_eval_episodes (int): Nombre d'épisodes par évaluation.
+        n_envs (int): Nombre de plateaux simultanés du worker.
+        seed (int): Graine des évaluations (les mêmes parties à chaque évaluation).
+        max_episode_steps (int): Longueur maximale d'un épisode d'évaluation.
+        best_model_path (str, optional): Fichier .npz de la meilleure politique (voir `src/numpy_policy.py`).
+        env_kwargs (dict, optional): Configuration de GameEnv de l'entraînement (grid_size, n_monsters...).
+        evaluations (list): Évaluations reçues, [(num_timesteps des poids évalués, résumé)].
+        best_mean_reward (float): Meilleure récompense moyenne reçue.
+        best_timesteps (int): num_timesteps des poids de la meilleure évaluation.
+        skipped (int): Paliers sautés parce que le worker était occupé.
+        snapshot_time (float): Temps total passé dans le thread d'entraînement (copies et relevés), en secondes.
+    """
+    def __init__(self, eval_freq, n_eval_episodes=500, n_envs=256, seed=0, max_episode_steps=200,
+                 best_model_path=None, env_kwargs=None, verbose=0):
+        super(AsyncEvalCallback, self).__init__(verbose)
+        if best_model_path is not None and not best_model_path.endswith(".npz"):
+            raise ValueError("best_model_path doit être un fichier .npz")
+        self.eval_freq = eval_freq
+        self.n_eval_episodes = n_eval_episodes
+        self.n_envs = n_envs
+        self.seed = seed
+        self.max_episode_steps = max_episode_steps
+        self.best_model_path = best_model_path
+        self.env_kwargs = env_kwargs
+        self.evaluations = []
+        self.best_mean_reward = -np.inf
+        self.best_timesteps = None
+        self.skipped = 0
+        self.snapshot_time = 0.0
+        self._process = None
+        self._tasks = None
+        self._results = None
+        self._in_flight = 0 #évaluations envoyées dont le résultat n'est pas encore relu
+
+    def _init_callback(self) -> None:
+        from src.evaluation import evaluation_worker
+
+        if self.best_model_path is not None:
+            os.makedirs(os.path.dirname(self.best_model_path) or ".", exist_ok=True)
+        context = mp.get_context("spawn") #pas de fork d'un processus où torch a déjà lancé ses threads
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=evaluation_worker, name="evaluation", daemon=True,
+            args=(self._tasks, self._results, self.n_eval_episodes, self.n_envs, self.seed, self.max_episode_steps,
+                  self.best_model_path, self.env_kwargs))
+        self._process.start()
+        #en reprise, num_timesteps ne part pas de 0
+        self._next_eval = (self.num_timesteps // self.eval_freq + 1) * self.eval_freq
+        self._last_submitted = None
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _on_rollout_start(self) -> None:
+        start = time.perf_counter()
+        self._collect()
+        if self.num_timesteps >= self._next_eval:
+            self._submit()
+            self._next_eval = (self.num_timesteps // self.eval_freq + 1) * self.eval_freq
+        self.snapshot_time += time.perf_counter() - start
+
+    def _submit(self):
+        if self._in_flight >= 2: #une évaluation en cours et une en attente
+            self.skipped += 1
+            return
+        weights, biases, activations = policy_arrays(self.model)
+        #la sérialisation se fait dans le thread d'envoi de la file, pas dans celui de l'entraînement
+        self._tasks.put((self.num_timesteps, weights, biases, activations, self.model.observation_space.shape))
+        self._in_flight += 1
+        self._last_submitted = self.num_timesteps
+
+    def _collect(self, block=False, max_in_flight=0):
+        """
+        Relit les résultats disponibles ; avec `block`, attend qu'il ne reste pas plus de `max_in_flight`
+        évaluations en cours (tant que le worker est vivant).
+        """
+        while self._in_flight > (max_in_flight if block else 0):
+            try:
+                message = self._results.get(timeout=1.0) if block else self._results.get_nowait()
+            except queue.Empty:
+                if block and self._process.is_alive():
+                    continue
+                if block:
+                    warnings.warn("Le processus d'évaluation s'est arrêté avant d'envoyer tous ses résultats")
+                return
+            self._in_flight -= 1
+            if "error" in message:
+                warnings.warn(f"Échec de l'évaluation à {message['timesteps']} pas :\n{message['error']}")
+                continue
+            self._record(message)
+
+    def _record(self, message):
+        timesteps, summary = message["timesteps"], message["summary"]
+        self.evaluations.append((timesteps, summary))
+        if message["best"]:
+            self.best_mean_reward = summary["reward_mean"]
+            self.best_timesteps = timesteps
+        self.logger.record("eval/mean_reward", summary["reward_mean"])
+        self.logger.record("eval/success_rate", summary["success_rate"])
+        self.logger.record("eval/mean_ep_length", summary["length_mean"])
+        self.logger.record("eval/timesteps", timesteps)
+        self.logger.record("eval/duration_s", message["duration_s"])
+        if self.verbose > 0:
+            print(f"Évaluation à {timesteps} pas : récompense moyenne {summary['reward_mean']:.2f}, "
+                  f"succès {summary['success_rate'] * 100:.1f}%{' (meilleure)' if message['best'] else ''}")
 
-        return True
\ No newline at end of file
+    def _on_training_end(self) -> None:
+        if self._last_submitted != self.num_timesteps:
+            self._collect(block=True, max_in_flight=1) #libère une place : les poids finaux ne sont jamais sautés
+            self._submit()
+        self._collect(block=True)
+        self._tasks.put(None)
+        self._process.join(timeout=10)
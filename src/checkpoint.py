@@ -0,0 +1,142 @@
+import io
+import json
+import os
+import re
+import shutil
+import time
+import numpy as np
+
+CHECKPOINT_PATTERN = re.compile(r"^step_(\d+)$")
+#tableaux du replay buffer de stable-baselines3 sauvegardés avec le checkpoint (next_observations vaut None
+#avec optimize_memory_usage, il est alors ignoré)
+REPLAY_BUFFER_ARRAYS = ("observations", "next_observations", "actions", "rewards", "dones", "timeouts")
+
+def snapshot_model(model, save_replay_buffer=False):
+    """
+    Copie en mémoire l'état d'entraînement d'un modèle, pour l'écrire ensuite sans bloquer l'entraînement.
+
+    Le modèle est sérialisé par `model.save` dans un buffer en mémoire : poids, état de l'optimiseur, compteurs
+    (num_timesteps, nombre de mises à jour...) et position dans le planning d'exploration. Seules les lignes
+    remplies du replay buffer sont copiées.
+
+    Args:
+        model: Modèle stable-baselines3 (DQN).
+        save_replay_buffer (bool): Copie aussi le replay buffer.
+
+    Returns:
+        dict: {"model": bytes, "replay_buffer": dict ou None, "meta": dict}.
+    """
+    model_bytes = io.BytesIO()
+    model.save(model_bytes)
+
+    replay_buffer = None
+    if save_replay_buffer:
+        buffer = model.replay_buffer
+        n_rows = buffer.buffer_size if buffer.full else buffer.pos
+        replay_buffer = {name: getattr(buffer, name)[:n_rows].copy() for name in REPLAY_BUFFER_ARRAYS
+                         if getattr(buffer, name, None) is not None}
+        replay_buffer["pos"] = np.array(buffer.pos)
+        replay_buffer["full"] = np.array(buffer.full)
+
+    meta = {"num_timesteps": int(model.num_timesteps), "total_timesteps": int(model._total_timesteps),
+            "n_envs": int(model.n_envs), "exploration_rate": float(model.exploration_rate),
+            "replay_buffer": save_replay_buffer, "created": time.time()}
+    return {"model": model_bytes.getvalue(), "replay_buffer": replay_buffer, "meta": meta}
+
+def write_checkpoint(snapshot, save_dir, keep_last=3):
+    """
+    Écrit un checkpoint sur disque puis supprime les plus anciens.
+
+    Le checkpoint est d'abord écrit dans un dossier temporaire, renommé une fois complet : un arrêt brutal
+    pendant l'écriture ne laisse jamais de checkpoint partiel parmi ceux que `latest_checkpoint` peut choisir.
+
+    Args:
+        snapshot (dict): Copie renvoyée par `snapshot_model`.
+        save_dir (str): Dossier des checkpoints.
+        keep_last (int, optional): Nombre de checkpoints conservés (tous si None).
+
+    Returns:
+        str: Chemin du checkpoint écrit (`save_dir/step_<num_timesteps>`).
+    """
+    path = os.path.join(save_dir, f"step_{snapshot['meta']['num_timesteps']:010d}")
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    _write_file(os.path.join(tmp_path, "model.zip"), snapshot["model"])
+    if snapshot["replay_buffer"] is not None:
+        with open(os.path.join(tmp_path, "replay_buffer.npz"), "wb") as f:
+            np.savez(f, **snapshot["replay_buffer"])
+            f.flush()
+            os.fsync(f.fileno())
+    _write_file(os.path.join(tmp_path, "meta.json"), json.dumps(snapshot["meta"], indent=2).encode())
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    if keep_last is not None:
+        for old in list_checkpoints(save_dir)[:-keep_last]:
+            shutil.rmtree(old, ignore_errors=True)
+    return path
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+def list_checkpoints(save_dir):
+    """
+    Checkpoints complets de `save_dir`, du plus ancien au plus récent.
+    """
+    if not os.path.isdir(save_dir):
+        return []
+    names = [name for name in os.listdir(save_dir) if CHECKPOINT_PATTERN.match(name)]
+    names.sort(key=lambda name: int(CHECKPOINT_PATTERN.match(name).group(1)))
+    return [os.path.join(save_dir, name) for name in names]
+
+def latest_checkpoint(save_dir):
+    """
+    Chemin du checkpoint le plus récent de `save_dir`, ou None s'il n'y en a pas.
+    """
+    checkpoints = list_checkpoints(save_dir)
+    return checkpoints[-1] if checkpoints else None
+
+def load_checkpoint(path, env, device="auto"):
+    """
+    Recharge un modèle DQN depuis un checkpoint pour reprendre son entraînement.
+
+    Les compteurs sont restaurés tels quels : pour finir un entraînement de `total_timesteps` pas, appeler
+    `model.learn(total_timesteps - model.num_timesteps, reset_num_timesteps=False)`, ce qui retrouve le même
+    total et donc le même planning d'exploration. L'environnement repart d'un reset : l'épisode en cours au
+    moment du checkpoint est perdu.
+
+    Args:
+        path (str): Dossier du checkpoint.
+        env (VecEnv): Environnement d'entraînement.
+        device (str): Appareil torch.
+
+    Returns:
+        tuple: (modèle DQN, métadonnées du checkpoint).
+    """
+    from stable_baselines3 import DQN
+
+    model = DQN.load(os.path.join(path, "model.zip"), env=env, device=device)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+
+    replay_buffer_path = os.path.join(path, "replay_buffer.npz")
+    if os.path.exists(replay_buffer_path):
+        buffer = model.replay_buffer
+        with np.load(replay_buffer_path) as saved:
+            for name in REPLAY_BUFFER_ARRAYS:
+                if name not in saved or getattr(buffer, name, None) is None:
+                    continue
+                rows = saved[name]
+                target = getattr(buffer, name)
+                if rows.shape[1:] != target.shape[1:] or len(rows) > len(target):
+                    raise ValueError(f"Replay buffer du checkpoint incompatible ({name} : {rows.shape} pour "
+                                     f"{target.shape}) : n_envs et buffer_size doivent être inchangés")
+                target[:len(rows)] = rows
+            buffer.pos = int(saved["pos"])
+            buffer.full = bool(saved["full"])
+    return model, meta
@@ -1,8 +1,109 @@
+import os
 import numpy as np
-import matplotlib.pyplot as plt
 import gym
 from gym import spaces
-from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+_SPRITES = None #images décodées une seule fois par processus et partagées entre toutes les instances
+
+def load_sprites():
+    """
+    Décode les images du héros, du trésor et des monstres au premier appel, puis renvoie le cache.
+
+    matplotlib n'est importé qu'ici : un environnement qui n'est jamais rendu (entraînement, workers)
+    ne paie ni l'import ni le décodage des PNG.
+
+    Returns:
+        dict: Images indexées par "hero", "treasure" et "monster".
+    """
+    global _SPRITES
+    if _SPRITES is None:
+        import matplotlib.pyplot as plt
+        _SPRITES = {name: plt.imread(os.path.join(ASSETS_DIR, f"{name}.png")) for name in ("hero", "treasure", "monster")}
+    return _SPRITES
+
+def to_gymnasium(env):
+    """
+    Enveloppe un GameEnv dans l'adaptateur gym 0.21 de shimmy, pour stable-baselines3.
+
+    À utiliser au lieu de passer le GameEnv tel quel (`DQN("MlpPolicy", to_gymnasium(GameEnv()))`) : comme
+    `reset` accepte `seed`, stable-baselines3 prendrait GameEnv pour un environnement gym 0.26 et attendrait
+    (obs, info) de `reset` et 5 valeurs de `step`. L'adaptateur gym 0.21 appelle `seed` puis `reset()`.
+    shimmy n'est importé qu'ici, l'environnement lui-même reste utilisable sans stable-baselines3.
+
+    Args:
+        env (GameEnv): Environnement à envelopper.
+
+    Returns:
+        shimmy.GymV21CompatibilityV0: Environnement gymnasium, à passer à stable-baselines3.
+    """
+    from shimmy import GymV21CompatibilityV0
+    return GymV21CompatibilityV0(env=env)
+
+def build_move_tables(grid_size):
+    """
+    Précalcule les déplacements possibles des monstres depuis chaque case de la grille.
+
+    Pour chaque case (indice aplati `ligne * grid_size + colonne`), on stocke ses 4 voisines (haut, bas, gauche,
+    droite) et un poids de compatibilité : le nombre de décalages de {-1, 0, 1}² qui, une fois ramenés dans
+    la grille par np.clip, mènent à cette voisine. C'est la loi d'une tentative de l'ancien tirage par rejet.
+
+    Args:
+        grid_size (int): Taille de la grille.
+
+    Returns:
+        tuple: (neighbours, compat_weights), deux tableaux de forme (grid_size², 4). Les voisines hors grille
+        valent -1 et ont un poids nul.
+    """
+    rows, cols = np.divmod(np.arange(grid_size * grid_size), grid_size)
+    cells = np.stack([rows, cols], axis=1)
+    moves = np.array([[-1, 0], [1, 0], [0, -1], [0, 1]])
+    offsets = np.array([[dr, dc] for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+
+    targets = cells[:, None] + moves[None] #(cases, 4, 2)
+    inside = ((targets >= 0) & (targets < grid_size)).all(axis=2)
+    neighbours = np.where(inside, targets[..., 0] * grid_size + targets[..., 1], -1)
+
+    clipped = np.clip(cells[:, None] + offsets[None], 0, grid_size - 1) #(cases, 9, 2)
+    compat_weights = (clipped[:, :, None] == targets[:, None]).all(axis=3).sum(axis=1)
+    return neighbours, compat_weights
+
+#déplacements des monstres (haut, bas, gauche, droite)
+MOVE_OFFSETS = np.array([[-1, 0], [1, 0], [0, -1], [0, 1]])
+#au-delà, les monstres sont tirés par rejet au lieu d'énumérer toutes les cases de la grille à chaque reset
+SPAWN_MASK_MAX_CELLS = 1024
+#au-delà, les déplacements des monstres sont calculés en une passe NumPy plutôt que monstre par monstre
+VECTORIZED_MONSTERS = 8
+
+def cell_moves(row, col, grid_size, compat=True):
+    """
+    Déplacements possibles d'un monstre depuis la case (row, col), calculés à la demande.
+
+    Même résultat que la ligne de `build_move_tables` de cette case, sans construire de table de grid_size²
+    lignes : pour une voisine verticale, seuls les décalages de colonne varient une fois ramenés dans la grille,
+    d'où un poids de 1 + (colonne au bord gauche) + (colonne au bord droit) ; de même pour une voisine horizontale.
+
+    Args:
+        row, col (int): Case de départ.
+        grid_size (int): Taille de la grille.
+        compat (bool): Poids de compatibilité si True, poids uniformes sinon.
+
+    Returns:
+        list: Tuples (ligne, colonne, poids) des voisines dans la grille, dans l'ordre haut, bas, gauche, droite.
+    """
+    last = grid_size - 1
+    col_weight = 1 + (col == 0) + (col == last) if compat else 1
+    row_weight = 1 + (row == 0) + (row == last) if compat else 1
+    moves = []
+    if row > 0:
+        moves.append((row - 1, col, col_weight))
+    if row < last:
+        moves.append((row + 1, col, col_weight))
+    if col > 0:
+        moves.append((row, col - 1, row_weight))
+    if col < last:
+        moves.append((row, col + 1, row_weight))
+    return moves
 
 class GameEnv(gym.Env):
     """
@@ -12,20 +113,62 @@ class GameEnv(gym.Env):
     Le héros peut se déplacer sur une grille, collecter des observations sur son état actuel et recevoir des
     récompenses en fonction de ses actions.
 
+    Deux observations sont possibles :
+    - "grid" (par défaut) : la grille entière aplatie, la position relative du trésor, la distance à chaque monstre
+      et l'indicateur de proximité au trésor, soit grid_size² + 3 + n_monsters valeurs (106 sur la grille 10x10
+      à 3 monstres du modèle sauvegardé).
+    - "egocentric" : une fenêtre de (2 * view_radius + 1)² cases centrée sur le héros, les cases hors grille,
+      la position relative du trésor, la position du héros et les k monstres les plus proches. La taille ne dépend
+      ni de la grille ni du nombre de monstres, ce qui permet des cartes de 100x100 et plus avec le même réseau.
+
     Attributes:
         grid_size (int): Taille de la grille (par défaut 10x10).
+        n_monsters (int): Nombre de monstres (par défaut 3).
+        observation (str): Type d'observation, "grid" ou "egocentric".
+        view_radius (int): Rayon de la fenêtre de l'observation "egocentric".
+        k_nearest (int): Nombre de monstres décrits dans l'observation "egocentric".
         observation_space (gym.spaces.Box): Espace des observations (vecteur d'état).
         action_space (gym.spaces.Discrete): Espace des actions (5 actions possibles).
         hero_pos (np.ndarray): Position actuelle du héros.
         treasure_pos (np.ndarray): Position actuelle du trésor.
-        monsters_pos (list): Liste des positions des monstres.
+        monsters_pos (np.ndarray): Positions des monstres, forme (n_monsters, 2).
         step_count (int): Nombre d'étapes dans l'épisode en cours.
-        hero_img, treasure_img, monster_img: Images pour le rendu visuel...
+        np_random (np.random.Generator): Générateur aléatoire propre à l'environnement, réinitialisé par
+            `reset(seed=...)` ou `seed(...)`. Deux environnements ne partagent aucun état aléatoire : un épisode est
+            reproductible quel que soit le processus ou les autres environnements.
+        monster_moves (str): Loi des déplacements des monstres. "compat" reproduit exactement la loi historique
+            (10 tentatives aléatoires, immobile après 10 échecs), "uniform" tire uniformément parmi les cases
+            voisines autorisées.
+        copy_obs (bool): Si True, `reset` et `step` renvoient une copie du buffer d'observation, sinon une vue
+            qui sera modifiée en place à l'étape suivante.
+        headless (bool): Si True, les images ne sont décodées qu'au premier appel à `render()`.
+        render_mode (str): Mode de rendu par défaut, "human" (par défaut) ou "rgb_array".
+        profiler (PhaseProfiler, optional): Si défini, chronomètre chaque phase de `step` (voir `src/profiling.py`).
+        hero_img, treasure_img, monster_img: Images pour le rendu visuel, partagées entre les instances...
     """
-    def __init__(self):
+    metadata = {"render_modes": ["human", "rgb_array"]}
+
+    def __init__(self, copy_obs=True, monster_moves="compat", headless=True, render_mode=None, profiler=None,
+                 grid_size=10, n_monsters=3, observation="grid", view_radius=3, k_nearest=3):
         super(GameEnv, self).__init__()
-        self.grid_size = 10
-        self.observation_space = spaces.Box(low=0, high=1, shape=(106,), dtype=np.float32)
+        if monster_moves not in ("compat", "uniform"):
+            raise ValueError(f"monster_moves doit valoir 'compat' ou 'uniform', pas {monster_moves!r}")
+        if observation not in ("grid", "egocentric"):
+            raise ValueError(f"observation doit valoir 'grid' ou 'egocentric', pas {observation!r}")
+        if grid_size < 4 or n_monsters < 1 or view_radius < 0 or k_nearest < 1:
+            raise ValueError("Il faut grid_size >= 4, n_monsters >= 1, view_radius >= 0 et k_nearest >= 1")
+        self.grid_size = grid_size
+        self.n_monsters = n_monsters
+        self.monster_moves = monster_moves
+        self.observation = observation
+        self.view_radius = view_radius
+        self.k_nearest = k_nearest
+        if observation == "grid":
+            obs_size = grid_size * grid_size + 3 + n_monsters
+            self.observation_space = spaces.Box(low=0, high=1, shape=(obs_size,), dtype=np.float32)
+        else:
+            obs_size = 2 * (2 * view_radius + 1) ** 2 + 5 + 3 * k_nearest
+            self.observation_space = spaces.Box(low=-1, high=1, shape=(obs_size,), dtype=np.float32)
         self.action_space = spaces.Discrete(5)  #actions: 0=UP, 1=DOWN, 2=LEFT, 3=RIGHT, 4=STAY
 
         self.hero_pos = None
@@ -34,43 +177,119 @@ class GameEnv(gym.Env):
         self.previous_monster_positions = None
         self.previous_hero_pos = None
         self.step_count = 0
+        self.np_random = np.random.default_rng() #graine aléatoire tant que `seed` n'est pas appelé
+
+        #déplacements possibles depuis chaque case, calculés à la première visite de la case : aucune table
+        #de grid_size² cases n'est construite, même sur une très grande grille
+        self._move_table = {}
+        self._cells = None #coordonnées de toutes les cases, seulement pour le tirage des monstres sur petite grille
+        if grid_size * grid_size <= SPAWN_MASK_MAX_CELLS:
+            self._cells = np.stack(np.divmod(np.arange(grid_size * grid_size), grid_size), axis=1)
+        self._window = np.arange(-view_radius, view_radius + 1) #décalages de la fenêtre "egocentric"
+
+        #buffer d'observation préalloué, mis à jour de façon incrémentale par _get_obs
+        self.copy_obs = copy_obs
+        self._obs = np.zeros(obs_size, dtype=np.float64)
+        self._obs_cells = [] #cases de la grille écrites lors de la dernière observation
+
+        self.headless = headless
+        self.render_mode = render_mode
+        self.profiler = profiler
+        self._renderer = None #créé au premier appel à render()
+        if not headless:
+            load_sprites() #décodage immédiat, pour ne pas attendre au premier rendu
 
-        self.hero_img = plt.imread("src/assets/hero.png")  
-        self.treasure_img = plt.imread("src/assets/treasure.png")  
-        self.monster_img = plt.imread("src/assets/monster.png") 
+    @property
+    def hero_img(self):
+        return load_sprites()["hero"]
 
-    def reset(self):
+    @property
+    def treasure_img(self):
+        return load_sprites()["treasure"]
+
+    @property
+    def monster_img(self):
+        return load_sprites()["monster"]
+
+    def seed(self, seed=None):
+        """
+        Réinitialise le générateur aléatoire de l'environnement.
+
+        Args:
+            seed (int, optional): Graine du générateur.
+
+        Returns:
+            list: La graine utilisée.
+        """
+        self.np_random = np.random.default_rng(seed)
+        return [seed]
+
+    def reset(self, seed=None):
         """
         Reset l'environnement pour un nouvel épisode.
         Le héros, le trésor, et les monstres sont placés aléatoirement sur la grille, en s'assurant qu'ils ne se chevauchent pas,
         ne sortent pas du cadre...
 
+        Args:
+            seed (int, optional): Si définie, réinitialise d'abord le générateur aléatoire (voir `seed`) : cet
+                épisode et les suivants sont alors reproductibles.
+
         Return:
             np.ndarray: Observation initiale de l'état.
         """
-        self.hero_pos = np.random.randint(0, self.grid_size, size=2)  #random position de l'agent
+        if seed is not None:
+            self.seed(seed)
+        if self.profiler is not None:
+            self.profiler.start()
+        rng = self.np_random
+        self.hero_pos = rng.integers(0, self.grid_size, size=2)  #random position de l'agent
         self.previous_hero_pos = self.hero_pos.copy()
-        self.treasure_pos = np.random.randint(0, self.grid_size, size=2)  #random position du tresor
-        self.monsters_pos = []
-        self.previous_monster_positions = []
+        self.treasure_pos = rng.integers(0, self.grid_size, size=2)  #random position du tresor
         self.step_count = 0
-        #conditions de spawn :
-        while len(self.monsters_pos) < 3:
-            monster_pos = np.random.randint(0, self.grid_size, size=2)
-            if (not np.array_equal(monster_pos, self.hero_pos) and #les monstres ne doivent pas se trouver à la même position que l'agent
-                not np.array_equal(monster_pos, self.treasure_pos) and #les monstres ne doivent pas se trouver à la même position que le trésor 
-                np.linalg.norm(monster_pos - self.hero_pos, ord=1) >= 3 and #les monstres doivent être à une distance de Manhattan d'au moins 3 cases du héros 
-                np.linalg.norm(monster_pos - self.treasure_pos, ord=1) >= 3): #les monstres doivent être à une distance de Manhattan d'au moins 3 cases du trésor 
-                self.monsters_pos.append(monster_pos)
-                self.previous_monster_positions.append(monster_pos.copy())
-                #si cette position satisfait pas toutes les contraintes alors nouvelle tentative
-        return self._get_obs()
+        self._obs.fill(0)
+        self._obs_cells = []
+        self.monsters_pos = self._spawn_monsters()
+        self.previous_monster_positions = self.monsters_pos.copy()
+        observation = self._get_obs()
+        if self.profiler is not None:
+            self.profiler.lap("reset")
+        return observation
+
+    def _spawn_monsters(self):
+        """
+        Tire la position des monstres, uniformément parmi les cases à une distance de Manhattan d'au moins 3 cases
+        du héros et du trésor (ce qui exclut aussi leurs cases). Les monstres peuvent partager une case.
+
+        Sur une petite grille, les cases valides sont énumérées et les monstres tirés en un seul tirage indexé.
+        Sur une grande grille, presque toutes les cases sont valides : les positions sont tirées par lots et les
+        cases invalides rejetées, sans parcourir la grille. Les deux méthodes suivent la même loi que l'ancienne
+        boucle de rejet, qui tirait uniformément jusqu'à tomber sur une case valide.
+
+        Returns:
+            np.ndarray: Positions des monstres, forme (n_monsters, 2).
+        """
+        n = self.grid_size
+        rng = self.np_random
+        if self._cells is not None:
+            cells = self._cells
+            far_from_treasure = np.abs(cells - self.treasure_pos).sum(axis=1) >= 3
+            far_from_hero = np.abs(cells - self.hero_pos).sum(axis=1) >= 3
+            spawn_cells = np.flatnonzero(far_from_treasure & far_from_hero)
+            return cells[spawn_cells[rng.integers(0, len(spawn_cells), size=self.n_monsters)]]
+
+        monsters = np.empty((0, 2), dtype=np.int64)
+        while len(monsters) < self.n_monsters:
+            candidates = rng.integers(0, n, size=(2 * self.n_monsters, 2))
+            valid = ((np.abs(candidates - self.treasure_pos).sum(axis=1) >= 3)
+                     & (np.abs(candidates - self.hero_pos).sum(axis=1) >= 3))
+            monsters = np.concatenate([monsters, candidates[valid]])
+        return monsters[:self.n_monsters]
 
     def _get_obs(self):
         """
         Génère une observation à partir de l'état actuel.
 
-        L'observation inclut :
+        L'observation "grid" inclut :
         - La grille aplatie avec les positions du héros, du trésor et des monstres.
         - La position relative du trésor par rapport au héros.
         - Les distances normalisées entre le héros et chaque monstre.
@@ -79,31 +298,99 @@ class GameEnv(gym.Env):
         Returns:
             np.ndarray: Vecteur d'état complet.
         """
-        #représenter numériquement la localisation des entitées
-        grid = np.zeros((self.grid_size, self.grid_size), dtype=np.float32)
-        grid[self.hero_pos[0], self.hero_pos[1]] = 1  #valeur heros
-        grid[self.treasure_pos[0], self.treasure_pos[1]] = 0.5  #valeur treasure
-        for monster in self.monsters_pos:
-            grid[monster[0], monster[1]] = -1  #valeur monsters
-
-        relative_treasure_position = (self.treasure_pos - self.hero_pos) / self.grid_size  #distance hero trésor
-        monster_distances = [
-            np.linalg.norm(self.hero_pos - monster, ord=1) / self.grid_size for monster in self.monsters_pos
-        ] # distances monsters hero, ord = 1 pour distance Manhattan
-        while len(monster_distances) < 3: # sécurité mais improbable ici
-            monster_distances.append(1.0)
-
-        proximity_to_treasure = 1 if np.linalg.norm(self.hero_pos - self.treasure_pos, ord=1) <= 1 else 0 #distance hero tresor
-
-        observation = np.concatenate([
-            grid.flatten(), 
-            relative_treasure_position,  
-            monster_distances,  
-            [proximity_to_treasure] 
-        ])
+        if self.observation == "egocentric":
+            return self._get_egocentric_obs()
+        #seules les cases écrites à l'observation précédente sont effacées, puis réécrites dans le même ordre
+        #que la grille complète : héros, puis trésor, puis monstres (le dernier écrit l'emporte)
+        n = self.grid_size
+        observation = self._obs
+        for cell in self._obs_cells:
+            observation[cell] = 0
+
+        h0, h1 = int(self.hero_pos[0]), int(self.hero_pos[1])
+        t0, t1 = int(self.treasure_pos[0]), int(self.treasure_pos[1])
+        monsters = self.monsters_pos.tolist()
+        cells = [h0 * n + h1, t0 * n + t1] + [m0 * n + m1 for m0, m1 in monsters]
+        observation[cells[0]] = 1  #valeur heros
+        observation[cells[1]] = 0.5  #valeur treasure
+        for cell in cells[2:]:
+            observation[cell] = -1  #valeur monsters
+        self._obs_cells = cells
+
+        observation[n * n] = (t0 - h0) / n  #distance hero trésor
+        observation[n * n + 1] = (t1 - h1) / n
+        for i, (m0, m1) in enumerate(monsters): # distances monsters hero (Manhattan)
+            observation[n * n + 2 + i] = (abs(h0 - m0) + abs(h1 - m1)) / n
+
+        observation[-1] = 1 if abs(h0 - t0) + abs(h1 - t1) <= 1 else 0 #distance hero tresor
 
+        if self.copy_obs:
+            return observation.copy()
         return observation #encode tout ce que l'agent doit savoir pour naviguer dans l'environnement
 
+    def _get_egocentric_obs(self):
+        """
+        Génère l'observation "egocentric", de taille fixe quelle que soit la grille.
+
+        L'observation inclut :
+        - La fenêtre de (2 * view_radius + 1)² cases centrée sur le héros, ligne par ligne : trésor (0.5) puis
+          monstres (-1), comme dans la grille de l'observation "grid".
+        - La même fenêtre où les cases hors de la grille valent 1.
+        - La position relative du trésor et la position du héros, divisées par grid_size.
+        - Pour les k_nearest monstres les plus proches (Manhattan), du plus proche au plus loin (à égalité, dans
+          l'ordre des monstres) : leur position relative divisée par grid_size et leur distance divisée par
+          2 * grid_size, toujours inférieure à 1.
+          Un monstre absent (n_monsters < k_nearest) a une position nulle et une distance de 1.0, valeur qu'aucun
+          monstre réel n'atteint.
+        - Un indicateur de proximité au trésor.
+
+        Le coût ne dépend pas de la taille de la grille et seulement linéairement du nombre de monstres.
+
+        Returns:
+            np.ndarray: Vecteur d'état complet.
+        """
+        n, r, k = self.grid_size, self.view_radius, self.k_nearest
+        width = 2 * r + 1
+        window = width * width
+        observation = self._obs
+        observation.fill(0)
+
+        h0, h1 = int(self.hero_pos[0]), int(self.hero_pos[1])
+        t0, t1 = int(self.treasure_pos[0]), int(self.treasure_pos[1])
+        if abs(t0 - h0) <= r and abs(t1 - h1) <= r:
+            observation[(t0 - h0 + r) * width + t1 - h1 + r] = 0.5
+        offsets = self.monsters_pos - self.hero_pos
+        visible = (np.abs(offsets) <= r).all(axis=1)
+        observation[(offsets[visible, 0] + r) * width + offsets[visible, 1] + r] = -1
+
+        rows, cols = h0 + self._window, h1 + self._window
+        outside = ((rows < 0) | (rows >= n))[:, None] | ((cols < 0) | (cols >= n))[None, :]
+        observation[window:2 * window] = outside.ravel()
+
+        base = 2 * window
+        observation[base] = (t0 - h0) / n
+        observation[base + 1] = (t1 - h1) / n
+        observation[base + 2] = h0 / n
+        observation[base + 3] = h1 / n
+
+        distances = np.abs(offsets).sum(axis=1)
+        if len(distances) > k: #sélection partielle en O(n_monsters), puis tri des k retenus
+            order = distances * len(distances) + np.arange(len(distances)) #égalités départagées par indice
+            nearest = np.argpartition(order, k - 1)[:k]
+            nearest = nearest[np.argsort(order[nearest])]
+        else:
+            nearest = np.argsort(distances, kind="stable")
+        slots = observation[base + 4:base + 4 + 3 * k].reshape(k, 3)
+        slots[:len(nearest), :2] = offsets[nearest] / n
+        slots[:len(nearest), 2] = distances[nearest] / (2 * n) #au plus (n - 1) / n : reste dans [-1, 1]
+        slots[len(nearest):, 2] = 1.0 #monstre absent
+
+        observation[-1] = 1 if abs(h0 - t0) + abs(h1 - t1) <= 1 else 0
+
+        if self.copy_obs:
+            return observation.copy()
+        return observation
+
     def step(self, action):
         """
         Effectue une action et met à jour l'état de l'environnement.
@@ -113,6 +400,9 @@ class GameEnv(gym.Env):
         Return:
             tuple: (observation, reward, done, info)
         """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start()
         self.step_count += 1 #pour suivre le nombre total d'actions prises par l'agent dans cet épisode
         self.previous_hero_pos = self.hero_pos.copy() #pour comparer les distances
 
@@ -127,82 +417,168 @@ class GameEnv(gym.Env):
             self.hero_pos[1] = min(self.grid_size - 1, self.hero_pos[1] + 1)
         elif action == 4:  
             pass
-        
-        #déplacement monsters
-        for i, monster in enumerate(self.monsters_pos):
-            attempts = 0
-            while attempts < 10: #10 tentatives, sinon le monstre reste à sa position actuelle
-                # pour encourager un mouvement très dynamic et qu'ils ne restent pas tout le temps immobile
-                new_monster_pos = monster + np.random.choice([-1, 0, 1], size=2)
-                new_monster_pos[0] = np.clip(new_monster_pos[0], 0, self.grid_size - 1) #np.clip pour rester dans les limites de la grille
-                new_monster_pos[1] = np.clip(new_monster_pos[1], 0, self.grid_size - 1)
-                if (np.sum(np.abs(new_monster_pos - monster)) == 1 and #le monstre se déplace d'une case de 1
-                    not np.array_equal(new_monster_pos, self.hero_pos) and #il ne chevauche pas le héros 
-                    not np.array_equal(new_monster_pos, self.treasure_pos) and #il ne chevauche pas le trésor
-                    np.linalg.norm(new_monster_pos - self.treasure_pos, ord=1) >= 3): #il reste à une distance d’au moins 3 cases du trésor
-                    self.previous_monster_positions[i] = monster.copy()
-                    monster[:] = new_monster_pos #màj
-                    break
-                attempts += 1
-            else:
-                self.previous_monster_positions[i] = monster.copy() #immobile
+        if profiler is not None:
+            profiler.lap("hero_move")
+
+        #déplacement monsters : un seul tirage parmi les cases voisines autorisées (pas sur le héros, et à au moins
+        #3 cases du trésor). En mode "compat", les poids et la probabilité de rester immobile reproduisent
+        #exactement les 10 tentatives aléatoires de l'ancienne version
+        h0, h1 = int(self.hero_pos[0]), int(self.hero_pos[1])
+        t0, t1 = int(self.treasure_pos[0]), int(self.treasure_pos[1])
+        self.previous_monster_positions = self.monsters_pos.copy()
+        if self.n_monsters > VECTORIZED_MONSTERS:
+            blocked = self._move_monsters_vectorized(h0, h1, t0, t1)
+        else:
+            blocked = self._move_monsters(h0, h1, t0, t1)
+        if profiler is not None:
+            profiler.lap("monster_move")
+            profiler.count("monster_blocked", blocked)
 
         reward = -0.1 #mini malus pour qu'il agisse efficacement et ne prenne pas trop de temps a trouver le trésor
         done = False #indicateur de partie terminée
         info = {"is_success": False} #indicateur de succès
 
         #les récompenses:
-        for monster in self.monsters_pos:
-            distance_to_monster = np.linalg.norm(self.hero_pos - monster, ord=1)
-            if distance_to_monster == 1:  #adjacent a un monstre ; condition d'arret de la partie
-                reward = -10 
-                done = True
-                return self._get_obs(), reward, done, {} 
-
-        for monster in self.monsters_pos:
-            distance_to_monster = np.linalg.norm(self.hero_pos - monster, ord=1)
+        distances = [abs(h0 - m0) + abs(h1 - m1) for m0, m1 in self.monsters_pos.tolist()] #Manhattan
+        if 1 in distances:  #adjacent a un monstre ; condition d'arret de la partie
+            reward = -10 
+            done = True
+            return self._step_result(reward, done, {})
+
+        for distance_to_monster in distances:
             if distance_to_monster <= 2:  #trop proche d'un monstre
                 reward -= 5
 
-        previous_distance = np.linalg.norm(self.previous_hero_pos - self.treasure_pos)
-        current_distance = np.linalg.norm(self.hero_pos - self.treasure_pos)
+        #distances euclidiennes au carré, en entiers : même comparaison que sur les distances
+        p0, p1 = int(self.previous_hero_pos[0]), int(self.previous_hero_pos[1])
+        previous_distance = (p0 - t0) ** 2 + (p1 - t1) ** 2
+        current_distance = (h0 - t0) ** 2 + (h1 - t1) ** 2
         if current_distance < previous_distance: #s'il s'approche du trésor
             reward += 3
         elif current_distance >= previous_distance: #s'il s'éloigne du trésor
             reward -= 1
 
-        if np.array_equal(self.hero_pos, self.treasure_pos): #s'il atteint le trésor ; condition d'arret victoire
+        if h0 == t0 and h1 == t1: #s'il atteint le trésor ; condition d'arret victoire
             reward = 30
             done = True
             info = {"is_success": True}
 
-        return self._get_obs(), reward, done, info
+        return self._step_result(reward, done, info)
 
-    def render(self):
+    def _move_monsters(self, h0, h1, t0, t1):
+        """
+        Déplace les monstres un par un (peu de monstres).
+
+        Returns:
+            int: Nombre de monstres restés immobiles.
+        """
+        n = self.grid_size
+        compat = self.monster_moves == "compat"
+        random = self.np_random.random
+        blocked = 0
+        for i, (m0, m1) in enumerate(self.monsters_pos.tolist()):
+            cell = m0 * n + m1
+            moves = self._move_table.get(cell)
+            if moves is None:
+                moves = self._move_table[cell] = cell_moves(m0, m1, n, compat)
+            legal = [move for move in moves
+                     if (move[0] != h0 or move[1] != h1) and abs(move[0] - t0) + abs(move[1] - t1) >= 3]
+            total = sum(move[2] for move in legal)
+            if total == 0:
+                blocked += 1
+                continue #immobile
+            u = random()
+            if compat:
+                p_move = 1 - (1 - total / 9) ** 10 #au moins une des 10 tentatives réussit
+                if u >= p_move:
+                    blocked += 1
+                    continue #immobile après 10 échecs
+                u /= p_move
+            u *= total
+            for row, col, weight in legal:
+                if u < weight:
+                    break
+                u -= weight
+            self.monsters_pos[i] = row, col
+        return blocked
+
+    def _move_monsters_vectorized(self, h0, h1, t0, t1):
+        """
+        Déplace tous les monstres en une passe NumPy (nombreux monstres).
+
+        Même loi que `_move_monsters` (les monstres se déplacent indépendamment : ils ne se bloquent pas entre
+        eux), mais un tirage aléatoire par monstre, immobile ou non : la suite des tirages diffère.
+
+        Returns:
+            int: Nombre de monstres restés immobiles.
+        """
+        n = self.grid_size
+        monsters = self.monsters_pos
+        targets = monsters[:, None] + MOVE_OFFSETS #(monstres, 4, 2)
+        rows, cols = targets[..., 0], targets[..., 1]
+        legal = ((rows >= 0) & (rows < n) & (cols >= 0) & (cols < n) & ((rows != h0) | (cols != h1))
+                 & (np.abs(rows - t0) + np.abs(cols - t1) >= 3))
+        if self.monster_moves == "compat": #poids de `cell_moves`
+            col_weight = 1 + (monsters[:, 1] == 0) + (monsters[:, 1] == n - 1)
+            row_weight = 1 + (monsters[:, 0] == 0) + (monsters[:, 0] == n - 1)
+            weights = np.stack([col_weight, col_weight, row_weight, row_weight], axis=1) * legal
+        else:
+            weights = legal.astype(np.int64)
+        total = weights.sum(axis=1)
+
+        u = self.np_random.random(len(monsters))
+        if self.monster_moves == "compat":
+            p_move = 1 - (1 - total / 9) ** 10
+            moving = u < p_move
+            u = u / np.where(moving, p_move, 1)
+        else:
+            moving = total > 0
+        cumulative = np.cumsum(weights, axis=1)
+        choice = (cumulative <= (u * total)[:, None]).sum(axis=1)
+        choice = np.minimum(choice, 3 - np.argmax(weights[:, ::-1] > 0, axis=1)) #arrondi : dernière voisine légale
+        moving = np.flatnonzero(moving)
+        monsters[moving] = targets[moving, choice[moving]]
+        return len(monsters) - len(moving)
+
+    def _step_result(self, reward, done, info):
+        """
+        Construit le tuple renvoyé par `step` (observation incluse) et clôt le chronométrage de l'étape.
+        """
+        profiler = self.profiler
+        if profiler is None:
+            return self._get_obs(), reward, done, info
+        profiler.lap("reward")
+        observation = self._get_obs()
+        profiler.lap("get_obs")
+        profiler.count("steps")
+        return observation, reward, done, info
+
+    def render(self, mode=None):
         """
         Affiche un rendu visuel de la grille et des positions actuelles.
+
+        La figure et les sprites sont créés au premier appel (voir `src/renderer.py`) puis réutilisés : les appels
+        suivants déplacent seulement les sprites. Un changement de mode recrée la figure.
+
+        Args:
+            mode (str, optional): "human" met à jour une fenêtre non bloquante, "rgb_array" renvoie l'image sans
+                fenêtre. Par défaut `render_mode`, ou "human" s'il n'est pas défini.
+
+        Returns:
+            np.ndarray: Image (hauteur, largeur, 3) en mode "rgb_array", None sinon.
+        """
+        from src.renderer import GameRenderer
+
+        mode = mode or self.render_mode or "human"
+        if self._renderer is None or self._renderer.mode != mode:
+            self.close()
+            self._renderer = GameRenderer(self.grid_size, n_monsters=len(self.monsters_pos), mode=mode)
+        return self._renderer.draw(self.hero_pos, self.treasure_pos, self.monsters_pos)
+
+    def close(self):
+        """
+        Ferme la figure de rendu, si elle existe.
         """
-        fig, ax = plt.subplots(figsize=(8, 8)) #figure et axe
-        ax.set_xlim(-0.5, self.grid_size - 0.5)
-        ax.set_ylim(-0.5, self.grid_size - 0.5)
-        ax.set_xticks(range(self.grid_size)) #grille
-        ax.set_yticks(range(self.grid_size))
-        ax.grid(True) #affiche les lignes de la grille
-
-        #ajout du héros sur le visuel
-        hero_imagebox = OffsetImage(self.hero_img, zoom=0.15)
-        ab = AnnotationBbox(hero_imagebox, (self.hero_pos[1], self.grid_size - 1 - self.hero_pos[0]), frameon=False)
-        ax.add_artist(ab)
-
-        #ajout du tresor sur le visuel
-        treasure_imagebox = OffsetImage(self.treasure_img, zoom=0.1)
-        ab = AnnotationBbox(treasure_imagebox, (self.treasure_pos[1], self.grid_size - 1 - self.treasure_pos[0]), frameon=False)
-        ax.add_artist(ab)
-
-        #ajout des monstres sur le visuel
-        for monster in self.monsters_pos:
-            monster_imagebox = OffsetImage(self.monster_img, zoom=0.1)
-            ab = AnnotationBbox(monster_imagebox, (monster[1], self.grid_size - 1 - monster[0]), frameon=False)
-            ax.add_artist(ab)
-
-        plt.show()
\ No newline at end of file
+        if self._renderer is not None:
+            self._renderer.close()
+            self._renderer = None
@@ -0,0 +1,314 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import shutil
+import time
+import numpy as np
+from src.profiling import PhaseProfiler
+from src.trajectory import TrajectoryRecorder
+from src.batch_env import BatchGameEnv, MultiGameEnv
+
+@dataclass
+class EvaluationResults:
+    """
+    Résultats d'une évaluation : une entrée par épisode, dans l'ordre de lancement des épisodes.
+
+    Attributes:
+        rewards (np.ndarray): Récompense cumulée de chaque épisode.
+        lengths (np.ndarray): Nombre de pas de chaque épisode.
+        successes (np.ndarray): True si l'épisode s'est terminé sur le trésor.
+        truncated (np.ndarray): True si l'épisode a été interrompu par `max_episode_steps`.
+    """
+    rewards: np.ndarray
+    lengths: np.ndarray
+    successes: np.ndarray
+    truncated: np.ndarray
+
+    @classmethod
+    def concatenate(cls, results):
+        """
+        Regroupe les résultats de plusieurs shards en un seul objet.
+        """
+        return cls(
+            rewards=np.concatenate([r.rewards for r in results]),
+            lengths=np.concatenate([r.lengths for r in results]),
+            successes=np.concatenate([r.successes for r in results]),
+            truncated=np.concatenate([r.truncated for r in results]),
+        )
+
+    def summary(self, z=1.96):
+        """
+        Statistiques agrégées avec intervalles de confiance (95% par défaut).
+
+        Les intervalles de la récompense et de la longueur moyennes utilisent l'approximation normale,
+        celui du taux de succès l'intervalle de Wilson (correct même pour un taux proche de 0 ou 1).
+
+        Args:
+            z (float): Quantile de la loi normale utilisé pour les intervalles.
+
+        Returns:
+            dict: Nombre d'épisodes, moyennes, écarts-types et intervalles (bornes basse et haute).
+        """
+        n = len(self.rewards)
+        summary = {"episodes": n}
+        for name, values in (("reward", self.rewards), ("length", self.lengths)):
+            mean = float(np.mean(values))
+            std = float(np.std(values, ddof=1)) if n > 1 else 0.0
+            half_width = z * std / np.sqrt(n)
+            summary[f"{name}_mean"] = mean
+            summary[f"{name}_std"] = std
+            summary[f"{name}_ci"] = (mean - half_width, mean + half_width)
+
+        p = float(np.mean(self.successes))
+        denominator = 1 + z ** 2 / n
+        center = (p + z ** 2 / (2 * n)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+        summary["success_rate"] = p
+        summary["success_rate_ci"] = (center - half_width, center + half_width)
+        summary["truncated"] = int(np.sum(self.truncated))
+        return summary
+
+def run_episodes(policy, n_episodes, n_envs=256, seed=None, max_episode_steps=None, deterministic=True,
+                 profiler=None, trajectory_path=None, env_kwargs=None):
+    """
+    Joue `n_episodes` épisodes en parallèle sur un BatchGameEnv, avec un seul `predict` par pas pour tous les
+    épisodes en cours.
+
+    Chaque épisode reçoit un numéro à son lancement et seuls les `n_episodes` premiers lancés sont comptés :
+    on ne favorise donc pas les épisodes courts, qui finissent les premiers. Les plateaux qui n'ont plus
+    d'épisode à jouer restent immobiles jusqu'à la fin.
+
+    Args:
+        policy: Objet exposant `predict(obs, deterministic=...)` sur un batch d'observations (ex : modèle DQN), ou
+            agent tabulaire exposant `state_keys(env)` et `predict_state(keys)`.
+        n_episodes (int): Nombre d'épisodes à jouer (au moins 1).
+        n_envs (int): Nombre de plateaux simulés simultanément.
+        seed (int, optional): Graine de l'environnement.
+        max_episode_steps (int, optional): Interrompt (en échec) les épisodes plus longs. GameEnv n'a pas de
+            limite, mais une politique déterministe peut tourner en rond indéfiniment.
+        deterministic (bool): Politique déterministe (greedy) ou non.
+        profiler (PhaseProfiler, optional): Reçoit les phases "predict" et "env_step" de chaque pas, ainsi que
+            le détail des phases de l'environnement.
+        trajectory_path (str, optional): Journal où enregistrer les épisodes (positions, actions, récompenses,
+            dones), complété s'il existe déjà (voir `src/trajectory.py`).
+        env_kwargs (dict, optional): Configuration de GameEnv (grid_size, n_monsters, observation...). Les épisodes
+            sont alors joués sur des GameEnv (MultiGameEnv), plus lents que BatchGameEnv, limité au plateau par
+            défaut.
+
+    Returns:
+        EvaluationResults: Résultats par épisode.
+    """
+    if n_episodes < 1:
+        raise ValueError(f"n_episodes doit valoir au moins 1, pas {n_episodes}")
+    n_envs = max(1, min(n_envs, n_episodes))
+    if env_kwargs:
+        env = MultiGameEnv(num_envs=n_envs, seed=seed, profiler=profiler, **env_kwargs)
+    else:
+        env = BatchGameEnv(num_envs=n_envs, seed=seed, profiler=profiler)
+    obs = env.reset()
+    recorder = None
+    if trajectory_path is not None:
+        recorder = TrajectoryRecorder(trajectory_path, env.grid_size, env.n_monsters, n_boards=n_envs)
+        boards = np.arange(min(n_envs, n_episodes))
+        recorder.start(boards, boards, env.hero_pos[boards], env.treasure_pos[boards], env.monsters_pos[boards])
+
+    rewards = np.zeros(n_episodes)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+    successes = np.zeros(n_episodes, dtype=bool)
+    truncated = np.zeros(n_episodes, dtype=bool)
+
+    episode_of_board = np.arange(n_envs) #numéro de l'épisode joué par chaque plateau
+    next_episode = n_envs
+    live = episode_of_board < n_episodes
+    actions = np.full(n_envs, 4) #STAY pour les plateaux inactifs
+
+    while live.any():
+        if profiler is not None:
+            start = time.perf_counter()
+        #une seule inférence batchée pour tous les épisodes en cours
+        if hasattr(policy, "predict_state"): #agent tabulaire : décision sur l'état exact plutôt que l'observation
+            actions[live] = policy.predict_state(policy.state_keys(env)[live])
+        else:
+            actions[live], _ = policy.predict(obs[live], deterministic=deterministic)
+        if profiler is not None:
+            predicted = time.perf_counter()
+            profiler.record("predict", predicted - start)
+        obs, step_rewards, dones, infos = env.step(actions)
+        if profiler is not None:
+            profiler.record("env_step", time.perf_counter() - predicted)
+        if recorder is not None:
+            recorded = np.flatnonzero(live)
+            hero, treasure, monsters = env.hero_pos[recorded], env.treasure_pos[recorded], env.monsters_pos[recorded]
+            for i in np.flatnonzero(dones[recorded]): #plateaux déjà réinitialisés : positions finales dans infos
+                hero[i], treasure[i], monsters[i] = infos[recorded[i]]["terminal_state"]
+
+        episodes = episode_of_board[live]
+        rewards[episodes] += step_rewards[live]
+        lengths[episodes] += 1
+
+        if max_episode_steps is not None:
+            too_long = live & ~dones & (env.step_count >= max_episode_steps)
+            if too_long.any():
+                boards = np.flatnonzero(too_long)
+                truncated[episode_of_board[boards]] = True
+                env._reset_boards(boards)
+                obs[boards] = env._get_obs(boards)
+                dones = dones | too_long
+
+        finished = np.flatnonzero(live & dones)
+        for board in finished:
+            successes[episode_of_board[board]] = infos[board].get("is_success", False)
+        if recorder is not None:
+            recorder.step(recorded, actions[recorded], step_rewards[recorded], dones[recorded], hero, treasure,
+                          monsters, successes[episodes], truncated[episodes])
+        #les plateaux terminés (déjà réinitialisés par l'environnement) lancent l'épisode suivant
+        episode_of_board[finished] = np.arange(next_episode, next_episode + len(finished))
+        next_episode += len(finished)
+        live = episode_of_board < n_episodes
+        if recorder is not None:
+            started = finished[live[finished]]
+            recorder.start(started, episode_of_board[started], env.hero_pos[started], env.treasure_pos[started],
+                           env.monsters_pos[started])
+
+    env.close()
+    if recorder is not None:
+        recorder.close()
+    return EvaluationResults(rewards=rewards, lengths=lengths, successes=successes, truncated=truncated)
+
+def load_policy(model_path):
+    """
+    Charge la politique utilisée pour l'évaluation.
+
+    Args:
+        model_path (str): Chemin du modèle DQN sauvegardé, ou d'une politique exportée en NumPy (fichier .npz,
+            voir `src/numpy_policy.py`), chargée sans torch.
+
+    Returns:
+        Objet exposant `predict`.
+    """
+    if model_path.endswith(".npz"):
+        from src.numpy_policy import NumpyPolicy
+        return NumpyPolicy.load(model_path)
+    from stable_baselines3 import DQN
+    return DQN.load(model_path)
+
+def _load_policy_timed(model_path, profiler):
+    start = time.perf_counter()
+    policy = load_policy(model_path)
+    if profiler is not None:
+        profiler.record("load_policy", time.perf_counter() - start)
+    return policy
+
+def _evaluate_shard(model_path, n_episodes, n_envs, seed, max_episode_steps, profile, trajectory_path=None):
+    """
+    Évalue un shard d'épisodes dans un processus worker (le modèle y est chargé une fois).
+
+    Renvoie les résultats et le profiler du worker (None sans profiling), fusionné ensuite par le processus parent.
+    """
+    if not model_path.endswith(".npz"):
+        import torch
+        torch.set_num_threads(1) #un coeur par worker, sinon les processus se disputent les threads
+    profiler = PhaseProfiler() if profile else None
+    policy = _load_policy_timed(model_path, profiler)
+    results = run_episodes(policy, n_episodes, n_envs=n_envs, seed=seed, max_episode_steps=max_episode_steps,
+                           profiler=profiler, trajectory_path=trajectory_path)
+    return results, profiler
+
+def evaluate_agent(model_path="src/models/hero_agent", n_episodes=100, n_envs=256, n_workers=1, seed=None,
+                   max_episode_steps=None, profiler=None, trajectory_path=None):
+    """
+    Évalue un modèle sauvegardé, en répartissant éventuellement les épisodes entre plusieurs processus.
+
+    Args:
+        model_path (str): Chemin du modèle sauvegardé (DQN ou politique NumPy .npz, voir `load_policy`).
+        n_episodes (int): Nombre total d'épisodes (au moins 1).
+        n_envs (int): Nombre de plateaux simultanés par processus.
+        n_workers (int): Nombre de processus ; chacun charge le modèle et joue sa part des épisodes.
+        seed (int, optional): Graine de base ; le worker i utilise `seed + i`.
+        max_episode_steps (int, optional): Longueur maximale d'un épisode (voir `run_episodes`).
+        profiler (PhaseProfiler, optional): Reçoit les mesures de tous les workers.
+        trajectory_path (str, optional): Journal où enregistrer les épisodes (voir `run_episodes`). Chaque worker
+            écrit son propre journal, recopié ensuite à la suite du journal principal avec les numéros d'épisodes
+            de l'évaluation complète.
+
+    Returns:
+        EvaluationResults: Résultats par épisode, shards concaténés dans l'ordre des workers.
+    """
+    if n_episodes < 1:
+        raise ValueError(f"n_episodes doit valoir au moins 1, pas {n_episodes}")
+    if n_workers <= 1:
+        policy = _load_policy_timed(model_path, profiler)
+        return run_episodes(policy, n_episodes, n_envs=n_envs, seed=seed, max_episode_steps=max_episode_steps,
+                            profiler=profiler, trajectory_path=trajectory_path)
+
+    shards = [shard for shard in np.array_split(np.arange(n_episodes), n_workers) if len(shard)]
+    seeds = [None if seed is None else seed + worker for worker in range(n_workers)]
+    shard_paths = [None] * len(shards)
+    if trajectory_path is not None:
+        shard_paths = [f"{trajectory_path}.shard{worker}" for worker in range(len(shards))]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(_evaluate_shard, model_path, len(shard), n_envs, shard_seed, max_episode_steps,
+                            profiler is not None, shard_path)
+            for shard, shard_seed, shard_path in zip(shards, seeds, shard_paths)
+        ]
+        shard_results = [future.result() for future in futures]
+    if trajectory_path is not None:
+        with TrajectoryRecorder(trajectory_path) as recorder:
+            for shard, shard_path in zip(shards, shard_paths):
+                recorder.append_log(shard_path, episode_offset=int(shard[0]))
+                shutil.rmtree(shard_path)
+    if profiler is not None:
+        for _, shard_profiler in shard_results:
+            profiler.merge(shard_profiler)
+    return EvaluationResults.concatenate([results for results, _ in shard_results])
+
+def evaluation_worker(tasks, results, n_episodes=500, n_envs=256, seed=0, max_episode_steps=200,
+                      best_model_path=None, env_kwargs=None):
+    """
+    Boucle d'un processus d'évaluation en arrière-plan (voir `AsyncEvalCallback` dans `src/callbacks.py`).
+
+    Chaque tâche est une copie des poids du Q-network, prise à `timesteps` transitions d'entraînement. La politique
+    greedy est évaluée avec NumPy (NumpyPolicy, sans torch) sur `n_episodes` épisodes joués en parallèle
+    (`run_episodes`). La graine est la même à chaque évaluation : toutes les copies sont jugées sur les mêmes
+    parties, ce qui rend leurs comparaisons bien moins bruitées. La meilleure politique (récompense moyenne) est
+    écrite dans `best_model_path` au format .npz de `src/numpy_policy.py`.
+
+    Args:
+        tasks (multiprocessing.Queue): Tâches (timesteps, weights, biases, activations, observation_shape), None
+            pour arrêter le worker.
+        results (multiprocessing.Queue): Reçoit un dict par tâche : "timesteps", "summary" (voir
+            `EvaluationResults.summary`), "best", "duration_s", ou "error" si l'évaluation a échoué.
+        n_episodes (int): Nombre d'épisodes par évaluation.
+        n_envs (int): Nombre de plateaux simultanés.
+        seed (int): Graine de l'évaluation.
+        max_episode_steps (int): Longueur maximale d'un épisode ; une politique déterministe peut tourner en rond.
+        best_model_path (str, optional): Fichier .npz de la meilleure politique.
+        env_kwargs (dict, optional): Configuration de GameEnv de l'entraînement : les épisodes sont alors joués sur
+            les propres GameEnv du worker (voir `run_episodes`).
+    """
+    import os
+    import traceback
+    from src.numpy_policy import NumpyPolicy, save_policy
+
+    best_reward = -np.inf
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        timesteps, weights, biases, activations, observation_shape = task
+        try:
+            start = time.perf_counter()
+            policy = NumpyPolicy(weights, biases, activations, observation_shape)
+            summary = run_episodes(policy, n_episodes, n_envs=n_envs, seed=seed, max_episode_steps=max_episode_steps,
+                                   env_kwargs=env_kwargs).summary()
+            best = summary["reward_mean"] > best_reward
+            if best:
+                best_reward = summary["reward_mean"]
+                if best_model_path is not None:
+                    tmp = best_model_path[:-len(".npz")] + ".tmp.npz" #écriture atomique
+                    save_policy(tmp, weights, biases, activations, observation_shape)
+                    os.replace(tmp, best_model_path)
+            results.put({"timesteps": timesteps, "summary": summary, "best": best,
+                         "duration_s": time.perf_counter() - start})
+        except Exception:
+            results.put({"timesteps": timesteps, "error": traceback.format_exc()})
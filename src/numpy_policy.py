@@ -0,0 +1,150 @@
+"""
+Politique DQN exportée en NumPy : passe avant du Q-network sans torch ni stable-baselines3.
+
+Usage :
+    python -m src.numpy_policy [--model src/models/hero_agent] [--output src/models/hero_policy.npz]
+"""
+import argparse
+import numpy as np
+
+ACTIVATIONS = ("ReLU", "Tanh")
+
+def policy_arrays(model):
+    """
+    Poids, biais et activations du Q-network d'un modèle DQN, copiés dans des tableaux NumPy.
+
+    Les tableaux sont des copies : ils ne changent pas quand l'entraînement du modèle continue.
+
+    Args:
+        model (DQN): Modèle stable-baselines3 dont le Q-network est un MLP (couches Linear séparées par des
+            activations ReLU ou Tanh), ce qui est le cas de la "MlpPolicy".
+
+    Returns:
+        tuple: (weights, biases, activations), au format de `NumpyPolicy`.
+    """
+    from torch import nn
+
+    weights, biases, activations = [], [], []
+    for module in model.policy.q_net.q_net:
+        if isinstance(module, nn.Linear):
+            weights.append(module.weight.detach().cpu().numpy().copy())
+            biases.append(module.bias.detach().cpu().numpy().copy())
+        elif type(module).__name__ in ACTIVATIONS:
+            activations.append(type(module).__name__)
+        else:
+            raise ValueError(f"Couche non supportée par NumpyPolicy : {module}")
+    return weights, biases, activations
+
+def save_policy(output, weights, biases, activations, observation_shape):
+    """
+    Écrit une politique dans un fichier .npz compact, relu par `NumpyPolicy.load`.
+
+    Le fichier contient les poids et biais de chaque couche, le nom des activations et la forme des observations.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    arrays = {}
+    for layer, (weight, bias) in enumerate(zip(weights, biases)):
+        arrays[f"weight_{layer}"] = weight
+        arrays[f"bias_{layer}"] = bias
+    np.savez(output, activations=np.array(activations), observation_shape=np.array(observation_shape), **arrays)
+    return output
+
+def export_policy(model_path="src/models/hero_agent", output="src/models/hero_policy.npz"):
+    """
+    Extrait les poids du Q-network d'un modèle DQN sauvegardé dans un fichier .npz compact.
+
+    Args:
+        model_path (str): Chemin du modèle DQN sauvegardé.
+        output (str): Fichier .npz à écrire.
+
+    Returns:
+        str: Chemin du fichier écrit.
+    """
+    from stable_baselines3 import DQN
+
+    model = DQN.load(model_path, device="cpu")
+    return save_policy(output, *policy_arrays(model), model.observation_space.shape)
+
+class NumpyPolicy:
+    """
+    Politique greedy d'un Q-network exporté par `export_policy`, évaluée avec NumPy uniquement.
+
+    Les calculs se font en float32 comme dans torch : les actions sont celles de `DQN.predict(obs,
+    deterministic=True)`, sauf égalité des Q-valeurs à l'arrondi float32 près. `predict` a la signature de
+    stable-baselines3 et accepte une observation ou un batch : la politique remplace le modèle DQN dans
+    `run_episodes`, `test_agent`, `test_agent_obs` ou `PolicyServer`. `predict_single` évite les conversions pour
+    une seule observation.
+
+    Attributes:
+        weights (list): Matrices des couches, transposées (entrées x sorties), en float32.
+        biases (list): Biais des couches, en float32.
+        activations (list): Nom de l'activation après chaque couche cachée ("ReLU" ou "Tanh").
+        observation_shape (tuple): Forme d'une observation.
+    """
+    def __init__(self, weights, biases, activations, observation_shape):
+        self.weights = [np.ascontiguousarray(np.asarray(w, dtype=np.float32).T) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self.observation_shape = tuple(observation_shape)
+        self.n_actions = len(self.biases[-1])
+        if len(self.activations) != len(self.weights) - 1:
+            raise ValueError("Il faut une activation entre chaque couche")
+
+    @classmethod
+    def load(cls, path="src/models/hero_policy.npz"):
+        """
+        Charge une politique exportée par `export_policy`.
+        """
+        with np.load(path) as data:
+            n_layers = sum(1 for name in data.files if name.startswith("weight_"))
+            return cls([data[f"weight_{i}"] for i in range(n_layers)], [data[f"bias_{i}"] for i in range(n_layers)],
+                       [str(name) for name in data["activations"]], data["observation_shape"])
+
+    def q_values(self, obs):
+        """
+        Q-valeurs d'un batch d'observations, forme (batch, n_actions).
+        """
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.weights[0].shape[0])
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ weight
+            x += bias
+            if activation == "ReLU":
+                np.maximum(x, 0, out=x)
+            else:
+                np.tanh(x, out=x)
+        x = x @ self.weights[-1]
+        x += self.biases[-1]
+        return x
+
+    def predict_single(self, obs):
+        """
+        Action greedy pour une seule observation (entier).
+        """
+        return int(self.q_values(obs).argmax())
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=True):
+        """
+        Actions greedy, avec la signature de `BaseAlgorithm.predict` de stable-baselines3.
+
+        La politique est toujours greedy : `deterministic` est accepté pour la compatibilité, sans effet.
+
+        Returns:
+            tuple: (action(s), None). Une action (tableau 0-d) pour une observation seule, un tableau sinon.
+        """
+        observation = np.asarray(observation)
+        actions = self.q_values(observation).argmax(axis=1)
+        if observation.ndim == len(self.observation_shape):
+            return actions[0], None
+        return actions, None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="src/models/hero_agent", help="modèle DQN sauvegardé")
+    parser.add_argument("--output", default="src/models/hero_policy.npz", help="fichier .npz à écrire")
+    args = parser.parse_args()
+    print(f"Politique exportée : {export_policy(args.model, args.output)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import math
+import time
+import numpy as np
+
+class PhaseProfiler:
+    """
+    Chronométrage par phase et compteurs, à coût faible et mémoire constante.
+
+    Chaque durée est rangée dans un histogramme à pas logarithmique (8 classes par décade, de 100 ns à 100 s),
+    ce qui donne des quantiles approchés sans garder les mesures. Le profiler est optionnel partout :
+    les composants instrumentés reçoivent `profiler=None` par défaut et ne font alors qu'un test par phase.
+
+    Utilisation typique dans une boucle chaude :
+        profiler.start()
+        ...
+        profiler.lap("phase_1") #durée depuis start() ou le lap précédent
+        ...
+        profiler.lap("phase_2")
+
+    Les phases peuvent s'imbriquer (par exemple "env_step" contient "hero_move", "monster_move"...) : leur part
+    est donc rapportée au temps écoulé depuis la création du profiler, et les parts ne somment pas à 100%.
+
+    Attributes:
+        phases (dict): Par phase : [nombre, somme, min, max, histogramme].
+        counters (dict): Compteurs entiers.
+        elapsed (float): Temps écoulé (s) depuis la création, ou le plus long des profilers fusionnés.
+    """
+    MIN_SECONDS = 1e-7
+    BINS_PER_DECADE = 8
+    N_BINS = 9 * BINS_PER_DECADE + 1 #de 1e-7 à 1e2 s, plus une classe pour les valeurs au-delà
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self._created = time.perf_counter()
+        self._merged_elapsed = 0.0
+        self._last = None
+
+    @property
+    def elapsed(self):
+        return max(time.perf_counter() - self._created, self._merged_elapsed)
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.record(phase, now - self._last)
+        self._last = now
+
+    def record(self, phase, seconds):
+        """
+        Ajoute une durée (en secondes) à la phase `phase`.
+        """
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = [0, 0.0, math.inf, 0.0, np.zeros(self.N_BINS, dtype=np.int64)]
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds < stats[2]:
+            stats[2] = seconds
+        if seconds > stats[3]:
+            stats[3] = seconds
+        b = int(math.log10(seconds / self.MIN_SECONDS) * self.BINS_PER_DECADE) if seconds > self.MIN_SECONDS else 0
+        stats[4][min(b, self.N_BINS - 1)] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        """
+        Ajoute les mesures d'un autre profiler (par exemple celui d'un processus worker).
+        """
+        for phase, (n, total, low, high, hist) in other.phases.items():
+            stats = self.phases.setdefault(phase, [0, 0.0, math.inf, 0.0, np.zeros(self.N_BINS, dtype=np.int64)])
+            stats[0] += n
+            stats[1] += total
+            stats[2] = min(stats[2], low)
+            stats[3] = max(stats[3], high)
+            stats[4] += hist
+        for name, n in other.counters.items():
+            self.count(name, n)
+        self._merged_elapsed = max(self._merged_elapsed, other.elapsed)
+        return self
+
+    def _bin_upper_edges(self):
+        return self.MIN_SECONDS * 10 ** (np.arange(1, self.N_BINS + 1) / self.BINS_PER_DECADE)
+
+    def _quantile(self, hist, q):
+        """
+        Quantile approché : borne haute de la classe qui contient le quantile `q`.
+        """
+        index = int(np.searchsorted(np.cumsum(hist), q * hist.sum()))
+        return float(self._bin_upper_edges()[min(index, self.N_BINS - 1)])
+
+    def to_dict(self):
+        """
+        Agrégats par phase (secondes) et compteurs, sérialisables en JSON.
+        """
+        phases = {}
+        for phase, (n, total, low, high, hist) in self.phases.items():
+            nonzero = np.flatnonzero(hist)
+            phases[phase] = {
+                "count": n, "total_s": total, "mean_s": total / n, "min_s": low, "max_s": high,
+                "p50_s": self._quantile(hist, 0.5), "p99_s": self._quantile(hist, 0.99),
+                "histogram": {"upper_edges_s": self._bin_upper_edges()[nonzero].tolist(),
+                              "counts": hist[nonzero].tolist()},
+            }
+        return {"elapsed_s": self.elapsed, "phases": phases, "counters": dict(self.counters)}
+
+    def export(self, path):
+        """
+        Écrit les agrégats et histogrammes dans un fichier JSON.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self):
+        """
+        Tableau texte : temps total, part du temps écoulé, moyenne et quantiles de chaque phase, puis les compteurs.
+        """
+        data = self.to_dict()
+        grand_total = data["elapsed_s"] or 1.0
+        lines = [f"{'phase':<18}{'appels':>10}{'total (s)':>12}{'part':>8}{'moy (us)':>11}{'p50 (us)':>11}{'p99 (us)':>11}"]
+        for phase, p in sorted(data["phases"].items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(f"{phase:<18}{p['count']:>10}{p['total_s']:>12.3f}{p['total_s'] / grand_total * 100:>7.1f}%"
+                         f"{p['mean_s'] * 1e6:>11.1f}{p['p50_s'] * 1e6:>11.1f}{p['p99_s'] * 1e6:>11.1f}")
+        for name, n in sorted(data["counters"].items()):
+            lines.append(f"{name:<18}{n:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,168 @@
+import os
+import shutil
+import subprocess
+import numpy as np
+from src.env import load_sprites
+
+class GameRenderer:
+    """
+    Rendu persistant d'un plateau : la figure et les sprites sont créés une seule fois, puis seulement déplacés.
+
+    Chaque image ne redessine que les sprites (blitting) par-dessus le fond (grille) mémorisé.
+
+    Modes :
+    - "human" : fenêtre matplotlib non bloquante, mise à jour à chaque image.
+    - "rgb_array" : aucune fenêtre (canvas Agg, utilisable sur un serveur headless), chaque image est renvoyée
+      sous forme de tableau NumPy (hauteur, largeur, 3).
+
+    Attributes:
+        grid_size (int): Taille de la grille.
+        mode (str): "human" ou "rgb_array".
+        fig, ax: Figure et axe matplotlib, créés une fois.
+    """
+    def __init__(self, grid_size, n_monsters=3, mode="human", figsize=(8, 8), dpi=100):
+        from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+
+        if mode not in ("human", "rgb_array"):
+            raise ValueError(f"mode doit valoir 'human' ou 'rgb_array', pas {mode!r}")
+        self.grid_size = grid_size
+        self.mode = mode
+
+        if mode == "human":
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots(figsize=figsize, dpi=dpi)
+            plt.show(block=False)
+        else:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.fig = Figure(figsize=figsize, dpi=dpi)
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+
+        ax = self.ax
+        ax.set_xlim(-0.5, grid_size - 0.5)
+        ax.set_ylim(-0.5, grid_size - 0.5)
+        ax.set_xticks(range(grid_size)) #grille
+        ax.set_yticks(range(grid_size))
+        ax.grid(True) #affiche les lignes de la grille
+
+        #sprites créés une fois ; animated=True les exclut du fond mémorisé
+        sprites = load_sprites()
+        def sprite(image, zoom):
+            artist = AnnotationBbox(OffsetImage(image, zoom=zoom), (0, 0), frameon=False, animated=True)
+            ax.add_artist(artist)
+            return artist
+        self.hero = sprite(sprites["hero"], 0.15)
+        self.treasure = sprite(sprites["treasure"], 0.1)
+        self.monsters = [sprite(sprites["monster"], 0.1) for _ in range(n_monsters)]
+
+        self.background = None
+        self.fig.canvas.mpl_connect("draw_event", self._on_draw) #fond à recapturer si la fenêtre est redessinée
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event):
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _place(self, artist, pos):
+        xy = (pos[1], self.grid_size - 1 - pos[0]) #ligne 0 en haut de l'image
+        artist.xy = xy
+        artist.xybox = xy
+
+    def draw(self, hero_pos, treasure_pos, monsters_pos):
+        """
+        Déplace les sprites et redessine l'image.
+
+        Args:
+            hero_pos, treasure_pos (array-like): Positions (ligne, colonne).
+            monsters_pos (list): Positions des monstres.
+
+        Returns:
+            np.ndarray: L'image (hauteur, largeur, 3) en mode "rgb_array", None en mode "human".
+        """
+        self._place(self.hero, hero_pos)
+        self._place(self.treasure, treasure_pos)
+        for artist, monster in zip(self.monsters, monsters_pos):
+            self._place(artist, monster)
+
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in [self.hero, self.treasure] + self.monsters:
+            self.ax.draw_artist(artist)
+
+        if self.mode == "human":
+            canvas.blit(self.fig.bbox)
+            canvas.flush_events()
+            return None
+        return self.frame()
+
+    def frame(self):
+        """
+        Renvoie l'image actuellement dessinée, sous forme de tableau (hauteur, largeur, 3).
+        """
+        return np.asarray(self.fig.canvas.buffer_rgba())[..., :3].copy()
+
+    def close(self):
+        if self.mode == "human":
+            import matplotlib.pyplot as plt
+            plt.close(self.fig)
+        self.fig = None
+
+class VideoWriter:
+    """
+    Écrit des images au fil de l'épisode dans un fichier GIF ou MP4.
+
+    Si ffmpeg est disponible, les images lui sont transmises en flux (rien n'est gardé en mémoire). Sinon,
+    les GIF sont écrits avec Pillow à la fermeture, à partir d'images compressées en palette ; le MP4
+    nécessite ffmpeg.
+
+    Utilisable comme gestionnaire de contexte :
+        with VideoWriter("episode.gif", fps=4) as writer:
+            writer.write(frame)
+    """
+    def __init__(self, path, fps=4):
+        self.path = path
+        self.fps = fps
+        self.extension = os.path.splitext(path)[1].lower()
+        if self.extension not in (".gif", ".mp4"):
+            raise ValueError(f"Format non supporté : {self.extension!r} (attendu .gif ou .mp4)")
+        self._ffmpeg = shutil.which("ffmpeg")
+        if self._ffmpeg is None and self.extension == ".mp4":
+            raise RuntimeError("L'export MP4 nécessite ffmpeg (introuvable dans le PATH)")
+        self._process = None
+        self._frames = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, frame):
+        """
+        Ajoute une image (hauteur, largeur, 3) uint8.
+        """
+        if self._ffmpeg is None:
+            from PIL import Image
+            self._frames.append(Image.fromarray(frame).quantize(colors=256))
+            return
+        if self._process is None:
+            height, width = frame.shape[:2]
+            command = [self._ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                       "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-"]
+            if self.extension == ".mp4":
+                command += ["-vcodec", "libx264", "-pix_fmt", "yuv420p", "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+            self._process = subprocess.Popen(command + [self.path], stdin=subprocess.PIPE)
+        self._process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+        elif self._frames:
+            self._frames[0].save(self.path, save_all=True, append_images=self._frames[1:],
+                                 duration=int(1000 / self.fps), loop=0)
+            self._frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
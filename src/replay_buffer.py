@@ -0,0 +1,207 @@
+import os
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.buffers import BaseBuffer, ReplayBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+def observation_layout(obs_dim, n_monsters=3):
+    """
+    Taille de grille et nombre de caractéristiques d'une observation GameEnv de dimension `obs_dim`.
+
+    L'observation contient la grille aplatie (grid_size² cases), la position relative du trésor (2), une distance
+    par monstre (n_monsters) et l'indicateur de proximité au trésor (1).
+    """
+    grid_size = int(round(np.sqrt(obs_dim - 3 - n_monsters)))
+    if grid_size * grid_size + 3 + n_monsters != obs_dim:
+        raise ValueError(f"Dimension d'observation {obs_dim} incompatible avec une observation GameEnv "
+                         f"à {n_monsters} monstres")
+    return grid_size
+
+def code_dtype(grid_size):
+    """
+    Plus petit type entier signé qui contient les codes d'une grille de `grid_size` cases de côté (int8 jusqu'à
+    11x11, dont la grille 10x10 par défaut).
+    """
+    largest = max(grid_size * grid_size - 1, 2 * grid_size)
+    return np.int8 if largest <= 127 else np.int16 if largest <= 32767 else np.int32
+
+def encode_observations(obs, n_monsters=3, grid_size=None):
+    """
+    Encode un batch d'observations GameEnv en codes entiers compacts (int8 sur la grille 10x10, voir `code_dtype`).
+
+    Chaque observation devient `2 * n_monsters + 5` entiers :
+    - la case visible du héros (valeur 1), du trésor (0.5) et jusqu'à `n_monsters` cases de monstres (-1), par
+      ordre croissant, ou -1 si aucune case ne porte cette valeur (entité recouverte ou monstres superposés),
+    - la position relative du trésor et les distances aux monstres, multipliées par grid_size,
+    - l'indicateur de proximité au trésor.
+    Le décodage (`decode_observations`) redonne exactement les mêmes float32.
+
+    Args:
+        obs (np.ndarray): Observations, forme (batch, obs_dim).
+        n_monsters (int): Nombre de monstres.
+        grid_size (int, optional): Taille de la grille, déduite de la dimension des observations par défaut.
+
+    Returns:
+        np.ndarray: Codes, forme (batch, 2 * n_monsters + 5).
+    """
+    obs = np.asarray(obs)
+    n = grid_size or observation_layout(obs.shape[-1], n_monsters)
+    n_cells = n * n
+    codes = np.full((len(obs), 2 * n_monsters + 5), -1, dtype=code_dtype(n))
+
+    #au plus 2 + n_monsters cases non nulles par observation, renvoyées par ligne puis par case croissante
+    rows, cells = np.nonzero(obs[:, :n_cells])
+    values = obs[rows, cells]
+    hero, treasure, monster = values == 1, values == 0.5, values == -1
+    codes[rows[hero], 0] = cells[hero]
+    codes[rows[treasure], 1] = cells[treasure]
+    rows, cells = rows[monster], cells[monster]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows) #rang de la case parmi les monstres de sa ligne
+    kept = rank < n_monsters
+    codes[rows[kept], 2 + rank[kept]] = cells[kept]
+
+    codes[:, 2 + n_monsters:-1] = np.rint(obs[:, n_cells:-1] * n)
+    codes[:, -1] = obs[:, -1]
+    return codes
+
+def decode_observations(codes, grid_size=10, n_monsters=3, dtype=np.float32):
+    """
+    Opération inverse de `encode_observations`, vectorisée sur le batch.
+
+    Args:
+        codes (np.ndarray): Codes, forme (batch, 2 * n_monsters + 5).
+        grid_size (int): Taille de la grille.
+        n_monsters (int): Nombre de monstres.
+        dtype: Type des observations produites.
+
+    Returns:
+        np.ndarray: Observations, forme (batch, grid_size² + n_monsters + 3).
+    """
+    n_cells = grid_size * grid_size
+    n_slots = 2 + n_monsters
+    obs = np.zeros((len(codes), n_cells + 3 + n_monsters), dtype=dtype)
+    #les cases visibles sont distinctes dans une observation : une seule affectation suffit
+    cells = codes[:, :n_slots]
+    visible = cells >= 0
+    rows = np.broadcast_to(np.arange(len(codes))[:, None], cells.shape)
+    values = np.broadcast_to(np.r_[1, 0.5, np.full(n_monsters, -1)].astype(dtype), cells.shape)
+    obs[rows[visible], cells[visible]] = values[visible]
+    #mêmes opérations que l'environnement : division en float64 par grid_size puis conversion en float32
+    obs[:, n_cells:n_cells + 2 + n_monsters] = codes[:, 2 + n_monsters:-1] / grid_size
+    obs[:, -1] = codes[:, -1]
+    return obs
+
+class CompactReplayBuffer(ReplayBuffer):
+    """
+    Replay buffer pour GameEnv qui stocke les observations encodées en entiers (`encode_observations`).
+
+    Une observation de 106 float32 (424 octets) tient en 11 octets, et une transition complète en 29 octets au lieu
+    de 868 pour le ReplayBuffer de stable-baselines3 (codes int16 au-delà d'une grille 11x11), ce qui permet des
+    buffers de plusieurs dizaines de millions de transitions. Les observations sont décodées en une passe NumPy au
+    tirage d'un batch ; les tirages aléatoires sont ceux du ReplayBuffer, donc à graine égale les batches sont
+    identiques à ceux du buffer par défaut.
+
+    Les tableaux gardent les noms du ReplayBuffer (`observations`, `next_observations`, `actions`...) : les
+    checkpoints (`src/checkpoint.py`) les sauvegardent et les rechargent sans traitement particulier.
+
+    Utilisation : `DQN(..., replay_buffer_class=CompactReplayBuffer, replay_buffer_kwargs={"path": ...})`.
+
+    Args:
+        buffer_size (int): Nombre maximal de transitions.
+        observation_space, action_space: Espaces de l'environnement (observation GameEnv, action discrète).
+        device: Appareil torch des batches.
+        n_envs (int): Nombre d'environnements parallèles.
+        optimize_memory_usage (bool): Non supporté (le buffer est déjà compact).
+        handle_timeout_termination (bool): Comme pour ReplayBuffer.
+        n_monsters (int): Nombre de monstres de l'observation.
+        path (str, optional): Dossier où placer les tableaux en mémoire mappée (fichiers .npy) plutôt qu'en RAM.
+        validate (bool): Vérifie à chaque ajout que le décodage redonne exactement les observations, et lève
+            une ValueError sinon (observation qui ne vient pas de GameEnv).
+    """
+    def __init__(self, buffer_size, observation_space, action_space, device="auto", n_envs=1,
+                 optimize_memory_usage=False, handle_timeout_termination=True, n_monsters=3, path=None,
+                 validate=False):
+        if optimize_memory_usage:
+            raise ValueError("CompactReplayBuffer ne supporte pas optimize_memory_usage")
+        if not isinstance(action_space, spaces.Discrete) or action_space.n > 127:
+            raise ValueError("CompactReplayBuffer suppose un espace d'actions discret de moins de 128 actions")
+        #BaseBuffer seulement : ReplayBuffer.__init__ allouerait les tableaux float32 complets
+        BaseBuffer.__init__(self, buffer_size, observation_space, action_space, device, n_envs=n_envs)
+        self.buffer_size = max(buffer_size // n_envs, 1)
+        self.optimize_memory_usage = False
+        self.handle_timeout_termination = handle_timeout_termination
+        self.n_monsters = n_monsters
+        self.grid_size = observation_layout(self.obs_shape[0], n_monsters)
+        self.obs_dtype = observation_space.dtype
+        self.action_dtype = self._maybe_cast_dtype(action_space.dtype)
+        self.path = path
+        self.validate = validate
+
+        shape = (self.buffer_size, self.n_envs)
+        code_size = 2 * n_monsters + 5
+        self.observations = self._allocate("observations", shape + (code_size,), code_dtype(self.grid_size))
+        self.next_observations = self._allocate("next_observations", shape + (code_size,), code_dtype(self.grid_size))
+        self.actions = self._allocate("actions", shape + (self.action_dim,), np.int8)
+        self.rewards = self._allocate("rewards", shape, np.float32)
+        self.dones = self._allocate("dones", shape, np.int8)
+        self.timeouts = self._allocate("timeouts", shape, np.int8)
+
+    def _allocate(self, name, shape, dtype):
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(self.path, exist_ok=True)
+        return np.lib.format.open_memmap(os.path.join(self.path, f"{name}.npy"), mode="w+", dtype=dtype, shape=shape)
+
+    @property
+    def nbytes(self):
+        """
+        Taille totale des tableaux du buffer, en octets.
+        """
+        return sum(getattr(self, name).nbytes for name in
+                   ("observations", "next_observations", "actions", "rewards", "dones", "timeouts"))
+
+    def _encode(self, obs):
+        obs = np.asarray(obs).reshape(self.n_envs, -1)
+        codes = encode_observations(obs, self.n_monsters, self.grid_size)
+        if self.validate and not np.array_equal(self._decode(codes), obs.astype(self.obs_dtype)):
+            raise ValueError("Observation non représentable par CompactReplayBuffer (pas une observation GameEnv)")
+        return codes
+
+    def _decode(self, codes):
+        return decode_observations(codes, self.grid_size, self.n_monsters, dtype=self.obs_dtype)
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        self.observations[self.pos] = self._encode(obs)
+        self.next_observations[self.pos] = self._encode(next_obs)
+        self.actions[self.pos] = np.asarray(action).reshape(self.n_envs, self.action_dim)
+        self.rewards[self.pos] = reward
+        self.dones[self.pos] = done
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = [info.get("TimeLimit.truncated", False) for info in infos]
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def _get_samples(self, batch_inds, env=None):
+        #même tirage des environnements que ReplayBuffer._get_samples
+        env_indices = np.random.randint(0, high=self.n_envs, size=(len(batch_inds),))
+        dones = self.dones[batch_inds, env_indices].astype(np.float32)
+        timeouts = self.timeouts[batch_inds, env_indices].astype(np.float32)
+        data = (
+            self._normalize_obs(self._decode(self.observations[batch_inds, env_indices]), env),
+            self.actions[batch_inds, env_indices].astype(self.action_dtype),
+            self._normalize_obs(self._decode(self.next_observations[batch_inds, env_indices]), env),
+            (dones * (1 - timeouts)).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds, env_indices].reshape(-1, 1), env),
+        )
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
+
+    def flush(self):
+        """
+        Écrit sur disque les pages modifiées des tableaux en mémoire mappée (sans effet en RAM).
+        """
+        for name in ("observations", "next_observations", "actions", "rewards", "dones", "timeouts"):
+            array = getattr(self, name)
+            if isinstance(array, np.memmap):
+                array.flush()
@@ -0,0 +1,230 @@
+import asyncio
+import struct
+import time
+import numpy as np
+from src.profiling import PhaseProfiler
+
+#protocole du socket Unix : une requête est un entier "<I" (nombre d'observations) suivi des observations en
+#float32 little-endian ; la réponse contient une action int32 little-endian par observation
+HEADER = struct.Struct("<I")
+
+class PolicyServer:
+    """
+    Serveur de politique qui regroupe les requêtes de nombreux clients en micro-batches.
+
+    Le modèle est chargé une seule fois. Chaque client envoie une observation (ou un petit batch) par
+    `await server.predict(obs)`, dans le même processus, ou par un socket Unix (`serve_unix` et
+    `UnixPolicyClient`). Une tâche asyncio attend la première requête en file, puis en accumule d'autres jusqu'à
+    `max_batch_size` observations ou jusqu'à `max_wait_ms` millisecondes, et répond à tous les clients avec un
+    seul `predict` batché.
+
+    Les mesures sont tenues dans un PhaseProfiler (`src/profiling.py`) : attente en file de chaque requête
+    ("queue_wait"), durée de chaque inférence ("inference"), nombre de requêtes, d'observations et de batches.
+
+    Attributes:
+        policy: Objet exposant `predict(obs, deterministic=...)` sur un batch (ex : modèle DQN).
+        max_batch_size (int): Nombre maximal d'observations par batch (une requête n'est jamais découpée).
+        max_wait_ms (float): Attente maximale, après la première requête d'un batch, avant l'inférence.
+        deterministic (bool): Politique déterministe (greedy) ou non.
+        profiler (PhaseProfiler): Mesures du serveur.
+    """
+    def __init__(self, policy, max_batch_size=256, max_wait_ms=1.0, deterministic=True):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.deterministic = deterministic
+        shape = getattr(policy, "observation_shape", None) or policy.observation_space.shape #NumpyPolicy ou DQN
+        self.obs_dim = int(np.prod(shape))
+        self.profiler = PhaseProfiler()
+        self._queue = None
+        self._task = None
+        self._servers = []
+        self._started = None
+
+    @classmethod
+    def from_path(cls, model_path="src/models/hero_agent", **kwargs):
+        """
+        Charge le modèle sauvegardé (une seule fois) et construit le serveur.
+        """
+        from src.evaluation import load_policy
+        return cls(load_policy(model_path), **kwargs)
+
+    async def start(self):
+        """
+        Démarre la tâche de regroupement des requêtes (dans la boucle asyncio courante).
+        """
+        self.profiler = PhaseProfiler()
+        self._started = time.perf_counter()
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._batch_loop())
+        return self
+
+    async def stop(self):
+        """
+        Ferme les sockets ouverts par `serve_unix` et arrête la tâche de regroupement.
+        """
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def predict(self, obs):
+        """
+        Action(s) pour une observation (forme (obs_dim,), renvoie un entier) ou un batch (forme (n, obs_dim),
+        renvoie un tableau de n actions).
+        """
+        obs = np.asarray(obs, dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((obs.reshape(-1, self.obs_dim), future, time.perf_counter()))
+        actions = await future
+        return int(actions[0]) if obs.ndim == 1 else actions
+
+    async def _collect(self):
+        """
+        Attend une requête puis accumule les suivantes jusqu'à `max_batch_size` observations ou `max_wait_ms`.
+        """
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            try:
+                request = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            batch.append(request)
+            rows += len(request[0])
+        return batch, rows
+
+    async def _batch_loop(self):
+        profiler = self.profiler
+        while True:
+            batch, rows = await self._collect()
+            start = time.perf_counter()
+            for _, _, enqueued in batch:
+                profiler.record("queue_wait", start - enqueued)
+            obs = batch[0][0] if len(batch) == 1 else np.concatenate([request[0] for request in batch])
+            try:
+                actions, _ = self.policy.predict(obs, deterministic=self.deterministic)
+            except Exception as error: #l'erreur est transmise aux clients, le serveur continue
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            profiler.record("inference", time.perf_counter() - start)
+            profiler.count("requests", len(batch))
+            profiler.count("observations", rows)
+            profiler.count("batches")
+
+            offset = 0
+            for request, future, _ in batch:
+                if not future.done(): #client parti entre-temps
+                    future.set_result(actions[offset:offset + len(request)])
+                offset += len(request)
+
+    async def serve_unix(self, path):
+        """
+        Accepte des clients sur le socket Unix `path` (voir `UnixPolicyClient`). Le serveur doit être démarré.
+        """
+        server = await asyncio.start_unix_server(self._handle_connection, path=path)
+        self._servers.append(server)
+        return server
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                (n_obs,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                data = await reader.readexactly(n_obs * self.obs_dim * 4)
+                obs = np.frombuffer(data, dtype="<f4").reshape(n_obs, self.obs_dim)
+                actions = await self.predict(obs)
+                writer.write(np.asarray(actions, dtype="<i4").tobytes())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass #client déconnecté
+        finally:
+            writer.close()
+
+    def stats(self):
+        """
+        Débit et latences du serveur depuis son démarrage.
+
+        Returns:
+            dict: Nombre de requêtes, d'observations et de batches, taille moyenne des batches, débit
+            (observations/s), attente en file (moyenne, p50 et p99, en ms) et durée moyenne d'une inférence (ms).
+        """
+        data = self.profiler.to_dict()
+        counters, phases = data["counters"], data["phases"]
+        elapsed = time.perf_counter() - self._started if self._started is not None else 0.0
+        batches = counters.get("batches", 0)
+        stats = {
+            "requests": counters.get("requests", 0),
+            "observations": counters.get("observations", 0),
+            "batches": batches,
+            "mean_batch_size": counters.get("observations", 0) / batches if batches else 0.0,
+            "throughput_obs_per_s": counters.get("observations", 0) / elapsed if elapsed else 0.0,
+        }
+        if "queue_wait" in phases:
+            wait = phases["queue_wait"]
+            stats.update(queue_wait_mean_ms=wait["mean_s"] * 1e3, queue_wait_p50_ms=wait["p50_s"] * 1e3,
+                         queue_wait_p99_ms=wait["p99_s"] * 1e3)
+        if "inference" in phases:
+            stats["inference_mean_ms"] = phases["inference"]["mean_s"] * 1e3
+        return stats
+
+class UnixPolicyClient:
+    """
+    Client asyncio d'un PolicyServer exposé par `serve_unix`.
+
+    Attributes:
+        path (str): Chemin du socket Unix.
+        obs_dim (int): Dimension des observations.
+    """
+    def __init__(self, path, obs_dim=106):
+        self.path = path
+        self.obs_dim = obs_dim
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        return self
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def predict(self, obs):
+        """
+        Même interface que `PolicyServer.predict`.
+        """
+        obs = np.asarray(obs, dtype="<f4")
+        batch = obs.reshape(-1, self.obs_dim)
+        self._writer.write(HEADER.pack(len(batch)) + batch.tobytes())
+        await self._writer.drain()
+        actions = np.frombuffer(await self._reader.readexactly(4 * len(batch)), dtype="<i4")
+        return int(actions[0]) if obs.ndim == 1 else actions
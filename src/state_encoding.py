@@ -0,0 +1,64 @@
+import numpy as np
+
+def encode_state(hero_pos, treasure_pos, monsters_pos, grid_size=10, sort_monsters=False):
+    """
+    Encode l'état complet d'un plateau (ou d'un batch de plateaux) en une clé entière unique.
+
+    Chaque entité est ramenée à l'indice de sa case `ligne * grid_size + colonne`, puis les indices sont combinés
+    en base grid_size² : héros, trésor, puis monstres. Avec une grille 10x10 et 3 monstres, la clé tient dans
+    un int64 (< 10^10).
+
+    Args:
+        hero_pos (array-like): Position(s) du héros, forme (..., 2).
+        treasure_pos (array-like): Position(s) du trésor, forme (..., 2).
+        monsters_pos (array-like): Positions des monstres, forme (..., n_monsters, 2).
+        grid_size (int): Taille de la grille.
+        sort_monsters (bool): Trie les monstres par case avant l'encodage. Les monstres étant interchangeables,
+            cela fusionne les états qui ne diffèrent que par leur ordre (jusqu'à 6 fois moins d'états).
+
+    Returns:
+        np.ndarray: Clé(s) int64, de forme (...).
+    """
+    hero_pos = np.asarray(hero_pos, dtype=np.int64)
+    treasure_pos = np.asarray(treasure_pos, dtype=np.int64)
+    monsters_pos = np.asarray(monsters_pos, dtype=np.int64)
+    n_cells = grid_size * grid_size
+
+    monster_cells = monsters_pos[..., 0] * grid_size + monsters_pos[..., 1]
+    if sort_monsters:
+        monster_cells = np.sort(monster_cells, axis=-1)
+
+    key = np.zeros(hero_pos.shape[:-1], dtype=np.int64)
+    for m in range(monster_cells.shape[-1] - 1, -1, -1):
+        key = key * n_cells + monster_cells[..., m]
+    key = key * n_cells + treasure_pos[..., 0] * grid_size + treasure_pos[..., 1]
+    key = key * n_cells + hero_pos[..., 0] * grid_size + hero_pos[..., 1]
+    return key
+
+def decode_state(keys, grid_size=10, n_monsters=3):
+    """
+    Opération inverse de `encode_state`.
+
+    Args:
+        keys (array-like): Clé(s) int64.
+        grid_size (int): Taille de la grille.
+        n_monsters (int): Nombre de monstres encodés.
+
+    Returns:
+        tuple: (hero_pos, treasure_pos, monsters_pos), de formes (..., 2), (..., 2) et (..., n_monsters, 2).
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    n_cells = grid_size * grid_size
+    cells = []
+    for _ in range(2 + n_monsters):
+        keys, cell = np.divmod(keys, n_cells)
+        cells.append(cell)
+    positions = np.stack(np.divmod(np.stack(cells, axis=-1), grid_size), axis=-1)
+    return positions[..., 0, :], positions[..., 1, :], positions[..., 2:, :]
+
+def env_state_key(env, sort_monsters=False):
+    """
+    Clé(s) de l'état courant d'un GameEnv (scalaire) ou d'un VecGameEnv (une par plateau).
+    """
+    return encode_state(env.hero_pos, env.treasure_pos, np.asarray(env.monsters_pos), grid_size=env.grid_size,
+                        sort_monsters=sort_monsters)
@@ -0,0 +1,289 @@
+"""
+Recherche d'hyperparamètres DQN en parallèle, avec arrêt anticipé des essais et cache des résultats.
+
+Usage :
+    python -m src.sweep [--space space.json] [--seeds 0 1] [--workers 4] [--n-trials 20] [--output sweeps]
+
+L'espace de recherche est un JSON {paramètre: [valeurs]}. Les paramètres "total_timesteps", "n_envs" et "vec_env"
+règlent l'entraînement, les autres sont passés à DQN (exploration_fraction, learning_rate, gamma...).
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+#paramètres de l'essai qui ne sont pas des arguments de DQN
+TRIAL_KEYS = ("total_timesteps", "n_envs", "vec_env")
+BASE_CONFIG = {"total_timesteps": 200000, "n_envs": 8, "vec_env": "native"}
+DEFAULT_SPACE = {
+    "exploration_fraction": [0.3, 0.5, 0.8],
+    "exploration_final_eps": [0.05, 0.1, 0.2],
+    "learning_rate": [1e-4, 5e-4],
+}
+
+def grid(space):
+    """
+    Toutes les combinaisons d'un espace de recherche {paramètre: [valeurs]}.
+    """
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+def sample(space, n_trials, seed=0):
+    """
+    `n_trials` combinaisons distinctes tirées au hasard (toutes si l'espace est plus petit).
+    """
+    configs = grid(space)
+    return random.Random(seed).sample(configs, min(n_trials, len(configs)))
+
+def trial_key(config, seed, eval_episodes=1000):
+    """
+    Clé de cache d'un essai : empreinte de sa configuration complète, de sa graine et de la taille de son évaluation.
+    """
+    payload = json.dumps({"config": config, "seed": seed, "eval_episodes": eval_episodes}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+def stopping_settings(early_stopping, check_fraction, grace_fraction, min_trials):
+    """
+    Réglages de l'arrêt anticipé enregistrés avec chaque résultat (None s'il est désactivé).
+    """
+    if not early_stopping:
+        return None
+    return {"check_fraction": check_fraction, "grace_fraction": grace_fraction, "min_trials": min_trials}
+
+def is_reusable(result, stopping):
+    """
+    Indique si un résultat en cache peut être repris tel quel.
+
+    Un essai terminé ne dépend pas de l'arrêt anticipé (le callback ne modifie pas l'entraînement). Un essai arrêté
+    dépend des autres essais et des réglages de l'arrêt : il n'est repris que si l'arrêt anticipé est actif avec les
+    mêmes réglages, et relancé sinon.
+    """
+    return result["status"] == "completed" or (stopping is not None and result.get("stopping") == stopping)
+
+class MedianStoppingRule:
+    """
+    Règle d'arrêt médiane, partagée entre les processus d'un sweep.
+
+    À chaque palier, un essai note son taux de succès glissant dans un dictionnaire partagé. Il est arrêté si au
+    moins `min_trials` autres essais ont déjà atteint ce palier et si son taux est inférieur au `percentile` de
+    leurs taux (la médiane par défaut) : un essai n'est jamais comparé qu'à des essais au même stade.
+
+    Attributes:
+        shared (dict): Dictionnaire partagé {(palier, clé d'essai): taux} (proxy multiprocessing).
+        key (str): Clé de l'essai.
+        min_trials (int): Nombre minimal d'essais de référence pour décider.
+        percentile (float): Percentile des taux de référence sous lequel l'essai est arrêté.
+    """
+    def __init__(self, shared, key, min_trials=3, percentile=50):
+        self.shared = shared
+        self.key = key
+        self.min_trials = min_trials
+        self.percentile = percentile
+
+    def __call__(self, timesteps, rate):
+        others = [value for (milestone, key), value in self.shared.items() if milestone == timesteps and key != self.key]
+        self.shared[(timesteps, self.key)] = rate
+        return len(others) >= self.min_trials and rate < np.percentile(others, self.percentile)
+
+def run_trial(config, seed, shared=None, check_fraction=0.1, grace_fraction=0.3, min_trials=3,
+              eval_episodes=1000, model_dir=None):
+    """
+    Entraîne et évalue un essai (exécuté dans un processus du pool).
+
+    Args:
+        config (dict): Configuration complète (TRIAL_KEYS et arguments de DQN).
+        seed (int): Graine de l'environnement et de DQN.
+        shared (dict, optional): Dictionnaire partagé de la règle d'arrêt médiane, None pour désactiver l'arrêt.
+        check_fraction (float): Intervalle entre deux vérifications, en fraction de total_timesteps.
+        grace_fraction (float): Part de l'entraînement sans arrêt possible.
+        min_trials (int): Voir MedianStoppingRule.
+        eval_episodes (int): Épisodes de l'évaluation finale déterministe (voir `run_episodes`).
+        model_dir (str, optional): Dossier où sauvegarder le modèle de l'essai.
+
+    Returns:
+        dict: Résultat sérialisable en JSON (statut "completed" ou "pruned", historique, évaluation, et réglages
+        de l'arrêt anticipé sous "stopping", None s'il est désactivé).
+    """
+    import torch
+    from stable_baselines3 import DQN
+    from src.callbacks import RewardTrackerCallback, EarlyStoppingCallback
+    from src.evaluation import run_episodes
+    from src.train import make_training_env, update_schedule
+
+    torch.set_num_threads(1) #un coeur par essai
+    start = time.perf_counter()
+    key = trial_key(config, seed, eval_episodes)
+    total_timesteps, n_envs, vec_env = (config[name] for name in TRIAL_KEYS)
+    dqn_kwargs = {name: value for name, value in config.items() if name not in TRIAL_KEYS}
+    train_freq, gradient_steps = update_schedule(n_envs, dqn_kwargs.pop("train_freq", None),
+                                                 dqn_kwargs.pop("gradient_steps", None))
+
+    env = make_training_env(n_envs=n_envs, vec_env=vec_env, seed=seed)
+    model = DQN("MlpPolicy", env, verbose=0, seed=seed, device="cpu", train_freq=train_freq,
+                gradient_steps=gradient_steps, **dqn_kwargs)
+    tracker = RewardTrackerCallback()
+    callbacks = [tracker]
+    stopper = None
+    if shared is not None:
+        stopper = EarlyStoppingCallback(tracker, max(1, int(check_fraction * total_timesteps)),
+                                        MedianStoppingRule(shared, key, min_trials),
+                                        grace_timesteps=int(grace_fraction * total_timesteps))
+        callbacks.append(stopper)
+    model.learn(total_timesteps=total_timesteps, callback=callbacks)
+    env.close()
+
+    result = {
+        "key": key, "config": config, "seed": seed,
+        "status": "pruned" if stopper is not None and stopper.stopped else "completed",
+        "timesteps": int(model.num_timesteps),
+        "rolling_success_rate": float(tracker.rolling_success_rate),
+        "rolling_reward": float(tracker.rolling_reward),
+        "history": stopper.history if stopper is not None else [],
+        "stopping": stopping_settings(shared is not None, check_fraction, grace_fraction, min_trials),
+    }
+    if result["status"] == "completed":
+        summary = run_episodes(model, eval_episodes, seed=seed, max_episode_steps=200).summary()
+        result["eval"] = {"success_rate": summary["success_rate"], "success_rate_ci": summary["success_rate_ci"],
+                          "reward_mean": summary["reward_mean"], "length_mean": summary["length_mean"]}
+        if model_dir is not None:
+            os.makedirs(model_dir, exist_ok=True)
+            model.save(os.path.join(model_dir, key))
+    result["elapsed_s"] = time.perf_counter() - start
+    return result
+
+def _score(result):
+    """
+    Clé de classement : essais terminés d'abord, puis taux de succès et récompense en évaluation (ou glissants).
+    """
+    metrics = result.get("eval") or {"success_rate": result["rolling_success_rate"],
+                                     "reward_mean": result["rolling_reward"]}
+    return (result["status"] == "completed", metrics["success_rate"], metrics["reward_mean"])
+
+def summarize(results):
+    """
+    Tableau texte des essais classés (meilleur en premier).
+    """
+    lines = [f"{'rang':>4}  {'statut':<10}{'succès':>8}{'récomp.':>9}{'pas':>9}{'durée':>8}  config (graine)"]
+    for rank, result in enumerate(sorted(results, key=_score, reverse=True), 1):
+        metrics = result.get("eval") or {"success_rate": result["rolling_success_rate"],
+                                         "reward_mean": result["rolling_reward"]}
+        params = ", ".join(f"{name}={value}" for name, value in sorted(result["config"].items())
+                           if name not in TRIAL_KEYS)
+        lines.append(f"{rank:>4}  {result['status']:<10}{metrics['success_rate'] * 100:>7.1f}%"
+                     f"{metrics['reward_mean']:>9.2f}{result['timesteps']:>9}{result['elapsed_s']:>7.0f}s  "
+                     f"{params} ({result['seed']})")
+    return "\n".join(lines)
+
+def run_sweep(space=None, configs=None, seeds=(0,), base_config=None, n_workers=None, output_dir="sweeps",
+              early_stopping=True, check_fraction=0.1, grace_fraction=0.3, min_trials=3, eval_episodes=1000,
+              save_models=False, verbose=True):
+    """
+    Lance un sweep : un essai par configuration et par graine, répartis sur un pool de processus.
+
+    Les essais déjà présents dans le cache (`output_dir/cache/<clé>.json`, clé tirée de la configuration complète,
+    de la graine et de `eval_episodes`) ne sont pas relancés, et leur historique alimente la règle d'arrêt des
+    nouveaux essais. Un essai arrêté en cache est relancé si l'arrêt anticipé est désactivé ou réglé autrement
+    (voir `is_reusable`). Les essais dont le taux de succès glissant passe sous la médiane des autres au même
+    palier sont arrêtés (voir MedianStoppingRule). Le classement est écrit dans `output_dir/summary.json` et
+    `output_dir/summary.txt`.
+
+    Args:
+        space (dict, optional): Espace de recherche {paramètre: [valeurs]}, parcouru en grille.
+        configs (list, optional): Configurations explicites, à la place de `space` (ex : `sample(space, 20)`).
+        seeds (tuple): Graines ; chaque configuration est essayée avec chacune.
+        base_config (dict, optional): Valeurs communes, complétées par BASE_CONFIG et DQN_DEFAULTS.
+        n_workers (int, optional): Nombre de processus (tous les coeurs par défaut).
+        output_dir (str): Dossier du cache, du classement et des modèles.
+        early_stopping (bool): Active l'arrêt anticipé.
+        check_fraction, grace_fraction, min_trials: Voir `run_trial` et MedianStoppingRule.
+        eval_episodes (int): Épisodes de l'évaluation finale de chaque essai terminé.
+        save_models (bool): Sauvegarde le modèle de chaque essai terminé dans `output_dir/models/`.
+        verbose (bool): Affiche l'avancement et le classement.
+
+    Returns:
+        list: Résultats de tous les essais, classés du meilleur au moins bon.
+    """
+    from src.train import DQN_DEFAULTS
+
+    if configs is None:
+        configs = grid(space if space is not None else DEFAULT_SPACE)
+    base = {**BASE_CONFIG, **DQN_DEFAULTS, **(base_config or {})}
+    trials = [({**base, **config}, seed) for config in configs for seed in seeds]
+    cache_dir = os.path.join(output_dir, "cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    model_dir = os.path.join(output_dir, "models") if save_models else None
+
+    stopping = stopping_settings(early_stopping, check_fraction, grace_fraction, min_trials)
+    results, pending = [], []
+    for config, seed in trials:
+        path = os.path.join(cache_dir, f"{trial_key(config, seed, eval_episodes)}.json")
+        cached = None
+        if os.path.exists(path):
+            with open(path) as f:
+                cached = json.load(f)
+        if cached is not None and is_reusable(cached, stopping):
+            results.append(cached)
+        else:
+            pending.append((config, seed))
+    if verbose:
+        print(f"{len(trials)} essais : {len(results)} en cache, {len(pending)} à lancer")
+
+    with multiprocessing.Manager() as manager:
+        shared = manager.dict() if early_stopping else None
+        if shared is not None:
+            for result in results:
+                for milestone, rate in result["history"]:
+                    shared[(milestone, result["key"])] = rate
+        with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(run_trial, config, seed, shared, check_fraction, grace_fraction, min_trials,
+                                       eval_episodes, model_dir) for config, seed in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                with open(os.path.join(cache_dir, f"{result['key']}.json"), "w") as f:
+                    json.dump(result, f, indent=2)
+                results.append(result)
+                if verbose:
+                    print(f"[{done}/{len(pending)}] {result['status']} en {result['elapsed_s']:.0f}s "
+                          f"(taux glissant {result['rolling_success_rate']:.2f}) : {result['config']}")
+
+    results.sort(key=_score, reverse=True)
+    table = summarize(results)
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    with open(os.path.join(output_dir, "summary.txt"), "w") as f:
+        f.write(table + "\n")
+    if verbose:
+        print("\n" + table)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--space", help="fichier JSON de l'espace de recherche (DEFAULT_SPACE sinon)")
+    parser.add_argument("--n-trials", type=int, help="nombre de configurations tirées au hasard (grille sinon)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="graines de chaque configuration")
+    parser.add_argument("--total-timesteps", type=int, default=BASE_CONFIG["total_timesteps"])
+    parser.add_argument("--workers", type=int, help="nombre de processus (tous les coeurs par défaut)")
+    parser.add_argument("--output", default="sweeps", help="dossier du cache et du classement")
+    parser.add_argument("--no-early-stopping", action="store_true", help="désactive l'arrêt anticipé")
+    parser.add_argument("--save-models", action="store_true", help="sauvegarde le modèle de chaque essai")
+    args = parser.parse_args()
+
+    import warnings
+    warnings.filterwarnings("ignore")
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    configs = sample(space, args.n_trials) if args.n_trials else grid(space)
+    run_sweep(configs=configs, seeds=args.seeds, base_config={"total_timesteps": args.total_timesteps},
+              n_workers=args.workers, output_dir=args.output, early_stopping=not args.no_early_stopping,
+              save_models=args.save_models)
+
+if __name__ == "__main__":
+    main()
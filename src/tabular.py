@@ -0,0 +1,293 @@
+import json
+import os
+import time
+import numpy as np
+from src.callbacks import RingBuffer
+from src.state_encoding import env_state_key
+from src.vec_env import VecGameEnv
+
+class QTable:
+    """
+    Table Q indexée par des clés d'état int64, stockée dans des tableaux NumPy (adressage ouvert, sondage linéaire).
+
+    `keys[i]` contient la clé occupant la case i (-1 si vide) et `values[i]` ses Q-valeurs, une par action.
+    Les recherches et insertions se font par batch : toutes les clés avancent d'une case de sondage à chaque
+    itération, ce qui évite tout dictionnaire Python. La table double de taille dès que son taux de
+    remplissage dépasse `max_load`.
+
+    Attributes:
+        n_actions (int): Nombre d'actions.
+        keys (np.ndarray): Clés, forme (capacity,).
+        values (np.ndarray): Q-valeurs, forme (capacity, n_actions), initialisées à 0.
+        size (int): Nombre de clés présentes.
+    """
+    EMPTY = -1
+    _HASH = np.uint64(0x9E3779B97F4A7C15) #hachage de Fibonacci
+
+    def __init__(self, n_actions=5, capacity=1 << 16, max_load=0.5, dtype=np.float32):
+        capacity = 1 << max(int(capacity - 1).bit_length(), 4) #puissance de 2
+        self.n_actions = n_actions
+        self.max_load = max_load
+        self.keys = np.full(capacity, self.EMPTY, dtype=np.int64)
+        self.values = np.zeros((capacity, n_actions), dtype=dtype)
+        self.size = 0
+
+    @property
+    def capacity(self):
+        return len(self.keys)
+
+    def __len__(self):
+        return self.size
+
+    def _hash(self, keys):
+        shift = np.uint64(64 - (self.capacity.bit_length() - 1))
+        with np.errstate(over="ignore"):
+            return ((keys.astype(np.uint64) * self._HASH) >> shift).astype(np.int64)
+
+    def find(self, keys):
+        """
+        Cases occupées par `keys` (-1 pour les clés absentes).
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        slots = self._hash(keys)
+        result = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        mask = self.capacity - 1
+        while len(pending):
+            s = slots[pending]
+            found = self.keys[s]
+            hit = found == keys[pending]
+            result[pending[hit]] = s[hit]
+            probe = ~hit & (found != self.EMPTY) #case vide : clé absente
+            slots[pending[probe]] = (s[probe] + 1) & mask
+            pending = pending[probe]
+        return result
+
+    def get_or_insert(self, keys):
+        """
+        Cases occupées par `keys`, en insérant (avec des Q-valeurs nulles) celles qui sont absentes.
+        """
+        unique, inverse = np.unique(np.asarray(keys, dtype=np.int64), return_inverse=True)
+        while self.size + len(unique) > self.max_load * self.capacity:
+            self._resize(2 * self.capacity)
+
+        slots = self._hash(unique)
+        result = np.empty(len(unique), dtype=np.int64)
+        pending = np.arange(len(unique))
+        mask = self.capacity - 1
+        while len(pending):
+            s = slots[pending]
+            found = self.keys[s]
+            hit = found == unique[pending]
+            empty = found == self.EMPTY
+            #plusieurs clés peuvent viser la même case vide : la dernière écriture gagne, les autres
+            #reverront la case occupée à l'itération suivante et continueront leur sondage
+            self.keys[s[empty]] = unique[pending[empty]]
+            claimed = empty & (self.keys[s] == unique[pending])
+            self.size += int(claimed.sum())
+            done = hit | claimed
+            result[pending[done]] = s[done]
+            probe = ~done & ~empty
+            slots[pending[probe]] = (s[probe] + 1) & mask
+            pending = pending[~done]
+        return result[inverse]
+
+    def q_values(self, keys):
+        """
+        Q-valeurs des états `keys`, forme (len(keys), n_actions) ; 0 pour les états jamais visités.
+        """
+        slots = self.find(keys)
+        q = self.values[np.maximum(slots, 0)].copy()
+        q[slots < 0] = 0
+        return q
+
+    def _resize(self, capacity):
+        occupied = self.keys != self.EMPTY
+        keys, values = self.keys[occupied], self.values[occupied]
+        self.keys = np.full(capacity, self.EMPTY, dtype=np.int64)
+        self.values = np.zeros((capacity, self.n_actions), dtype=self.values.dtype)
+        self.size = 0
+        self.values[self.get_or_insert(keys)] = values
+
+    def save(self, path):
+        """
+        Sauvegarde la table dans le dossier `path` (keys.npy, values.npy, meta.json).
+        """
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "keys.npy"), self.keys)
+        np.save(os.path.join(path, "values.npy"), self.values)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"n_actions": self.n_actions, "max_load": self.max_load, "size": self.size}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Charge une table sauvegardée par `save`, en mappant les fichiers en mémoire.
+
+        Args:
+            path (str): Dossier de la table.
+            mmap_mode (str, optional): "r" (lecture seule, rien n'est chargé avant d'être lu), "r+" (mises à jour
+                écrites directement dans les fichiers, sans agrandissement possible) ou None (copie en mémoire).
+
+        Returns:
+            QTable: La table.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        table = cls.__new__(cls)
+        table.n_actions = meta["n_actions"]
+        table.max_load = meta["max_load"]
+        table.size = meta["size"]
+        table.keys = np.load(os.path.join(path, "keys.npy"), mmap_mode=mmap_mode)
+        table.values = np.load(os.path.join(path, "values.npy"), mmap_mode=mmap_mode)
+        return table
+
+class TabularAgent:
+    """
+    Agent tabulaire (Q-learning ou SARSA) sur l'état exact du jeu, encodé par `src/state_encoding.py`.
+
+    Les mises à jour se font par batch de transitions (une par plateau d'un VecGameEnv) :
+    - Q-learning : Q(s, a) += lr * (r + gamma * max_a' Q(s', a') - Q(s, a))
+    - SARSA : Q(s, a) += lr * (r + gamma * Q(s', a') - Q(s, a)), avec a' l'action effectivement jouée ensuite.
+
+    Attributes:
+        algorithm (str): "q_learning" ou "sarsa".
+        table (QTable): Table Q.
+        learning_rate (float): Taux d'apprentissage.
+        gamma (float): Facteur d'actualisation.
+        sort_monsters (bool): Encodage des états sans tenir compte de l'ordre des monstres.
+    """
+    def __init__(self, algorithm="q_learning", learning_rate=0.1, gamma=0.99, sort_monsters=True, seed=None,
+                 table=None):
+        if algorithm not in ("q_learning", "sarsa"):
+            raise ValueError(f"algorithm doit valoir 'q_learning' ou 'sarsa', pas {algorithm!r}")
+        self.algorithm = algorithm
+        self.learning_rate = learning_rate
+        self.gamma = gamma
+        self.sort_monsters = sort_monsters
+        self.table = table if table is not None else QTable()
+        self.np_random = np.random.default_rng(seed)
+
+    def state_keys(self, env):
+        return env_state_key(env, sort_monsters=self.sort_monsters)
+
+    def act(self, keys, epsilon):
+        """
+        Actions epsilon-greedy pour un batch d'états (les états nouveaux sont ajoutés à la table).
+        Les égalités entre Q-valeurs maximales sont départagées au hasard.
+        """
+        slots = self.table.get_or_insert(keys) #avant de lire values, qui change si la table s'agrandit
+        q = self.table.values[slots]
+        rng = self.np_random
+        best = q == q.max(axis=1, keepdims=True)
+        actions = (best * rng.random(q.shape)).argmax(axis=1)
+        explore = rng.random(len(keys)) < epsilon
+        actions[explore] = rng.integers(0, self.table.n_actions, size=int(explore.sum()))
+        return actions
+
+    def predict_state(self, keys):
+        """
+        Actions greedy pour un batch d'états (n'ajoute rien à la table).
+        """
+        return self.table.q_values(keys).argmax(axis=1)
+
+    def update(self, keys, actions, rewards, next_keys, dones, next_actions=None):
+        """
+        Mise à jour TD d'un batch de transitions. Les transitions qui touchent le même couple (état, action) dans
+        un batch voient leurs incréments additionnés.
+        """
+        slots = self.table.find(keys)
+        next_q = self.table.q_values(next_keys)
+        if self.algorithm == "sarsa":
+            bootstrap = next_q[np.arange(len(next_keys)), next_actions]
+        else:
+            bootstrap = next_q.max(axis=1)
+        target = rewards + self.gamma * (1 - dones) * bootstrap
+        td_error = target - self.table.values[slots, actions]
+        np.add.at(self.table.values, (slots, actions), self.learning_rate * td_error)
+
+    def learn(self, env, total_timesteps, exploration_fraction=0.5, exploration_initial_eps=1.0,
+              exploration_final_eps=0.05, log_interval=None):
+        """
+        Entraîne l'agent sur un VecGameEnv.
+
+        Args:
+            env (VecGameEnv): Environnement vectorisé (les transitions de tous les plateaux sont apprises à chaque pas).
+            total_timesteps (int): Nombre total de transitions apprises, exactement : si ce n'est pas un multiple du
+                nombre de plateaux, seules les transitions des premiers plateaux sont apprises au dernier pas.
+            exploration_fraction (float): Fraction de l'entraînement pendant laquelle epsilon décroît linéairement.
+            exploration_initial_eps, exploration_final_eps (float): Valeurs initiale et finale d'epsilon.
+            log_interval (int, optional): Affiche la progression toutes les `log_interval` transitions.
+
+        Returns:
+            RingBuffer: Succès des derniers épisodes (moyenne mobile sur 1000 épisodes).
+        """
+        successes = RingBuffer(100000, window=1000, dtype=np.bool_)
+        env.reset()
+        keys = self.state_keys(env)
+        actions = self.act(keys, exploration_initial_eps)
+        n_envs = env.num_envs
+        next_log = log_interval
+
+        for timestep in range(0, total_timesteps, n_envs):
+            progress = timestep / (exploration_fraction * total_timesteps)
+            epsilon = exploration_initial_eps + min(progress, 1) * (exploration_final_eps - exploration_initial_eps)
+
+            _, rewards, dones, infos = env.step(actions)
+            next_keys = self.state_keys(env) #plateaux terminés : état déjà réinitialisé, ignoré via dones
+            next_actions = self.act(next_keys, epsilon)
+            n = min(n_envs, total_timesteps - timestep) #transitions apprises à ce pas, pour finir au budget exact
+            self.update(keys[:n], actions[:n], rewards[:n], next_keys[:n], dones[:n].astype(np.float32),
+                        next_actions[:n])
+            keys, actions = next_keys, next_actions
+
+            if dones[:n].any():
+                successes.extend([infos[i].get("is_success", False) for i in np.flatnonzero(dones[:n])])
+            if next_log is not None and timestep + n >= next_log:
+                print(f"{timestep + n} pas | epsilon {epsilon:.3f} | états {len(self.table)} | "
+                      f"succès (1000 derniers épisodes) {successes.mean() * 100:.1f}%")
+                next_log += log_interval
+        return successes
+
+    def save(self, path):
+        self.table.save(path)
+        with open(os.path.join(path, "agent.json"), "w") as f:
+            json.dump({"algorithm": self.algorithm, "learning_rate": self.learning_rate, "gamma": self.gamma,
+                       "sort_monsters": self.sort_monsters}, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        with open(os.path.join(path, "agent.json")) as f:
+            params = json.load(f)
+        return cls(table=QTable.load(path, mmap_mode=mmap_mode), **params)
+
+def train_tabular(algorithm="q_learning", total_timesteps=5000000, n_envs=256, seed=None,
+                  save_path="src/models/hero_qtable", **learn_kwargs):
+    """
+    Entraîne un agent tabulaire sur CPU, sans réseau de neurones, et le sauvegarde.
+
+    L'espace d'états exact compte de l'ordre de 10^9 états (monstres triés) : la table ne généralise pas, il faut
+    donc beaucoup plus de transitions que pour DQN, d'où le débit élevé du VecGameEnv.
+
+    Args:
+        algorithm (str): "q_learning" ou "sarsa".
+        total_timesteps (int): Nombre total de transitions.
+        n_envs (int): Nombre de plateaux du VecGameEnv.
+        seed (int, optional): Graine de l'environnement et de l'agent.
+        save_path (str): Dossier de sauvegarde de la table.
+        **learn_kwargs: Paramètres d'exploration transmis à `TabularAgent.learn`.
+
+    Returns:
+        TabularAgent: L'agent entraîné.
+    """
+    env = VecGameEnv(num_envs=n_envs, seed=seed)
+    agent = TabularAgent(algorithm=algorithm, seed=seed)
+    learn_kwargs.setdefault("log_interval", total_timesteps // 10)
+
+    start = time.perf_counter()
+    agent.learn(env, total_timesteps, **learn_kwargs)
+    elapsed = time.perf_counter() - start
+    agent.save(save_path)
+    print(f"\nEntraînement tabulaire terminé : {total_timesteps} pas en {elapsed:.1f} s "
+          f"({total_timesteps / elapsed:.0f} pas/s, {len(agent.table)} états)")
+    return agent
@@ -1,52 +1,57 @@
-from stable_baselines3 import DQN
-from src.env import GameEnv
-import numpy as np
+from src.evaluation import evaluate_agent
+from src.profiling import PhaseProfiler
 
-def test_agent():
+def test_agent(num_episodes=100, n_envs=256, n_workers=1, seed=None, max_episode_steps=None, verbose=True,
+               profile=False, profile_path="profile_test.json", model_path="src/models/hero_agent",
+               trajectory_path=None):
     """
     Teste les performances d'un agent entraîné sur l'environnement.
 
+    Les épisodes sont joués en parallèle sur un environnement vectorisé, avec une seule prédiction batchée par pas
+    pour tous les épisodes en cours (voir `src/evaluation.py`), et peuvent être répartis sur plusieurs processus.
+
     Notes :
-    - Le fichier du modèle (par défaut "src/models/hero_agent.zip") doit exister.
-    - L'environnement GameEnv doit être correctement configuré pour indiquer les succès via `info["is_success"]`.
+    - Le fichier du modèle (par défaut "src/models/hero_agent.zip") doit exister. Une politique exportée en NumPy
+      ("src/models/hero_policy.npz", voir `src/numpy_policy.py`) peut le remplacer, sans charger torch.
+    - L'environnement doit être correctement configuré pour indiquer les succès via `info["is_success"]`.
+
+    Args:
+        num_episodes (int): Nombre d'épisodes à tester.
+        n_envs (int): Nombre d'épisodes joués simultanément par processus.
+        n_workers (int): Nombre de processus.
+        seed (int, optional): Graine de l'évaluation.
+        max_episode_steps (int, optional): Longueur maximale d'un épisode, au-delà il est compté comme un échec.
+        verbose (bool): Affiche le détail de chaque épisode.
+        profile (bool): Chronomètre l'inférence et les phases de l'environnement (tous workers confondus), écrit
+            les histogrammes dans `profile_path` et affiche un résumé.
+        profile_path (str): Fichier JSON des mesures de profiling.
+        model_path (str): Modèle DQN ou politique NumPy (.npz) à évaluer.
+        trajectory_path (str, optional): Journal où ajouter les épisodes joués (positions, actions, récompenses,
+            dones), pour les rejouer ensuite sans le modèle (voir `src/trajectory.py`).
 
     Returns:
-        Aucun retour direct, mais affiche les statistiques des performances de l'agent :
+        EvaluationResults: Résultats par épisode. Affiche aussi les statistiques des performances de l'agent :
         - Récompense moyenne sur tous les épisodes testés.
         - Taux de succès (en pourcentage).
-
     """
-    env = GameEnv() 
-
-    model = DQN.load("src/models/hero_agent")
-
-    #variables pour suivre les performances
-    num_episodes = 100  #nb d'épisodes à tester
-    total_rewards = []
-    successes = 0
-
-    for episode in range(num_episodes):
-        obs = env.reset()  #réinitialiser à chaque fois l'environnement
-        done = False
-        episode_reward = 0
-
-        while not done:
-            #prediction de l'action qu'il va prendre
-            action, _ = model.predict(obs, deterministic=True)
-            
-            #appliquer l'action et recupérer la valeur de la récompense
-            obs, reward, done, info = env.step(action)
-            episode_reward += reward
-
-        #compteur : si l'épisode est un succes ou non
-        is_success = info.get("is_success", False)
-        if is_success:
-            successes += 1
+    profiler = PhaseProfiler() if profile else None
+    results = evaluate_agent(model_path, n_episodes=num_episodes, n_envs=n_envs, n_workers=n_workers,
+                             seed=seed, max_episode_steps=max_episode_steps, profiler=profiler,
+                             trajectory_path=trajectory_path)
 
-        total_rewards.append(episode_reward)
-        print(f"Episode {episode + 1}: Reward = {episode_reward:.2f}, Success = {'Yes' if is_success else 'No'}")
+    if verbose:
+        for episode, (episode_reward, is_success) in enumerate(zip(results.rewards, results.successes)):
+            print(f"Episode {episode + 1}: Reward = {episode_reward:.2f}, Success = {'Yes' if is_success else 'No'}")
 
     #résumé des perf
+    summary = results.summary()
     print(f"\nTest terminé : {num_episodes} épisodes")
-    print(f"Récompense moyenne : {np.mean(total_rewards):.2f}")
-    print(f"Taux de succès : {successes / num_episodes * 100:.2f}%")
+    print(f"Récompense moyenne : {summary['reward_mean']:.2f} "
+          f"(IC 95% : [{summary['reward_ci'][0]:.2f}, {summary['reward_ci'][1]:.2f}])")
+    print(f"Taux de succès : {summary['success_rate'] * 100:.2f}% "
+          f"(IC 95% : [{summary['success_rate_ci'][0] * 100:.2f}%, {summary['success_rate_ci'][1] * 100:.2f}%])")
+    print(f"Longueur moyenne : {summary['length_mean']:.1f} pas")
+    if profile:
+        profiler.export(profile_path)
+        print(f"\nProfiling (détail dans {profile_path}) :\n{profiler.summary()}")
+    return results
@@ -1,8 +1,32 @@
 from stable_baselines3 import DQN
-from src.env import GameEnv
-from src.callbacks import RewardTrackerCallback
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from src.env import GameEnv, to_gymnasium
+from src.vec_env import VecGameEnv
+from src.callbacks import RewardTrackerCallback, ProfilingCallback, AsyncCheckpointCallback, AsyncEvalCallback
+from src.checkpoint import latest_checkpoint, load_checkpoint
+from src.profiling import PhaseProfiler
+from src.replay_buffer import CompactReplayBuffer
 import numpy as np
-import matplotlib.pyplot as plt
+import time
+
+#réglages DQN de l'entraînement de référence, partagés avec les sweeps (src/sweep.py)
+DQN_DEFAULTS = {"exploration_fraction": 0.8, "exploration_final_eps": 0.2}
+
+def update_schedule(n_envs, train_freq=None, gradient_steps=None):
+      """
+      Fréquence d'entraînement et nombre de mises à jour par défaut pour n_envs plateaux.
+
+      Par défaut, ces deux valeurs gardent le ratio de DQN (1 mise à jour toutes les 4 transitions) quel que
+      soit n_envs : chaque pas vectorisé collecte n_envs transitions.
+
+      Returns:
+            tuple: (train_freq, gradient_steps).
+      """
+      if train_freq is None:
+            train_freq = max(1, 4 // n_envs)
+      if gradient_steps is None:
+            gradient_steps = max(1, round(n_envs * train_freq / 4))
+      return train_freq, gradient_steps
 
 def moving_average(data, window_size):
       """
@@ -17,29 +41,169 @@ def moving_average(data, window_size):
       """
       return np.convolve(data, np.ones(window_size)/window_size, mode='valid')
 
-def train_agent():
+def make_env(rank, seed=None, profiler=None, env_kwargs=None):
+      """
+      Construit la fonction de création d'un GameEnv pour le worker `rank` d'un environnement vectorisé.
+
+      Args:
+            rank (int): Indice du worker.
+            seed (int, optional): Graine de base ; le worker utilise `seed + rank`.
+            profiler (PhaseProfiler, optional): Profiler des étapes de l'environnement.
+            env_kwargs (dict, optional): Paramètres de GameEnv (grid_size, n_monsters, observation...).
+
+      Returns:
+            callable: Fonction sans argument qui renvoie un GameEnv, dans l'adaptateur gym 0.21 de shimmy.
+      """
+      def _init():
+            env = GameEnv(profiler=profiler, **(env_kwargs or {}))
+            if seed is not None:
+                  env.seed(seed + rank) #chaque GameEnv a son propre générateur
+            return to_gymnasium(env)
+      return _init
+
+def make_training_env(n_envs=1, vec_env="dummy", seed=None, profiler=None, env_kwargs=None):
+      """
+      Construit l'environnement d'entraînement.
+
+      Args:
+            n_envs (int): Nombre de plateaux simulés en parallèle.
+            vec_env (str): Type de vectorisation :
+                  - "dummy" : n_envs GameEnv dans le processus courant (DummyVecEnv),
+                  - "subproc" : un GameEnv par processus (SubprocVecEnv), pour utiliser plusieurs coeurs,
+                  - "native" : VecGameEnv, qui simule les n_envs plateaux en une seule passe NumPy.
+            seed (int, optional): Graine de base, décalée de `rank` pour chaque worker.
+            profiler (PhaseProfiler, optional): Profiler des étapes de l'environnement. Ignoré avec "subproc" :
+                  les environnements vivent alors dans d'autres processus.
+            env_kwargs (dict, optional): Paramètres de GameEnv (taille de grille, nombre de monstres, observation).
+                  VecGameEnv ne simule que la configuration par défaut : ils sont refusés avec "native".
+
+      Returns:
+            VecEnv: Environnement vectorisé compatible stable-baselines3.
+      """
+      if vec_env == "native":
+            if env_kwargs:
+                  raise ValueError("VecGameEnv ne simule que la grille 10x10 à 3 monstres : utilisez 'dummy' ou 'subproc'")
+            return VecGameEnv(num_envs=n_envs, seed=seed, profiler=profiler)
+      if vec_env == "subproc":
+            return SubprocVecEnv([make_env(rank, seed, env_kwargs=env_kwargs) for rank in range(n_envs)])
+      env_fns = [make_env(rank, seed, profiler, env_kwargs) for rank in range(n_envs)]
+      if vec_env == "dummy":
+            return DummyVecEnv(env_fns)
+      raise ValueError(f"vec_env doit valoir 'dummy', 'subproc' ou 'native', pas {vec_env!r}")
+
+def train_agent(n_envs=1, vec_env="dummy", seed=None, train_freq=None, gradient_steps=None, total_timesteps=200000,
+                profile=False, profile_path="profile_train.json", checkpoint_freq=20000,
+                checkpoint_dir="src/models/checkpoints", keep_checkpoints=3, save_replay_buffer=False, resume=False,
+                buffer_size=1000000, compact_buffer=False, buffer_path=None, env_kwargs=None, eval_freq=20000,
+                n_eval_episodes=500, best_model_path="src/models/best_policy.npz"):
       """
       Entraîne un agent sur l'environnement GameEnv et sauvegarde le modèle entraîné.
 
       Fonctionnement :
-      - Entraine l'agent
+      - Entraine l'agent, éventuellement sur plusieurs plateaux en parallèle (voir `make_training_env`)
       - Suit les métriques d'entraînement à l'aide de RewardTrackerCallback.
+      - Évalue périodiquement la politique greedy dans un processus séparé, sans interrompre l'entraînement
+        (voir AsyncEvalCallback), et garde la meilleure politique.
+      - Sauvegarde périodiquement un checkpoint en arrière-plan (voir AsyncCheckpointCallback), à partir duquel un
+        entraînement interrompu peut reprendre.
       - Sauvegarde le modèle entraîné dans un fichier.
       - Génère des graphiques pour visualiser les performances de l'agent pendant l'entraînement.
 
+      Args:
+            n_envs (int): Nombre de plateaux simulés en parallèle (1 par défaut).
+            vec_env (str): Type de vectorisation : "dummy", "subproc" ou "native".
+            seed (int, optional): Graine de base des workers (`seed + rank` pour chacun).
+            train_freq (int, optional): Fréquence d'entraînement, en pas de l'environnement vectorisé.
+            gradient_steps (int, optional): Nombre de mises à jour de gradient par entraînement.
+                  Par défaut, ces deux valeurs gardent le ratio de DQN (1 mise à jour toutes les 4 transitions)
+                  quel que soit n_envs.
+            total_timesteps (int): Nombre total de transitions collectées.
+            profile (bool): Chronomètre les phases de l'environnement et de `learn` (collecte, mises à jour,
+                  callbacks), écrit les histogrammes dans `profile_path` et affiche un résumé à la fin.
+            profile_path (str): Fichier JSON des mesures de profiling.
+            checkpoint_freq (int, optional): Intervalle entre deux checkpoints, en transitions (None pour désactiver).
+            checkpoint_dir (str): Dossier des checkpoints.
+            keep_checkpoints (int): Nombre de checkpoints conservés, les plus anciens sont supprimés.
+            save_replay_buffer (bool): Inclut le replay buffer dans les checkpoints (plus lourds), pour une reprise
+                  qui ne repart pas d'un buffer vide.
+            resume (bool or str): Reprend depuis le dernier checkpoint de `checkpoint_dir` (True) ou depuis le
+                  dossier de checkpoint donné. Les hyperparamètres du checkpoint sont conservés et l'entraînement
+                  s'arrête au même `total_timesteps` qu'un entraînement sans interruption (rien n'est relancé si le
+                  checkpoint l'a déjà atteint).
+            buffer_size (int): Taille du replay buffer, en transitions.
+            compact_buffer (bool): Utilise CompactReplayBuffer (observations encodées en int8, environ 30 fois
+                  moins de mémoire, mêmes batches que le buffer par défaut).
+            buffer_path (str, optional): Dossier où placer le buffer compact en mémoire mappée.
+            env_kwargs (dict, optional): Paramètres de GameEnv, par exemple
+                  `{"grid_size": 100, "n_monsters": 40, "observation": "egocentric"}`. Le buffer compact ne gère que
+                  l'observation "grid".
+            eval_freq (int, optional): Intervalle entre deux évaluations en arrière-plan, en transitions (None pour
+                  désactiver). Les évaluations se jouent sur BatchGameEnv, ou sur des GameEnv
+                  construits avec `env_kwargs` s'il est défini.
+            n_eval_episodes (int): Nombre d'épisodes déterministes par évaluation.
+            best_model_path (str, optional): Fichier .npz de la meilleure politique évaluée (voir
+                  `src/numpy_policy.py`), utilisable par `test_agent(model_path=...)`.
+
       !! Important !!
       Le modèle sauvegardé écrasera tout fichier existant portant le même nom.
       """
 
-      env = GameEnv()
-      model = DQN("MlpPolicy", env, verbose=1, exploration_fraction=0.8, exploration_final_eps=0.2) #mlp pour Multilayer perceptron
+      train_freq, gradient_steps = update_schedule(n_envs, train_freq, gradient_steps)
+
+      profiler = PhaseProfiler() if profile else None
+      env_kwargs = env_kwargs or {}
+      if compact_buffer and env_kwargs.get("observation", "grid") != "grid":
+            raise ValueError("CompactReplayBuffer ne gère que l'observation 'grid'")
+      env = make_training_env(n_envs=n_envs, vec_env=vec_env, seed=seed, profiler=profiler, env_kwargs=env_kwargs)
+      if resume:
+            checkpoint = latest_checkpoint(checkpoint_dir) if resume is True else resume
+            if checkpoint is None:
+                  raise FileNotFoundError(f"Aucun checkpoint à reprendre dans {checkpoint_dir}")
+            model, _ = load_checkpoint(checkpoint, env)
+            print(f"Reprise depuis {checkpoint} ({model.num_timesteps} pas déjà effectués)")
+      else:
+            buffer_kwargs = {}
+            if compact_buffer:
+                  buffer_kwargs = dict(replay_buffer_class=CompactReplayBuffer, replay_buffer_kwargs={
+                                    "path": buffer_path, "n_monsters": env_kwargs.get("n_monsters", 3)})
+            model = DQN("MlpPolicy", env, verbose=1, **DQN_DEFAULTS, #mlp pour Multilayer perceptron
+                        train_freq=train_freq, gradient_steps=gradient_steps, seed=seed, buffer_size=buffer_size,
+                        **buffer_kwargs)
+      start_timesteps = model.num_timesteps
+      if start_timesteps >= total_timesteps: #run déjà terminé : rien à entraîner ni à tracer
+            env.close()
+            print(f"Entraînement déjà terminé : {start_timesteps} pas effectués pour {total_timesteps} demandés")
+            return
 
       reward_callback = RewardTrackerCallback() #pour suivre les performances
-
-      model.learn(total_timesteps=200000, callback=reward_callback) #entrainement jusqu'à 200000 unités de temps écoulées
+      callbacks = [reward_callback]
+      if checkpoint_freq:
+            callbacks.append(AsyncCheckpointCallback(checkpoint_freq, checkpoint_dir, keep_last=keep_checkpoints,
+                                                     save_replay_buffer=save_replay_buffer))
+      if eval_freq:
+            callbacks.append(AsyncEvalCallback(eval_freq, n_eval_episodes=n_eval_episodes, seed=0,
+                                               best_model_path=best_model_path, env_kwargs=env_kwargs, verbose=1))
+      callback = ProfilingCallback(profiler, callbacks) if profile else callbacks
+
+      start = time.perf_counter()
+      #entrainement jusqu'à total_timesteps unités de temps écoulées, reprise comprise
+      model.learn(total_timesteps=total_timesteps - start_timesteps, callback=callback, reset_num_timesteps=not resume)
+      elapsed = time.perf_counter() - start
+      env.close()
       model.save("src/models/hero_agent") #enregistre le modèle ou remplace le modèle entrainé précédemment
 
+      print(f"\nEntraînement terminé : {model.num_timesteps - start_timesteps} pas en {elapsed:.1f} s "
+            f"({(model.num_timesteps - start_timesteps) / elapsed:.0f} pas/s, {n_envs} env(s) {vec_env})")
+      if profile:
+            profiler.export(profile_path)
+            print(f"\nProfiling (détail dans {profile_path}) :\n{profiler.summary()}")
+
       episode_rewards = np.array(reward_callback.episode_rewards).flatten()
+      if episode_rewards.size == 0: #aucun épisode terminé, rien à tracer
+            return
+
+      import matplotlib.pyplot as plt #uniquement pour les graphiques, pas pour les workers
+
       smoothed_rewards = moving_average(episode_rewards, window_size=50)
 
       #plot des rewards
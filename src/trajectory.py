@@ -0,0 +1,452 @@
+"""
+Journal de trajectoires : épisodes enregistrés en colonnes binaires, relus en mémoire mappée sans torch ni modèle.
+
+Usage :
+    python -m src.trajectory trajectories/test_agent                      # résumé du journal
+    python -m src.trajectory trajectories/test_agent --episode 12         # rejoue l'épisode 12 dans une fenêtre
+    python -m src.trajectory trajectories/test_agent --episode 12 --output episode_12.gif
+"""
+import argparse
+import json
+import os
+from dataclasses import dataclass
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+def position_dtype(grid_size):
+    """
+    Type des coordonnées enregistrées : int16 jusqu'à une grille de 32767 cases de côté.
+    """
+    return np.int16 if grid_size <= 32767 else np.int32
+
+def _columns(grid_size, n_monsters):
+    """
+    Colonnes du journal : nom -> (groupe, type, forme d'une ligne).
+
+    Un épisode de T pas occupe T + 1 lignes des colonnes "state" (état initial puis état après chaque pas),
+    T lignes des colonnes "step" et une ligne des colonnes "episode".
+    """
+    position = np.dtype(position_dtype(grid_size)).str
+    return {
+        "hero": ("state", position, (2,)),
+        "treasure": ("state", position, (2,)),
+        "monsters": ("state", position, (n_monsters, 2)),
+        "actions": ("step", "|i1", ()),
+        "rewards": ("step", "<f4", ()),
+        "dones": ("step", "|b1", ()),
+        "episode_ids": ("episode", "<i8", ()),
+        "step_starts": ("episode", "<i8", ()),
+        "lengths": ("episode", "<i8", ()),
+        "successes": ("episode", "|b1", ()),
+        "truncated": ("episode", "|b1", ()),
+    }
+
+def _read_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+@dataclass
+class Episode:
+    """
+    Un épisode du journal. Les tableaux sont des vues sur les fichiers en mémoire mappée : rien n'est lu avant
+    d'y accéder.
+
+    Attributes:
+        episode_id (int): Numéro de l'épisode dans l'évaluation qui l'a produit (ordre de lancement).
+        hero (np.ndarray): Positions du héros, forme (T + 1, 2) : état initial puis état après chaque pas.
+        treasure (np.ndarray): Positions du trésor, forme (T + 1, 2).
+        monsters (np.ndarray): Positions des monstres, forme (T + 1, n_monsters, 2).
+        actions (np.ndarray): Action de chaque pas, forme (T,).
+        rewards (np.ndarray): Récompense de chaque pas, forme (T,).
+        dones (np.ndarray): Fin de partie après chaque pas, forme (T,).
+        success (bool): Épisode terminé sur le trésor.
+        truncated (bool): Épisode interrompu par `max_episode_steps`.
+    """
+    episode_id: int
+    hero: np.ndarray
+    treasure: np.ndarray
+    monsters: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+    dones: np.ndarray
+    success: bool
+    truncated: bool
+
+    def __len__(self):
+        return len(self.actions)
+
+class TrajectoryRecorder:
+    """
+    Enregistre des épisodes joués en parallèle sur plusieurs plateaux dans un journal en colonnes.
+
+    Chaque colonne (positions du héros, du trésor et des monstres, actions, récompenses, dones, index des
+    épisodes) est un fichier binaire brut du dossier `path`, décrit par `meta.json`. Les pas d'un plateau sont
+    accumulés en mémoire jusqu'à la fin de son épisode ; les épisodes terminés sont écrits à la suite des colonnes
+    par blocs d'au moins `chunk_steps` pas, puis `meta.json` est remplacé atomiquement. Le journal sur disque ne
+    contient donc que des épisodes complets, même après une interruption, et un journal existant est complété
+    plutôt qu'écrasé. Les épisodes sont rangés dans leur ordre de fin ; `episode_ids` garde leur numéro de
+    lancement.
+
+    Utilisation : `start` au lancement d'un épisode sur des plateaux, `step` après chaque pas, `close` à la fin
+    (les épisodes encore en cours sont abandonnés).
+
+    Args:
+        path (str): Dossier du journal, créé s'il n'existe pas.
+        grid_size (int): Taille de la grille.
+        n_monsters (int): Nombre de monstres.
+        n_boards (int): Nombre de plateaux joués simultanément.
+        chunk_steps (int): Nombre minimal de pas écrits à la fois.
+    """
+    def __init__(self, path, grid_size=10, n_monsters=3, n_boards=1, chunk_steps=65536):
+        self.path = path
+        self.grid_size = grid_size
+        self.n_monsters = n_monsters
+        self.n_boards = n_boards
+        self.chunk_steps = chunk_steps
+        self.columns = _columns(grid_size, n_monsters)
+
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, META_FILE)):
+            meta = _read_meta(path)
+            if (meta["grid_size"], meta["n_monsters"]) != (grid_size, n_monsters):
+                raise ValueError(f"Le journal {path} a été écrit pour une grille {meta['grid_size']} à "
+                                 f"{meta['n_monsters']} monstres")
+            self.lengths = meta["lengths"]
+        else:
+            self.lengths = {"state": 0, "step": 0, "episode": 0}
+        #une écriture interrompue peut laisser des lignes au-delà de meta.json : elles sont ignorées puis écrasées
+        for name, (group, dtype, shape) in self.columns.items():
+            with open(self._file(name), "ab") as f:
+                f.truncate(self.lengths[group] * np.dtype(dtype).itemsize * int(np.prod(shape)))
+
+        self._capacity = 0
+        self._grow(256)
+        self._episode = np.full(n_boards, -1, dtype=np.int64) #numéro de l'épisode en cours sur chaque plateau
+        self._steps = np.zeros(n_boards, dtype=np.int64) #pas joués dans l'épisode en cours
+        self._pending = {name: [] for name in self.columns} #épisodes terminés, pas encore écrits
+        self._pending_steps = 0
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _grow(self, capacity):
+        """
+        Agrandit les buffers par plateau pour des épisodes de `capacity` pas.
+        """
+        buffers = {}
+        for name, (group, dtype, shape) in self.columns.items():
+            if group == "episode":
+                continue
+            rows = capacity + 1 if group == "state" else capacity
+            buffers[name] = np.zeros((self.n_boards, rows) + shape, dtype=dtype)
+            if self._capacity:
+                old = self._buffers[name]
+                buffers[name][:, :old.shape[1]] = old
+        self._buffers = buffers
+        self._capacity = capacity
+
+    def start(self, boards, episode_ids, hero, treasure, monsters):
+        """
+        Commence un nouvel épisode sur les plateaux `boards`, à partir de leur état initial.
+
+        Args:
+            boards (np.ndarray): Indices des plateaux.
+            episode_ids (np.ndarray): Numéro de l'épisode lancé sur chaque plateau.
+            hero, treasure, monsters (np.ndarray): Positions initiales, formes (k, 2), (k, 2), (k, n_monsters, 2).
+        """
+        self._episode[boards] = episode_ids
+        self._steps[boards] = 0
+        self._buffers["hero"][boards, 0] = hero
+        self._buffers["treasure"][boards, 0] = treasure
+        self._buffers["monsters"][boards, 0] = monsters
+
+    def step(self, boards, actions, rewards, dones, hero, treasure, monsters, successes=None, truncated=None):
+        """
+        Ajoute un pas sur chacun des plateaux `boards` ; les épisodes terminés sont transférés dans le journal.
+
+        Args:
+            boards (np.ndarray): Indices des plateaux qui ont joué ce pas.
+            actions, rewards, dones (np.ndarray): Action, récompense et fin de partie de chaque plateau.
+            hero, treasure, monsters (np.ndarray): Positions après le pas (avant la réinitialisation automatique
+                des plateaux terminés).
+            successes, truncated (np.ndarray, optional): Succès et interruption des épisodes, lus pour les
+                plateaux terminés.
+        """
+        boards = np.asarray(boards)
+        t = self._steps[boards]
+        if len(t) and t.max() >= self._capacity:
+            self._grow(2 * self._capacity)
+        buffers = self._buffers
+        buffers["actions"][boards, t] = actions
+        buffers["rewards"][boards, t] = rewards
+        buffers["dones"][boards, t] = dones
+        buffers["hero"][boards, t + 1] = hero
+        buffers["treasure"][boards, t + 1] = treasure
+        buffers["monsters"][boards, t + 1] = monsters
+        self._steps[boards] = t + 1
+
+        for i in np.flatnonzero(dones):
+            self._finish(boards[i], successes is not None and bool(successes[i]),
+                         truncated is not None and bool(truncated[i]))
+
+    def _finish(self, board, success, truncated):
+        length = int(self._steps[board])
+        pending = self._pending
+        for name, (group, _, _) in self.columns.items():
+            if group == "state":
+                pending[name].append(self._buffers[name][board, :length + 1].copy())
+            elif group == "step":
+                pending[name].append(self._buffers[name][board, :length].copy())
+        written_steps = self.lengths["step"] + self._pending_steps
+        pending["episode_ids"].append(self._episode[board])
+        pending["step_starts"].append(written_steps)
+        pending["lengths"].append(length)
+        pending["successes"].append(success)
+        pending["truncated"].append(truncated)
+        self._episode[board] = -1
+        self._pending_steps += length
+        if self._pending_steps >= self.chunk_steps:
+            self.flush()
+
+    def append_log(self, path, episode_offset=0):
+        """
+        Ajoute tous les épisodes d'un autre journal (par exemple celui d'un worker), bloc par bloc.
+
+        Args:
+            path (str): Dossier du journal à recopier.
+            episode_offset (int): Décalage ajouté à ses numéros d'épisodes.
+        """
+        log = TrajectoryLog(path)
+        if (log.grid_size, log.n_monsters) != (self.grid_size, self.n_monsters):
+            raise ValueError(f"Le journal {path} n'a pas la même grille ni le même nombre de monstres")
+        self.flush()
+        boundaries = np.searchsorted(log.step_starts, np.arange(0, log.n_steps, self.chunk_steps))
+        for first, last in zip(boundaries, list(boundaries[1:]) + [len(log)]):
+            if first == last:
+                continue
+            step_start, step_end = log.step_starts[first], log.step_starts[last - 1] + log.lengths[last - 1]
+            pending = self._pending
+            for name, (group, _, _) in self.columns.items():
+                if group == "state":
+                    pending[name].append(log.columns[name][step_start + first:step_end + last])
+                elif group == "step":
+                    pending[name].append(log.columns[name][step_start:step_end])
+            pending["episode_ids"].append(log.episode_ids[first:last] + episode_offset)
+            pending["step_starts"].append(log.step_starts[first:last] - step_start + self.lengths["step"])
+            pending["lengths"].append(log.lengths[first:last])
+            pending["successes"].append(log.successes[first:last])
+            pending["truncated"].append(log.truncated[first:last])
+            self._pending_steps = step_end - step_start
+            self.flush()
+
+    def flush(self):
+        """
+        Écrit les épisodes terminés à la suite des colonnes, puis met à jour `meta.json`.
+        """
+        if not self._pending["lengths"]:
+            return
+        added = {}
+        for name, (group, dtype, shape) in self.columns.items():
+            chunks = self._pending[name]
+            if group == "episode":
+                rows = np.concatenate([np.atleast_1d(chunk) for chunk in chunks]).astype(dtype)
+            else:
+                rows = np.ascontiguousarray(np.concatenate(chunks), dtype=dtype)
+            with open(self._file(name), "ab") as f:
+                f.write(rows.tobytes())
+            added[group] = len(rows)
+            chunks.clear()
+        for group, rows in added.items():
+            self.lengths[group] += rows
+        self._pending_steps = 0
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {
+            "version": FORMAT_VERSION,
+            "grid_size": self.grid_size,
+            "n_monsters": self.n_monsters,
+            "lengths": self.lengths,
+            "columns": {name: {"group": group, "dtype": dtype, "shape": list(shape)}
+                        for name, (group, dtype, shape) in self.columns.items()},
+        }
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        """
+        Écrit les derniers épisodes terminés. Les épisodes en cours sont abandonnés.
+        """
+        self.flush()
+        if not os.path.exists(os.path.join(self.path, META_FILE)):
+            self._write_meta()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryLog:
+    """
+    Lecture d'un journal écrit par TrajectoryRecorder, en mémoire mappée.
+
+    L'ouverture ne lit que `meta.json` : les colonnes sont projetées en mémoire et seules les pages touchées sont
+    lues, ce qui permet d'ouvrir un journal de millions de pas et d'en extraire un épisode instantanément. Aucune
+    dépendance à torch, à stable-baselines3 ni au modèle.
+
+    Attributes:
+        grid_size (int): Taille de la grille.
+        n_monsters (int): Nombre de monstres.
+        columns (dict): Colonnes en mémoire mappée, indexées par nom.
+        episode_ids, step_starts, lengths, successes, truncated (np.ndarray): Index des épisodes.
+    """
+    def __init__(self, path):
+        self.path = path
+        meta = _read_meta(path)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Version de journal non supportée : {meta['version']}")
+        self.grid_size = meta["grid_size"]
+        self.n_monsters = meta["n_monsters"]
+        self.columns = {}
+        for name, column in meta["columns"].items():
+            shape = (meta["lengths"][column["group"]],) + tuple(column["shape"])
+            if shape[0] == 0:
+                self.columns[name] = np.zeros(shape, dtype=column["dtype"])
+            else:
+                self.columns[name] = np.memmap(os.path.join(path, f"{name}.bin"), dtype=column["dtype"], mode="r",
+                                               shape=shape)
+        self.episode_ids = self.columns["episode_ids"]
+        self.step_starts = self.columns["step_starts"]
+        self.lengths = self.columns["lengths"]
+        self.successes = self.columns["successes"]
+        self.truncated = self.columns["truncated"]
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @property
+    def n_steps(self):
+        """
+        Nombre total de pas enregistrés.
+        """
+        return len(self.columns["actions"])
+
+    def episode(self, index):
+        """
+        Épisode à la position `index` du journal (voir `find` pour un numéro d'épisode).
+
+        Returns:
+            Episode: Vues sur les colonnes, sans copie.
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Épisode {index} hors du journal ({len(self)} épisodes)")
+        index %= len(self)
+        step_start = int(self.step_starts[index])
+        step_end = step_start + int(self.lengths[index])
+        state_start, state_end = step_start + index, step_end + index + 1 #une ligne d'état de plus par épisode
+        columns = self.columns
+        return Episode(
+            episode_id=int(self.episode_ids[index]),
+            hero=columns["hero"][state_start:state_end],
+            treasure=columns["treasure"][state_start:state_end],
+            monsters=columns["monsters"][state_start:state_end],
+            actions=columns["actions"][step_start:step_end],
+            rewards=columns["rewards"][step_start:step_end],
+            dones=columns["dones"][step_start:step_end],
+            success=bool(self.successes[index]),
+            truncated=bool(self.truncated[index]),
+        )
+
+    def find(self, episode_id):
+        """
+        Positions dans le journal des épisodes de numéro `episode_id` (un par évaluation enregistrée).
+        """
+        return np.flatnonzero(self.episode_ids == episode_id)
+
+    def episode_rewards(self):
+        """
+        Récompense cumulée de chaque épisode, en une passe sur la colonne des récompenses.
+        """
+        if len(self) == 0:
+            return np.zeros(0)
+        return np.add.reduceat(self.columns["rewards"], self.step_starts, dtype=np.float64)
+
+    def replay(self, index):
+        """
+        Rejoue l'épisode `index` état par état.
+
+        Yields:
+            tuple: (hero_pos, treasure_pos, monsters_pos, action, reward, done) ; action, récompense et done sont
+            ceux du pas qui a mené à cet état (None pour l'état initial).
+        """
+        episode = self.episode(index)
+        yield episode.hero[0], episode.treasure[0], episode.monsters[0], None, None, None
+        for t in range(len(episode)):
+            yield (episode.hero[t + 1], episode.treasure[t + 1], episode.monsters[t + 1], int(episode.actions[t]),
+                   float(episode.rewards[t]), bool(episode.dones[t]))
+
+    def render(self, index, output=None, fps=4):
+        """
+        Affiche l'épisode `index` dans une fenêtre, ou l'écrit dans un fichier GIF ou MP4, sans modèle.
+
+        Args:
+            index (int): Position de l'épisode dans le journal.
+            output (str, optional): Fichier .gif ou .mp4 à écrire (aucune fenêtre n'est ouverte).
+            fps (int): Images par seconde.
+        """
+        from src.renderer import GameRenderer, VideoWriter
+
+        renderer = GameRenderer(self.grid_size, n_monsters=self.n_monsters, mode="human" if output is None else "rgb_array")
+        try:
+            if output is None:
+                import matplotlib.pyplot as plt
+                for hero, treasure, monsters, *_ in self.replay(index):
+                    renderer.draw(hero, treasure, monsters)
+                    plt.pause(1 / fps)
+                return
+            with VideoWriter(output, fps=fps) as writer:
+                for hero, treasure, monsters, *_ in self.replay(index):
+                    writer.write(renderer.draw(hero, treasure, monsters))
+        finally:
+            renderer.close()
+
+    def summary(self):
+        """
+        Statistiques du journal : épisodes, pas, récompense moyenne, taux de succès et épisodes interrompus.
+        """
+        n = len(self)
+        return {
+            "episodes": n,
+            "steps": self.n_steps,
+            "reward_mean": float(self.episode_rewards().mean()) if n else 0.0,
+            "success_rate": float(np.mean(self.successes)) if n else 0.0,
+            "truncated": int(np.sum(self.truncated)),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="dossier du journal")
+    parser.add_argument("--episode", type=int, help="position de l'épisode à rejouer")
+    parser.add_argument("--output", help="fichier .gif ou .mp4 à écrire au lieu d'ouvrir une fenêtre")
+    parser.add_argument("--fps", type=int, default=4, help="images par seconde")
+    args = parser.parse_args()
+
+    log = TrajectoryLog(args.path)
+    if args.episode is None:
+        summary = log.summary()
+        print(f"{summary['episodes']} épisodes, {summary['steps']} pas, récompense moyenne "
+              f"{summary['reward_mean']:.2f}, succès {summary['success_rate'] * 100:.2f}%, "
+              f"{summary['truncated']} interrompus")
+        return
+    episode = log.episode(args.episode)
+    print(f"Épisode {episode.episode_id} : {len(episode)} pas, récompense {float(np.sum(episode.rewards)):.2f}, "
+          f"succès {'oui' if episode.success else 'non'}")
+    log.render(args.episode, output=args.output, fps=args.fps)
+
+if __name__ == "__main__":
+    main()
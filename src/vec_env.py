@@ -0,0 +1,25 @@
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+from src.batch_env import BatchGameEnv
+
+class VecGameEnv(BatchGameEnv, VecEnv):
+    """
+    Version vectorisée native de GameEnv pour stable-baselines3 : la simulation de BatchGameEnv (N plateaux en une
+    seule passe NumPy) derrière l'interface VecEnv, utilisable directement dans `train_agent`.
+
+    L'évaluation utilise BatchGameEnv, qui n'importe pas stable-baselines3.
+    """
+    def __init__(self, num_envs=8, seed=None, monster_moves="compat", profiler=None):
+        BatchGameEnv.__init__(self, num_envs, seed=seed, monster_moves=monster_moves, profiler=profiler)
+        VecEnv.__init__(self, num_envs, self.observation_space, self.action_space)
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
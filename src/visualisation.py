@@ -1,27 +1,54 @@
-from stable_baselines3 import DQN
 from src.env import GameEnv
+from src.evaluation import load_policy
 
-def test_agent_obs():
+def test_agent_obs(output=None, num_episodes=1, fps=4, model_path="src/models/hero_agent"):
     """
     Test de l'agent entrainé sur 1 seul scénario afin de voir le chemin qu'il a emprunté jusqu'au trésor.
 
     Fonctionnement :
     - Réinitialise l'environnement pour commencer un nouvel épisode.
     - Utilise le modèle chargé pour prédire les actions optimales à chaque étape.
-    - Affiche l'état de l'environnement après chaque action via la méthode `render()`.
+    - Affiche l'état de l'environnement après chaque action via la méthode `render()`, dans une fenêtre
+      mise à jour en place.
+    - Si `output` est donné, aucune fenêtre n'est ouverte : les images sont envoyées au fil de l'épisode dans
+      un fichier GIF ou MP4 (utilisable sur un serveur sans écran, pour des centaines d'épisodes).
 
     L'épisode se termine lorsqu'une condition d'arrêt définie dans l'environnement est atteinte.
 
     Assurez-vous que le fichier "src/models/hero_agent.zip" existe avant d'exécuter cette fonction.
-    S'il n'existe pas, commencez par entrainer le modèle.
+    S'il n'existe pas, commencez par entrainer le modèle. Une politique exportée en NumPy
+    ("src/models/hero_policy.npz") peut aussi être utilisée, sans charger torch.
+
+    Args:
+        output (str, optional): Fichier .gif ou .mp4 à écrire. Peut contenir "{episode}", remplacé par le numéro
+            de l'épisode, pour enregistrer plusieurs épisodes (ex : "replays/episode_{episode:03d}.gif").
+        num_episodes (int): Nombre d'épisodes à jouer.
+        fps (int): Images par seconde, pour la fenêtre comme pour les fichiers.
+        model_path (str): Modèle DQN ou politique NumPy (.npz) à utiliser.
     """
+    env = GameEnv(headless=False, render_mode="human" if output is None else "rgb_array")
+    model = load_policy(model_path)
+
+    for episode in range(num_episodes):
+        obs = env.reset()
+        done = False
+
+        if output is None:
+            import matplotlib.pyplot as plt
+            env.render()
+            while not done:
+                action, _ = model.predict(obs, deterministic=True) #deterministic pour que l'agent agisse selon la politique apprise exclusivement
+                obs, _, done, _ = env.step(action)
+                env.render()
+                plt.pause(1 / fps)
+            continue
 
-    env = GameEnv()
-    model = DQN.load("src/models/hero_agent")
-    obs = env.reset()
-    done = False
+        from src.renderer import VideoWriter
+        with VideoWriter(output.format(episode=episode), fps=fps) as writer:
+            writer.write(env.render())
+            while not done:
+                action, _ = model.predict(obs, deterministic=True)
+                obs, _, done, _ = env.step(action)
+                writer.write(env.render())
 
-    while not done:
-        action, _ = model.predict(obs, deterministic=True) #deterministic pour que l'agent agisse selon la politique apprise exclusivement
-        obs, _, done, _ = env.step(action)
-        env.render()
\ No newline at end of file
+    env.close()
@@ -0,0 +1,32 @@
+import numpy as np
+from stable_baselines3 import DQN
+
+from src.callbacks import AsyncEvalCallback
+from src.numpy_policy import NumpyPolicy
+from src.train import make_training_env
+
+
+def test_final_weights_are_always_evaluated(tmp_path):
+    #évaluations longues et fréquentes : le worker est saturé et des paliers sont sautés
+    best_model_path = str(tmp_path / "best.npz")
+    callback = AsyncEvalCallback(200, n_eval_episodes=2000, max_episode_steps=50, best_model_path=best_model_path)
+    model = DQN("MlpPolicy", make_training_env(4, "native", seed=0), seed=0, learning_starts=100, device="cpu")
+    model.learn(1900, callback=callback)
+    assert callback.skipped > 0
+    assert callback.evaluations[-1][0] == model.num_timesteps
+    assert callback.best_mean_reward == max(summary["reward_mean"] for _, summary in callback.evaluations)
+    assert NumpyPolicy.load(best_model_path).predict(np.zeros((1, 106)))[0].shape == (1,)
+
+
+def test_evaluation_runs_on_custom_boards(tmp_path):
+    env_kwargs = {"grid_size": 12, "n_monsters": 4, "observation": "egocentric"}
+    best_model_path = str(tmp_path / "best.npz")
+    callback = AsyncEvalCallback(300, n_eval_episodes=40, n_envs=8, max_episode_steps=30,
+                                 best_model_path=best_model_path, env_kwargs=env_kwargs)
+    env = make_training_env(2, "dummy", seed=0, env_kwargs=env_kwargs)
+    model = DQN("MlpPolicy", env, seed=0, learning_starts=100, device="cpu")
+    model.learn(900, callback=callback)
+    assert len(callback.evaluations) == 3 and callback.evaluations[-1][0] == model.num_timesteps
+    assert all(summary["episodes"] == 40 for _, summary in callback.evaluations)
+    policy = NumpyPolicy.load(best_model_path)
+    assert policy.predict(np.zeros((1, 112)))[0].shape == (1,)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from src.env import GameEnv
+
+
+@pytest.mark.parametrize("env_kwargs", [{}, {"n_monsters": 1}, {"grid_size": 30, "n_monsters": 12}])
+def test_observations_stay_in_observation_space(env_kwargs):
+    env = GameEnv(observation="egocentric", **env_kwargs)
+    actions = np.random.default_rng(0).integers(0, 5, size=20000)
+    steps = 0
+    for episode in range(200):
+        obs = env.reset(seed=episode)
+        assert env.observation_space.contains(obs.astype(np.float32))
+        done = False
+        while not done and env.step_count < 50:
+            obs, _, done, _ = env.step(actions[steps])
+            steps += 1
+            assert env.observation_space.contains(obs.astype(np.float32))
+
+
+def reference_egocentric_obs(env):
+    #construction case par case, sans les raccourcis vectorisés de _get_egocentric_obs
+    n, r, k = env.grid_size, env.view_radius, env.k_nearest
+    hero, treasure = tuple(env.hero_pos), tuple(env.treasure_pos)
+    monsters = [tuple(monster) for monster in env.monsters_pos]
+    contents, outside = [], []
+    for dr in range(-r, r + 1):
+        for dc in range(-r, r + 1):
+            cell = (hero[0] + dr, hero[1] + dc)
+            value = 0.0
+            if cell == treasure:
+                value = 0.5
+            if cell in monsters:
+                value = -1.0
+            contents.append(value)
+            outside.append(float(not (0 <= cell[0] < n and 0 <= cell[1] < n)))
+    features = [(treasure[0] - hero[0]) / n, (treasure[1] - hero[1]) / n, hero[0] / n, hero[1] / n]
+    distances = [abs(m[0] - hero[0]) + abs(m[1] - hero[1]) for m in monsters]
+    nearest = sorted(range(len(monsters)), key=lambda i: (distances[i], i))[:k]
+    for i in nearest:
+        features += [(monsters[i][0] - hero[0]) / n, (monsters[i][1] - hero[1]) / n, distances[i] / (2 * n)]
+    features += [0.0, 0.0, 1.0] * (k - len(nearest)) #monstres absents
+    features.append(float(abs(hero[0] - treasure[0]) + abs(hero[1] - treasure[1]) <= 1))
+    return np.array(contents + outside + features)
+
+
+@pytest.mark.parametrize("env_kwargs", [
+    {},
+    {"n_monsters": 1},
+    {"n_monsters": 2, "k_nearest": 4},
+    {"view_radius": 0},
+    {"grid_size": 6, "n_monsters": 5, "view_radius": 4},
+    {"grid_size": 40, "n_monsters": 20, "view_radius": 2, "k_nearest": 5},
+])
+def test_egocentric_obs_matches_reference(env_kwargs):
+    env = GameEnv(observation="egocentric", copy_obs=False, **env_kwargs)
+    width = 2 * env.view_radius + 1
+    assert env.observation_space.shape == (2 * width * width + 5 + 3 * env.k_nearest,)
+    actions = np.random.default_rng(1).integers(0, 5, size=20000)
+    steps = 0
+    for episode in range(300):
+        obs = env.reset(seed=episode)
+        np.testing.assert_allclose(obs, reference_egocentric_obs(env), rtol=0, atol=1e-12)
+        done = False
+        while not done and env.step_count < 30:
+            obs, _, done, _ = env.step(actions[steps])
+            steps += 1
+            np.testing.assert_allclose(obs, reference_egocentric_obs(env), rtol=0, atol=1e-12)
+
+
+def test_egocentric_obs_by_hand():
+    env = GameEnv(observation="egocentric", n_monsters=4, view_radius=1, k_nearest=3)
+    env.reset(seed=0)
+    env.hero_pos = np.array([0, 0])
+    env.treasure_pos = np.array([1, 1])
+    env.monsters_pos = np.array([[5, 5], [0, 1], [3, 0], [0, 3]])
+    obs = env._get_egocentric_obs()
+    contents, outside, features = obs[:9].reshape(3, 3), obs[9:18].reshape(3, 3), obs[18:]
+    assert np.array_equal(contents, [[0, 0, 0], [0, 0, -1], [0, 0, 0.5]])
+    assert np.array_equal(outside, [[1, 1, 1], [1, 0, 0], [1, 0, 0]])
+    #monstres (0, 1), puis (3, 0) et (0, 3) à égalité de distance, dans leur ordre ; (5, 5) est écarté
+    slots = features[4:13].reshape(3, 3)
+    assert np.allclose(slots, [[0, 0.1, 0.05], [0.3, 0, 0.15], [0, 0.3, 0.15]])
+    assert features[-1] == 0
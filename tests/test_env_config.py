@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.env import GameEnv, SPAWN_MASK_MAX_CELLS
+
+
+@pytest.mark.parametrize("grid_size, n_monsters", [(10, 3), (6, 1), (15, 7), (40, 25)])
+def test_grid_observation_size_and_contents(grid_size, n_monsters):
+    env = GameEnv(grid_size=grid_size, n_monsters=n_monsters)
+    assert env.observation_space.shape == (grid_size * grid_size + 3 + n_monsters,)
+    obs = env.reset(seed=0)
+    assert obs.shape == env.observation_space.shape
+    assert env.monsters_pos.shape == (n_monsters, 2)
+    grid = obs[:grid_size * grid_size].reshape(grid_size, grid_size)
+    assert grid[tuple(env.hero_pos)] == 1
+    assert (grid[tuple(env.monsters_pos.T)] == -1).all()
+
+
+def test_invalid_configuration_is_rejected():
+    with pytest.raises(ValueError):
+        GameEnv(grid_size=3)
+    with pytest.raises(ValueError):
+        GameEnv(n_monsters=0)
+    with pytest.raises(ValueError):
+        GameEnv(observation="pixels")
+
+
+def test_large_board_spawn_respects_constraints():
+    env = GameEnv(grid_size=200, n_monsters=300)
+    assert env._cells is None #tirage par rejet, sans énumérer la grille
+    for seed in range(50):
+        env.reset(seed=seed)
+        monsters = env.monsters_pos
+        assert ((monsters >= 0) & (monsters < 200)).all()
+        assert (np.abs(monsters - env.hero_pos).sum(axis=1) >= 3).all()
+        assert (np.abs(monsters - env.treasure_pos).sum(axis=1) >= 3).all()
+
+
+def test_large_board_spawn_is_uniform_over_valid_cells():
+    grid_size = 33 #1089 cases : juste au-dessus de SPAWN_MASK_MAX_CELLS
+    assert grid_size * grid_size > SPAWN_MASK_MAX_CELLS
+    env = GameEnv(grid_size=grid_size, n_monsters=2000)
+    env.seed(0)
+    env.hero_pos, env.treasure_pos = np.array([1, 2]), np.array([2, 2]) #zones interdites qui se chevauchent
+    counts = np.zeros((grid_size, grid_size))
+    for _ in range(50):
+        np.add.at(counts, tuple(env._spawn_monsters().T), 1)
+
+    rows, cols = np.indices((grid_size, grid_size))
+    valid = ((np.abs(rows - 1) + np.abs(cols - 2) >= 3) & (np.abs(rows - 2) + np.abs(cols - 2) >= 3))
+    assert counts[~valid].sum() == 0
+    expected = counts.sum() / valid.sum()
+    statistic = ((counts[valid] - expected) ** 2 / expected).sum()
+    df = valid.sum() - 1
+    #quantile à 99,9% de la loi du chi² (approximation de Wilson-Hilferty)
+    critical = df * (1 - 2 / (9 * df) + 3.09 * np.sqrt(2 / (9 * df))) ** 3
+    assert statistic < critical
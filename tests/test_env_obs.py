@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from src.env import GameEnv
+
+
+def reference_obs(env):
+    #construction d'origine de GameEnv._get_obs : grille complète puis np.concatenate
+    grid = np.zeros((env.grid_size, env.grid_size), dtype=np.float32)
+    grid[env.hero_pos[0], env.hero_pos[1]] = 1
+    grid[env.treasure_pos[0], env.treasure_pos[1]] = 0.5
+    for monster in env.monsters_pos:
+        grid[monster[0], monster[1]] = -1
+    relative_treasure_position = (env.treasure_pos - env.hero_pos) / env.grid_size
+    monster_distances = [np.linalg.norm(env.hero_pos - monster, ord=1) / env.grid_size for monster in env.monsters_pos]
+    proximity_to_treasure = 1 if np.linalg.norm(env.hero_pos - env.treasure_pos, ord=1) <= 1 else 0
+    return np.concatenate([grid.flatten(), relative_treasure_position, monster_distances, [proximity_to_treasure]])
+
+
+def assert_same(obs, expected):
+    assert obs.dtype == expected.dtype
+    assert obs.shape == expected.shape
+    assert np.array_equal(obs, expected)
+
+
+@pytest.mark.parametrize("copy_obs", [True, False])
+@pytest.mark.parametrize("env_kwargs", [{}, {"grid_size": 12, "n_monsters": 5}])
+def test_incremental_obs_matches_full_rebuild(copy_obs, env_kwargs):
+    env = GameEnv(copy_obs=copy_obs, **env_kwargs)
+    actions = np.random.default_rng(0).integers(0, 5, size=200000)
+    steps = 0
+    for episode in range(2000):
+        obs = env.reset(seed=episode)
+        assert_same(obs, reference_obs(env))
+        done = False
+        while not done and env.step_count < 30:
+            obs, _, done, _ = env.step(actions[steps])
+            steps += 1
+            assert_same(obs, reference_obs(env))
+
+
+def test_copies_are_not_overwritten():
+    env = GameEnv(copy_obs=True)
+    first = env.reset(seed=0)
+    expected = reference_obs(env)
+    for action in (0, 1, 2, 3, 4):
+        env.step(action)
+    assert np.array_equal(first, expected)
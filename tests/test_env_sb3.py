@@ -0,0 +1,22 @@
+import numpy as np
+from stable_baselines3 import DQN
+
+from src.env import GameEnv, to_gymnasium
+
+
+def test_dqn_learns_on_wrapped_game_env():
+    model = DQN("MlpPolicy", to_gymnasium(GameEnv()), seed=0, learning_starts=50, device="cpu")
+    model.learn(200)
+    assert model.num_timesteps == 200
+
+
+def test_wrapped_env_is_seeded_by_sb3():
+    first, second = to_gymnasium(GameEnv()), to_gymnasium(GameEnv())
+    obs_a, _ = first.reset(seed=3)
+    obs_b, _ = second.reset(seed=3)
+    assert np.array_equal(obs_a, obs_b)
+    for action in [0, 3, 1, 4, 2] * 10:
+        step_a, step_b = first.step(action), second.step(action)
+        assert np.array_equal(step_a[0], step_b[0]) and step_a[1:4] == step_b[1:4]
+        if step_a[2]:
+            break
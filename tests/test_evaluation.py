@@ -0,0 +1,11 @@
+import pytest
+
+from src.evaluation import evaluate_agent, run_episodes
+
+
+@pytest.mark.parametrize("n_episodes", [0, -1])
+def test_empty_evaluations_are_rejected(n_episodes, tmp_path):
+    with pytest.raises(ValueError, match="n_episodes"):
+        run_episodes(policy=None, n_episodes=n_episodes)
+    with pytest.raises(ValueError, match="n_episodes"): #refusé avant de charger le modèle
+        evaluate_agent(model_path=str(tmp_path / "missing.npz"), n_episodes=n_episodes)
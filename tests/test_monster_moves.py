@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from src.batch_env import BatchGameEnv
+from src.env import GameEnv
+
+N_SAMPLES = 20000
+#quantiles à 99,9% de la loi du chi² (1 à 4 degrés de liberté)
+CHI2_CRITICAL = {1: 10.83, 2: 13.82, 3: 16.27, 4: 18.47}
+#issues : 0=immobile, 1=haut, 2=bas, 3=gauche, 4=droite
+OUTCOMES = {(0, 0): 0, (-1, 0): 1, (1, 0): 2, (0, -1): 3, (0, 1): 4}
+
+#(monstre, héros, trésor) sur la grille 10x10
+STATES = {
+    "coin": ((0, 0), (5, 5), (9, 9)),
+    "bord": ((0, 4), (7, 7), (9, 0)),
+    "coin_bloque_par_heros": ((9, 9), (9, 8), (5, 5)),
+    "bloque_par_heros": ((4, 4), (3, 4), (9, 9)),
+    "bloque_par_tresor": ((4, 4), (0, 9), (5, 6)),
+    "bord_bloque_par_tresor": ((0, 5), (9, 9), (0, 7)),
+    "immobile": ((0, 0), (0, 1), (2, 1)),
+}
+
+
+def old_move(monster, hero, treasure, grid_size, rng):
+    #ancienne boucle de GameEnv.step : 10 tentatives aléatoires, immobile après 10 échecs
+    monster = np.array(monster)
+    for _ in range(10):
+        new_monster_pos = monster + rng.choice([-1, 0, 1], size=2)
+        new_monster_pos[0] = np.clip(new_monster_pos[0], 0, grid_size - 1)
+        new_monster_pos[1] = np.clip(new_monster_pos[1], 0, grid_size - 1)
+        if (np.sum(np.abs(new_monster_pos - monster)) == 1 and
+                not np.array_equal(new_monster_pos, hero) and
+                not np.array_equal(new_monster_pos, treasure) and
+                np.linalg.norm(new_monster_pos - np.array(treasure), ord=1) >= 3):
+            return new_monster_pos
+    return monster
+
+
+def counts(monster, targets):
+    offsets = np.asarray(targets) - np.asarray(monster)
+    outcomes = [OUTCOMES[tuple(offset)] for offset in offsets.tolist()]
+    return np.bincount(outcomes, minlength=5)
+
+
+def assert_same_law(expected, observed):
+    #test d'homogénéité du chi² entre deux échantillons
+    keep = (expected + observed) > 0
+    table = np.stack([expected[keep], observed[keep]]).astype(float)
+    if table.shape[1] == 1:
+        return
+    theoretical = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / table.sum()
+    statistic = ((table - theoretical) ** 2 / theoretical).sum()
+    assert statistic < CHI2_CRITICAL[table.shape[1] - 1], (expected, observed)
+
+
+@pytest.fixture(scope="module")
+def old_counts():
+    rng = np.random.default_rng(0)
+    return {name: counts(monster, [old_move(monster, hero, treasure, 10, rng) for _ in range(N_SAMPLES)])
+            for name, (monster, hero, treasure) in STATES.items()}
+
+
+@pytest.mark.parametrize("name", STATES)
+def test_scalar_moves_match_old_loop(name, old_counts):
+    monster, hero, treasure = STATES[name]
+    env = GameEnv(n_monsters=1)
+    env.seed(1)
+    env.reset()
+    targets = []
+    for _ in range(N_SAMPLES):
+        env.monsters_pos[0] = monster
+        env._move_monsters(*hero, *treasure)
+        targets.append(env.monsters_pos[0].copy())
+    assert_same_law(old_counts[name], counts(monster, targets))
+
+
+@pytest.mark.parametrize("name", STATES)
+def test_vectorized_moves_match_old_loop(name, old_counts):
+    monster, hero, treasure = STATES[name]
+    env = GameEnv(n_monsters=N_SAMPLES)
+    env.seed(2)
+    env.monsters_pos = np.tile(monster, (N_SAMPLES, 1))
+    env._move_monsters_vectorized(*hero, *treasure)
+    assert_same_law(old_counts[name], counts(monster, env.monsters_pos))
+
+
+@pytest.mark.parametrize("name", STATES)
+def test_vec_game_env_moves_match_old_loop(name, old_counts):
+    monster, hero, treasure = STATES[name]
+    env = BatchGameEnv(num_envs=N_SAMPLES, seed=3)
+    env.reset()
+    env.hero_pos[:] = hero
+    env.treasure_pos[:] = treasure
+    env.monsters_pos[:, 0] = monster
+    env._far_from_treasure[:] = np.abs(env._cells - np.array(treasure)).sum(axis=1) >= 3
+    env._move_monsters()
+    assert_same_law(old_counts[name], counts(monster, env.monsters_pos[:, 0]))
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+NPZ_EVALUATION = """
+import sys
+from src.test import test_agent
+from src.visualisation import test_agent_obs
+test_agent(num_episodes=20, seed=0, max_episode_steps=200, verbose=False, model_path="src/models/hero_policy.npz")
+heavy = [name for name in ("torch", "stable_baselines3") if name in sys.modules]
+assert not heavy, heavy
+"""
+
+
+def test_npz_evaluation_does_not_import_torch():
+    #interpréteur neuf : les autres tests ont déjà importé torch dans ce processus
+    completed = subprocess.run([sys.executable, "-c", NPZ_EVALUATION], capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
@@ -0,0 +1,41 @@
+from src import sweep
+
+
+def fake_trial(config, seed, shared=None, check_fraction=0.1, grace_fraction=0.3, min_trials=3,
+               eval_episodes=1000, model_dir=None):
+    #chaque essai est arrêté dès que l'arrêt anticipé est actif
+    result = {"key": sweep.trial_key(config, seed, eval_episodes), "config": config, "seed": seed,
+              "status": "pruned" if shared is not None else "completed", "timesteps": 10,
+              "rolling_success_rate": 0.5, "rolling_reward": 1.0, "history": [],
+              "stopping": sweep.stopping_settings(shared is not None, check_fraction, grace_fraction, min_trials),
+              "elapsed_s": 0.0}
+    if result["status"] == "completed":
+        result["eval"] = {"success_rate": 0.5, "success_rate_ci": [0.4, 0.6], "reward_mean": 1.0,
+                          "length_mean": 10.0}
+    return result
+
+
+def run(tmp_path, **kwargs):
+    return sweep.run_sweep(configs=sweep.grid({"learning_rate": [1e-4, 5e-4]}), n_workers=1,
+                           output_dir=str(tmp_path), verbose=False, **kwargs)
+
+
+def test_pruned_trials_rerun_without_early_stopping(tmp_path, monkeypatch):
+    monkeypatch.setattr(sweep, "run_trial", fake_trial)
+    assert {result["status"] for result in run(tmp_path)} == {"pruned"}
+    assert {result["status"] for result in run(tmp_path, early_stopping=False)} == {"completed"}
+    #les essais terminés sont repris du cache, même avec l'arrêt anticipé réactivé
+    assert {result["status"] for result in run(tmp_path)} == {"completed"}
+
+
+def test_pruned_trials_rerun_with_other_stopping_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(sweep, "run_trial", fake_trial)
+    first = run(tmp_path)
+    assert [result["stopping"] for result in run(tmp_path)] == [result["stopping"] for result in first]
+    assert {result["stopping"]["min_trials"] for result in run(tmp_path, min_trials=5)} == {5}
+
+
+def test_key_depends_on_eval_episodes():
+    config = {"learning_rate": 1e-4}
+    assert sweep.trial_key(config, 0, 1000) != sweep.trial_key(config, 0, 200)
+    assert sweep.trial_key(config, 0) == sweep.trial_key(config, 0, 1000)
@@ -0,0 +1,17 @@
+from src.batch_env import BatchGameEnv
+from src.tabular import TabularAgent
+
+
+def test_learn_stops_exactly_at_budget():
+    agent = TabularAgent(seed=0)
+    learned = []
+    update = agent.update
+
+    def counting_update(keys, *args):
+        learned.append(len(keys))
+        update(keys, *args)
+
+    agent.update = counting_update
+    agent.learn(BatchGameEnv(num_envs=64, seed=0), 1000)
+    assert sum(learned) == 1000
+    assert learned[-1] == 1000 % 64
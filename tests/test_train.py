@@ -0,0 +1,17 @@
+import os
+
+from src.train import latest_checkpoint, train_agent
+
+
+def test_resume_of_finished_run_trains_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MPLBACKEND", "Agg")
+    os.makedirs("src/models")
+    kwargs = dict(seed=0, total_timesteps=200, checkpoint_freq=100, checkpoint_dir="checkpoints", eval_freq=None,
+                  buffer_size=1000)
+    train_agent(**kwargs)
+    checkpoint = latest_checkpoint("checkpoints")
+    assert checkpoint is not None
+    os.remove("src/models/hero_agent.zip")
+    train_agent(resume=True, **kwargs)
+    assert not os.path.exists("src/models/hero_agent.zip")
@@ -0,0 +1,184 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.trajectory import TrajectoryLog, TrajectoryRecorder
+
+N_MONSTERS = 3
+
+
+def make_episodes(n, seed, max_length=40):
+    rng = np.random.default_rng(seed)
+    episodes = []
+    for episode_id in range(n):
+        length = int(rng.integers(1, max_length))
+        dones = np.zeros(length, dtype=bool)
+        dones[-1] = True
+        episodes.append({
+            "episode_id": episode_id,
+            "hero": rng.integers(0, 10, size=(length + 1, 2)),
+            "treasure": rng.integers(0, 10, size=(length + 1, 2)),
+            "monsters": rng.integers(0, 10, size=(length + 1, N_MONSTERS, 2)),
+            "actions": rng.integers(0, 5, size=length),
+            "rewards": rng.normal(size=length).astype(np.float32),
+            "dones": dones,
+            "success": bool(rng.random() < 0.5),
+            "truncated": bool(rng.random() < 0.2),
+        })
+    return episodes
+
+
+def record(recorder, episodes, n_boards):
+    #les plateaux jouent leurs épisodes en parallèle : les fins d'épisodes s'entrelacent
+    queue = list(episodes)
+    current, t = [None] * n_boards, [0] * n_boards
+    finished = []
+    while queue or any(episode is not None for episode in current):
+        for board in range(n_boards):
+            if current[board] is None and queue:
+                episode = current[board] = queue.pop(0)
+                t[board] = 0
+                recorder.start(np.array([board]), np.array([episode["episode_id"]]), episode["hero"][None, 0],
+                               episode["treasure"][None, 0], episode["monsters"][None, 0])
+        boards = np.array([board for board in range(n_boards) if current[board] is not None])
+        if not len(boards):
+            break
+        rows = [(current[board], t[board]) for board in boards]
+        recorder.step(boards,
+                      np.array([episode["actions"][i] for episode, i in rows]),
+                      np.array([episode["rewards"][i] for episode, i in rows]),
+                      np.array([episode["dones"][i] for episode, i in rows]),
+                      np.array([episode["hero"][i + 1] for episode, i in rows]),
+                      np.array([episode["treasure"][i + 1] for episode, i in rows]),
+                      np.array([episode["monsters"][i + 1] for episode, i in rows]),
+                      np.array([episode["success"] for episode, _ in rows]),
+                      np.array([episode["truncated"] for episode, _ in rows]))
+        for board in boards:
+            t[board] += 1
+            if t[board] == len(current[board]["actions"]):
+                finished.append(current[board])
+                current[board] = None
+    return finished #ordre de fin, celui du journal
+
+
+def assert_log_matches(log, episodes):
+    assert len(log) == len(episodes)
+    assert log.n_steps == sum(len(episode["actions"]) for episode in episodes)
+    for index, expected in enumerate(episodes):
+        episode = log.episode(index)
+        assert episode.episode_id == expected["episode_id"]
+        for name in ("hero", "treasure", "monsters", "actions", "rewards", "dones"):
+            assert np.array_equal(getattr(episode, name), expected[name]), name
+        assert episode.success == expected["success"]
+        assert episode.truncated == expected["truncated"]
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 50, 65536])
+def test_episode_boundaries_and_states(tmp_path, chunk_steps):
+    #des épisodes de plus de 256 pas agrandissent les buffers par plateau
+    episodes = make_episodes(30, seed=0, max_length=600)
+    path = str(tmp_path / "log")
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=4, chunk_steps=chunk_steps) as recorder:
+        order = record(recorder, episodes, n_boards=4)
+    log = TrajectoryLog(path)
+    assert_log_matches(log, order)
+    assert np.allclose(log.episode_rewards(), [episode["rewards"].sum() for episode in order])
+    states = list(log.replay(0))
+    assert len(states) == len(order[0]["actions"]) + 1 and states[0][3] is None
+
+
+def test_unfinished_episodes_are_dropped(tmp_path):
+    path = str(tmp_path / "log")
+    episodes = make_episodes(5, seed=1)
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=2) as recorder:
+        order = record(recorder, episodes, n_boards=2)
+        episode = make_episodes(1, seed=2)[0]
+        recorder.start(np.array([0]), np.array([99]), episode["hero"][None, 0], episode["treasure"][None, 0],
+                       episode["monsters"][None, 0])
+    assert_log_matches(TrajectoryLog(path), order)
+
+
+def test_reopening_appends_to_existing_log(tmp_path):
+    path = str(tmp_path / "log")
+    first, second = make_episodes(10, seed=3), make_episodes(7, seed=4)
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=3) as recorder:
+        order = record(recorder, first, n_boards=3)
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=2) as recorder:
+        order += record(recorder, second, n_boards=2)
+    assert_log_matches(TrajectoryLog(path), order)
+    with pytest.raises(ValueError):
+        TrajectoryRecorder(path, grid_size=12, n_monsters=N_MONSTERS)
+
+
+@pytest.mark.parametrize("chunk_steps", [1, 7, 100000])
+def test_append_log_in_small_chunks(tmp_path, chunk_steps):
+    source, target = str(tmp_path / "worker"), str(tmp_path / "main")
+    with TrajectoryRecorder(source, n_monsters=N_MONSTERS, n_boards=3) as recorder:
+        copied = record(recorder, make_episodes(25, seed=5), n_boards=3)
+    with TrajectoryRecorder(target, n_monsters=N_MONSTERS, n_boards=2) as recorder:
+        existing = record(recorder, make_episodes(4, seed=6), n_boards=2)
+    with TrajectoryRecorder(target, n_monsters=N_MONSTERS, chunk_steps=chunk_steps) as recorder:
+        recorder.append_log(source, episode_offset=100)
+    shifted = [{**episode, "episode_id": episode["episode_id"] + 100} for episode in copied]
+    assert_log_matches(TrajectoryLog(target), existing + shifted)
+
+
+def test_truncated_trailing_write_is_ignored(tmp_path):
+    path = str(tmp_path / "log")
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=2) as recorder:
+        order = record(recorder, make_episodes(6, seed=7), n_boards=2)
+    #écriture interrompue : des lignes partielles ont atteint les colonnes, mais pas meta.json
+    for name in ("hero", "monsters", "actions", "step_starts"):
+        with open(os.path.join(path, f"{name}.bin"), "ab") as f:
+            f.write(b"\x07" * 13)
+    assert_log_matches(TrajectoryLog(path), order)
+    with TrajectoryRecorder(path, n_monsters=N_MONSTERS, n_boards=2) as recorder:
+        order += record(recorder, make_episodes(3, seed=8), n_boards=2)
+    assert_log_matches(TrajectoryLog(path), order)
+
+
+def test_evaluation_round_trip(tmp_path):
+    from src.evaluation import evaluate_agent
+
+    path = str(tmp_path / "eval")
+    results = evaluate_agent("src/models/hero_policy.npz", n_episodes=60, n_envs=16, n_workers=2, seed=0,
+                             max_episode_steps=30, trajectory_path=path)
+    log = TrajectoryLog(path)
+    assert sorted(log.episode_ids.tolist()) == list(range(60))
+    order = np.asarray(log.episode_ids)
+    assert np.array_equal(np.asarray(log.lengths), results.lengths[order])
+    assert np.allclose(log.episode_rewards(), results.rewards[order], atol=1e-4)
+    assert np.array_equal(np.asarray(log.successes), results.successes[order])
+    assert np.array_equal(np.asarray(log.truncated), results.truncated[order])
+    for index in range(len(log)):
+        episode = log.episode(index)
+        assert episode.dones[-1] or episode.truncated
+        assert not episode.dones[:-1].any()
+
+
+class FirstCellPolicy:
+    #politique déterministe sans modèle : action tirée des premières valeurs de l'observation
+    def predict(self, obs, deterministic=True):
+        return (np.abs(obs[:, :7]).sum(axis=1) * 10).astype(np.int64) % 5, None
+
+
+def test_run_episodes_on_game_env_boards(tmp_path):
+    from src.evaluation import run_episodes
+
+    env_kwargs = {"grid_size": 8, "n_monsters": 2}
+    path = str(tmp_path / "boards")
+    results = run_episodes(FirstCellPolicy(), 50, n_envs=8, seed=0, max_episode_steps=25, trajectory_path=path,
+                           env_kwargs=env_kwargs)
+    again = run_episodes(FirstCellPolicy(), 50, n_envs=8, seed=0, max_episode_steps=25, env_kwargs=env_kwargs)
+    assert np.array_equal(results.rewards, again.rewards)
+    log = TrajectoryLog(path)
+    assert (log.grid_size, log.n_monsters) == (8, 2)
+    order = np.asarray(log.episode_ids)
+    assert sorted(order.tolist()) == list(range(50))
+    assert np.array_equal(np.asarray(log.lengths), results.lengths[order])
+    assert np.allclose(log.episode_rewards(), results.rewards[order], atol=1e-4)
+    for index in range(len(log)):
+        episode = log.episode(index)
+        assert ((episode.hero >= 0) & (episode.hero < 8)).all()
+        assert episode.dones[-1] or episode.truncated